@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+
+# Popis: Mereni kodeku JSON (pyjson) na datech ve tvaru odpovedi a pozadavku API -
+#        host.get ze Zabbixu, stranka networkequipment a getMultipleItems z GLPI a davka
+#        host.update. Pro kazdy dostupny kodek vypise cas serializace (dumps -> bytes)
+#        a deserializace (loads z bytes) a velikost dat. Radek "json (str)" je puvodni
+#        postup pres text: json.dumps -> str, odpoved response.text -> json.loads.
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import argparse
+import gc
+import json
+import pathlib
+import sys
+import time
+
+import fake_server
+
+REPO_PATH = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_PATH))
+
+import pyjson  # noqa: E402
+
+
+class StrJsonCodec(object):
+    """ Puvodni postup - standardni json pres str """
+
+    name = "json (str)"
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value)
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data.decode("utf-8"))
+
+
+def build_payloads(devices, chunk_size, batch_size):
+    """
+    Vytvori data ve tvaru odpovedi a pozadavku API z fake_server
+    Parameters:
+        devices: pocet zarizeni (a hostu v Zabbixu)
+        chunk_size: pocet polozek v jednom getMultipleItems
+        batch_size: pocet volani v jedne davce host.update
+    """
+    state = fake_server.FakeState(fake_server.generate_devices(devices))
+    group_id = next(iter(state.groups.values()))
+    template_id = next(iter(state.templates.values()))
+    proxy_ids = list(state.proxies.values())
+
+    state.host_create(
+        [
+            {
+                "host": device["name"],
+                "proxy_hostid": proxy_ids[index % len(proxy_ids)],
+                "groups": [{"groupid": group_id}],
+                "templates": [{"templateid": template_id}],
+                "interfaces": [
+                    {
+                        "type": 2,
+                        "main": 1,
+                        "useip": 0,
+                        "ip": device["ip"],
+                        "dns": device["name"] + ".example.com",
+                        "port": "161",
+                    }
+                ],
+            }
+            for index, device in enumerate(state.devices.values())
+        ]
+    )
+
+    host_get = state.host_get(
+        {
+            "proxyids": proxy_ids,
+            "selectParentTemplates": ["name"],
+            "selectGroups": ["name"],
+            "selectInterfaces": ["dns", "port", "ip", "interfaceid"],
+        }
+    )
+    devices_sorted = [state.devices[i] for i in sorted(state.devices)]
+
+    return {
+        "host.get": {"jsonrpc": "2.0", "result": host_get, "id": 1},
+        "networkequipment": [
+            state.glpi_item(device, with_ports=False) for device in devices_sorted
+        ],
+        "getMultipleItems": [
+            state.glpi_item(device) for device in devices_sorted[:chunk_size]
+        ],
+        "host.update batch": [
+            {
+                "jsonrpc": "2.0",
+                "method": "host.update",
+                "params": {
+                    "hostid": host["hostid"],
+                    "proxy_hostid": host["proxy_hostid"],
+                    "groups": [{"groupid": group_id}],
+                },
+                "auth": "0424bd59b807674191e7d77572075f33",
+                "id": index,
+            }
+            for index, host in enumerate(host_get[:batch_size])
+        ],
+    }
+
+
+def best_time(function, value, repeat):
+    """ Nejkratsi cas z repeat opakovani v sekundach (bez garbage collectoru jako timeit) """
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(value)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best
+
+
+def bench_codecs(payloads, codecs, repeat):
+    """
+    Zmeri vsechny kodeky na vsech datech
+    Parameters:
+        payloads: nazev:data
+        codecs: seznam kodeku (dumps, loads, name)
+        repeat: pocet opakovani, pocita se nejkratsi
+    """
+    results = []
+
+    for payload_name, value in payloads.items():
+        # vstup pro loads je u vsech kodeku stejny - odpoved serveru
+        data = json.dumps(value).encode("utf-8")
+        baseline = None
+
+        for codec in codecs:
+            encoded = codec.dumps(value)
+            if codec.loads(data) != value:
+                raise ValueError(f"{codec.name}: {payload_name} se lisi po loads")
+
+            dumps_seconds = best_time(codec.dumps, value, repeat)
+            loads_seconds = best_time(codec.loads, data, repeat)
+            total = dumps_seconds + loads_seconds
+            if baseline is None:
+                baseline = total
+
+            results.append(
+                {
+                    "payload": payload_name,
+                    "codec": codec.name,
+                    "bytes": len(encoded),
+                    "dumps_ms": round(dumps_seconds * 1000, 2),
+                    "loads_ms": round(loads_seconds * 1000, 2),
+                    "speedup": round(baseline / total, 2),
+                }
+            )
+
+    return results
+
+
+def print_table(results):
+    columns = (
+        ("payload", "data"),
+        ("codec", "kodek"),
+        ("bytes", "velikost [B]"),
+        ("dumps_ms", "dumps [ms]"),
+        ("loads_ms", "loads [ms]"),
+        ("speedup", "zrychleni"),
+    )
+    rows = [[title for _, title in columns]]
+    rows.extend([str(result[key]) for key, _ in columns] for result in results)
+    widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mereni kodeku JSON (pyjson)")
+    parser.add_argument(
+        "--devices", type=int, default=10000, help="pocet zarizeni a hostu"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=50, help="pocet polozek v getMultipleItems"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="pocet volani v davce host.update"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="pocet opakovani, pocita se nejkratsi"
+    )
+    parser.add_argument("--json", metavar="FILE", help="ulozit vysledky jako JSON")
+    options = parser.parse_args()
+
+    codecs = [StrJsonCodec()]
+    codecs.extend(codec() for codec in reversed(list(pyjson.CODECS.values())))
+
+    results = bench_codecs(
+        build_payloads(options.devices, options.chunk_size, options.batch_size),
+        codecs,
+        options.repeat,
+    )
+
+    print_table(results)
+
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
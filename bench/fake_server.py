@@ -0,0 +1,528 @@
+# Popis: Lokalni nahrada GLPI REST API a Zabbix JSON-RPC API pro mereni vykonu
+#        synchronizace. Implementuje jen cast API, kterou pouzivaji pyglpi a pyzabbix,
+#        s nastavitelnou latenci a nahodnymi chybami
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import argparse
+import collections
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GLPI_PATH = "/glpi/apirest.php"
+ZABBIX_PATH = "/zabbix/api_jsonrpc.php"
+
+# metody Zabbixu volane bez auth
+UNAUTHENTICATED_METHODS = (
+    "user.login",
+    "user.authenticate",
+    "user.checkAuthentication",
+    "apiinfo.version",
+)
+
+
+def generate_devices(count, proxies=4, multi_interface_ratio=0.05, seed=42):
+    """
+    Vygeneruje zarizeni v GLPI rozdelena mezi proxy
+    Parameters:
+        count: pocet zarizeni
+        proxies: pocet proxy (proxy-0 .. proxy-N)
+        multi_interface_ratio: podil zarizeni se dvema rozhranimi
+        seed: seed generatoru nahodnych cisel
+    """
+    rnd = random.Random(seed)
+    devices = {}
+
+    for device_id in range(1, count + 1):
+        name = f"dev{device_id:06d}"
+        interfaces = 2 if rnd.random() < multi_interface_ratio else 1
+        devices[device_id] = {
+            "id": device_id,
+            "name": name,
+            "is_template": 0,
+            "is_deleted": 0,
+            "date_mod": "2018-01-01 00:00:00",
+            "networks_id": f"proxy-{device_id % proxies}",
+            "groups_id": f"group-{device_id % 5} > sub-{device_id % 3}",
+            "domains_id": f"domain-{device_id % 3}",
+            "interfaces": [
+                f"{name}---if{i}" if interfaces > 1 else name
+                for i in range(interfaces)
+            ],
+            "ip": "10.{}.{}.{}".format(
+                (device_id >> 16) & 255, (device_id >> 8) & 255, device_id & 255
+            ),
+        }
+
+    return devices
+
+
+class FakeState:
+    """ Stav obou API (zarizeni v GLPI, hosty v Zabbixu) a citace pozadavku """
+
+    def __init__(self, devices, proxies=4, latency=0.0, error_rate=0.0, seed=42):
+        """
+        Parameters:
+            devices: zarizeni z generate_devices
+            proxies: pocet proxy v Zabbixu (zbx-proxy-0 .. zbx-proxy-N)
+            latency: zpozdeni kazdeho HTTP pozadavku v sekundach
+            error_rate: podil volani, ktera skonci chybou (0 - 1)
+            seed: seed generatoru nahodnych cisel
+        """
+        self.lock = threading.Lock()
+        self.devices = devices
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = collections.Counter()
+        self.bytes_sent = 0
+        self.sessions = set()
+        self.auth_tokens = set()
+
+        self.next_id = 1000
+        self.proxies = {f"zbx-proxy-{i}": str(100 + i) for i in range(proxies)}
+        self.groups = {f"group-{i}": str(200 + i) for i in range(5)}
+        self.templates = {f"domain-{i}": str(300 + i) for i in range(3)}
+        self.hosts = {}
+        # nazvy hostu, ktere host.create odmitne (simulace chyby jednoho hosta)
+        self.rejected = set()
+
+    def new_id(self):
+        self.next_id += 1
+        return str(self.next_id)
+
+    def churn(
+        self, modified=0, added=0, removed=0, touched=0, now="2030-01-01 00:00:00"
+    ):
+        """
+        Zmeni zarizeni v GLPI
+        Parameters:
+            modified: pocet upravenych zarizeni (zmena IP, u ctvrtiny i proxy)
+            added: pocet novych zarizeni
+            removed: pocet smazanych zarizeni
+            touched: pocet zarizeni se zmenou jen date_mod (nesynchronizovane udaje)
+            now: date_mod zmenenych zarizeni
+        """
+        with self.lock:
+            ids = sorted(self.devices)
+            for device_id in self.random.sample(ids, min(touched, len(ids))):
+                self.devices[device_id]["date_mod"] = now
+            for device_id in self.random.sample(ids, min(modified, len(ids))):
+                device = self.devices[device_id]
+                device["date_mod"] = now
+                device["ip"] = "172.16." + device["ip"].split(".", 2)[2]
+                if self.random.random() < 0.25:
+                    proxy = int(device["networks_id"].split("-")[1])
+                    device["networks_id"] = f"proxy-{(proxy + 1) % len(self.proxies)}"
+            for device_id in self.random.sample(ids, min(removed, len(ids))):
+                self.devices[device_id]["is_deleted"] = 1
+            start = max(ids) + 1 if ids else 1
+            extra = generate_devices(start + added - 1)
+            for device_id in range(start, start + added):
+                extra[device_id]["date_mod"] = now
+                self.devices[device_id] = extra[device_id]
+
+    # GLPI ############################################################################################
+
+    def glpi_item(self, device, with_ports=True):
+        item = {
+            key: device[key]
+            for key in (
+                "id",
+                "name",
+                "is_template",
+                "is_deleted",
+                "date_mod",
+                "networks_id",
+                "groups_id",
+                "domains_id",
+            )
+        }
+        if with_ports:
+            item["_networkports"] = {
+                "NetworkPortEthernet": [
+                    {
+                        "NetworkName": {
+                            "name": interface,
+                            "FQDN": {"fqdn": "example.com"},
+                            "IPAddress": [{"name": device["ip"]}],
+                        }
+                    }
+                    for interface in device["interfaces"]
+                ]
+            }
+        return item
+
+    def glpi(self, path, params, headers):
+        command = path[len(GLPI_PATH) :].strip("/")
+
+        if command == "initSession":
+            token = f"session-{len(self.sessions)}"
+            self.sessions.add(token)
+            return 200, {"session_token": token}, {}
+
+        if headers.get("Session-Token") not in self.sessions:
+            return 401, ["ERROR_SESSION_TOKEN_INVALID", "session"], {}
+
+        if command == "killSession":
+            self.sessions.discard(headers.get("Session-Token"))
+            return 200, [], {}
+
+        if command in ("getFullSession", "getActiveProfile"):
+            return 200, {"session": {}}, {}
+
+        if command.lower() == "networkequipment":
+            devices = [self.devices[i] for i in sorted(self.devices)]
+            return self.glpi_range(
+                [self.glpi_item(d, with_ports=False) for d in devices], params
+            )
+
+        match = re.fullmatch(r"(?i)networkequipment/(\d+)", command)
+        if match:
+            device = self.devices.get(int(match.group(1)))
+            if device is None:
+                return 404, ["ERROR_ITEM_NOT_FOUND", ""], {}
+            return 200, self.glpi_item(device), {}
+
+        if command == "getMultipleItems":
+            items = []
+            index = 0
+            while f"items[{index}][items_id]" in params:
+                device = self.devices.get(int(params[f"items[{index}][items_id]"]))
+                items.append(
+                    self.glpi_item(device)
+                    if device
+                    else ["ERROR_ITEM_NOT_FOUND", ""]
+                )
+                index += 1
+            return 200, items, {}
+
+        if command == "search/NetworkEquipment":
+            since = params.get("criteria[0][value]", "")
+            rows = [
+                {
+                    "1": d["name"],
+                    "2": d["id"],
+                    "19": d["date_mod"],
+                    "32": d["networks_id"],
+                }
+                for _, d in sorted(self.devices.items())
+                if d["date_mod"] > since and not d["is_deleted"]
+            ]
+            status, page, response_headers = self.glpi_range(rows, params)
+            return (
+                200,
+                {"totalcount": len(rows), "count": len(page), "data": page},
+                response_headers,
+            )
+
+        return 400, ["ERROR_RESOURCE_NOT_FOUND_NOR_COMMONDBTM", command], {}
+
+    @staticmethod
+    def glpi_range(items, params):
+        start, end = (int(x) for x in params.get("range", "0-49").split("-"))
+        page = items[start : end + 1]
+        headers = {
+            "Content-Range": f"{start}-{start + len(page) - 1}/{len(items)}",
+            "Accept-Range": "NetworkEquipment 1000",
+        }
+        return (206 if len(page) < len(items) else 200), page, headers
+
+    # Zabbix ##########################################################################################
+
+    def zabbix_call(self, request):
+        method = request.get("method")
+        params = request.get("params")
+        self.requests["zabbix " + method] += 1
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            return {"code": -32500, "message": "Injected error", "data": method}, None
+
+        if (
+            method not in UNAUTHENTICATED_METHODS
+            and request.get("auth") not in self.auth_tokens
+        ):
+            return self.zabbix_error("Not authorised."), None
+
+        try:
+            result = self.zabbix_method(method, params)
+        except ValueError as error:
+            return self.zabbix_error(str(error)), None
+
+        return None, result
+
+    @staticmethod
+    def zabbix_error(data):
+        return {"code": -32602, "message": "Invalid params.", "data": data}
+
+    def zabbix_method(self, method, params):
+        if method in ("user.login", "user.authenticate"):
+            token = f"auth-{len(self.auth_tokens)}"
+            self.auth_tokens.add(token)
+            return token
+        if method == "user.checkAuthentication":
+            if params.get("sessionid") not in self.auth_tokens:
+                raise ValueError("Session terminated, re-login, please.")
+            return {"userid": "1"}
+        if method == "apiinfo.version":
+            return "4.0.0"
+        if method == "template.get":
+            return [{"host": n, "templateid": i} for n, i in self.templates.items()]
+        if method == "hostgroup.get":
+            return [{"name": n, "groupid": i} for n, i in self.groups.items()]
+        if method == "host.get":
+            return self.host_get(params)
+        if method == "host.create":
+            return self.host_create(params)
+        if method == "host.delete":
+            for hostid in params:
+                self.hosts.pop(str(hostid), None)
+            return {"hostids": list(params)}
+        if method == "host.update":
+            return self.host_update(params if isinstance(params, list) else [params])
+        if method == "host.massupdate":
+            return self.host_update(
+                [
+                    dict(params, hostid=h["hostid"])
+                    for h in params.get("hosts", [])
+                ]
+            )
+        if method == "hostinterface.update":
+            return self.interface_update(
+                params if isinstance(params, list) else [params]
+            )
+        raise ValueError(f"Unknown method {method}")
+
+    def host_get(self, params):
+        if params.get("proxy_hosts"):
+            return [{"host": n, "hostid": i} for n, i in self.proxies.items()]
+
+        hosts = self.hosts.values()
+        if "proxyids" in params:
+            proxy_ids = params["proxyids"]
+            proxy_ids = set(proxy_ids if isinstance(proxy_ids, list) else [proxy_ids])
+            hosts = [h for h in hosts if h["proxy_hostid"] in proxy_ids]
+        if "filter" in params and "host" in params["filter"]:
+            names = params["filter"]["host"]
+            names = set(names if isinstance(names, list) else [names])
+            hosts = [h for h in hosts if h["host"] in names]
+
+        result = []
+        for host in hosts:
+            row = {"hostid": host["hostid"], "host": host["host"], "name": host["host"]}
+            row["proxy_hostid"] = host["proxy_hostid"]
+            if "selectGroups" in params:
+                row["groups"] = [
+                    {"groupid": g, "name": self.name_of(self.groups, g)}
+                    for g in host["groups"]
+                ]
+            if "selectParentTemplates" in params:
+                row["parentTemplates"] = [
+                    {"templateid": t, "name": self.name_of(self.templates, t)}
+                    for t in host["templates"]
+                ]
+            if "selectInterfaces" in params:
+                row["interfaces"] = [dict(i) for i in host["interfaces"]]
+            result.append(row)
+        return result
+
+    @staticmethod
+    def name_of(mapping, item_id):
+        for name, mapped_id in mapping.items():
+            if mapped_id == item_id:
+                return name
+        return ""
+
+    def host_create(self, params):
+        params = params if isinstance(params, list) else [params]
+        names = [p["host"] for p in params]
+        existing = {h["host"] for h in self.hosts.values()}
+        for name in names:
+            if name in self.rejected:
+                raise ValueError(f'Invalid parameter "/1/host": host "{name}" rejected.')
+            if name in existing or names.count(name) > 1:
+                raise ValueError(f'Host with the same name "{name}" already exists.')
+        hostids = []
+        for p in params:
+            hostid = self.new_id()
+            interface = dict(p["interfaces"][0], interfaceid=self.new_id())
+            self.hosts[hostid] = {
+                "hostid": hostid,
+                "host": p["host"],
+                "proxy_hostid": str(p.get("proxy_hostid", "0")),
+                "groups": [g["groupid"] for g in p.get("groups", [])],
+                "templates": [t["templateid"] for t in p.get("templates", [])],
+                "interfaces": [interface],
+            }
+            hostids.append(hostid)
+        return {"hostids": hostids}
+
+    def host_update(self, params_list):
+        for params in params_list:
+            host = self.hosts.get(str(params.get("hostid")))
+            if host is None:
+                raise ValueError(
+                    "No permissions to referred object or it does not exist!"
+                )
+            if "proxy_hostid" in params:
+                host["proxy_hostid"] = str(params["proxy_hostid"])
+            if "groups" in params:
+                host["groups"] = [g["groupid"] for g in params["groups"]]
+            if "templates" in params:
+                host["templates"] = [t["templateid"] for t in params["templates"]]
+        return {"hostids": [str(p.get("hostid")) for p in params_list]}
+
+    def interface_update(self, params_list):
+        for params in params_list:
+            for host in self.hosts.values():
+                for interface in host["interfaces"]:
+                    if interface["interfaceid"] == str(params.get("interfaceid")):
+                        interface.update(
+                            {k: v for k, v in params.items() if k != "interfaceid"}
+                        )
+        return {"interfaceids": [str(p.get("interfaceid")) for p in params_list]}
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """ GET na GLPI_PATH = GLPI REST, POST na ZABBIX_PATH = Zabbix JSON-RPC (i batch) """
+
+    # keep-alive jako skutecne servery
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data, compresslevel=1)
+            headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.state.lock:
+            self.state.bytes_sent += len(data)
+
+    def delay(self):
+        if self.state.latency:
+            time.sleep(self.state.latency)
+
+    def do_GET(self):
+        self.delay()
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+
+        if not url.path.startswith(GLPI_PATH):
+            return self.send_json(404, ["NOT_FOUND"])
+
+        command = url.path[len(GLPI_PATH) :].strip("/")
+        counter = re.sub(r"/\d+$", "/<id>", command)
+
+        state = self.state
+
+        with state.lock:
+            state.requests["glpi " + counter] += 1
+            if state.error_rate and state.random.random() < state.error_rate:
+                status, body, headers = 500, ["ERROR_INJECTED", ""], {}
+            else:
+                status, body, headers = state.glpi(url.path, params, self.headers)
+
+        self.send_json(status, body, headers)
+
+    def do_POST(self):
+        self.delay()
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"null")
+
+        if not self.path.startswith(ZABBIX_PATH):
+            return self.send_json(404, {})
+
+        calls = request if isinstance(request, list) else [request]
+        responses = []
+
+        with self.state.lock:
+            self.state.requests["zabbix http"] += 1
+            for call in calls:
+                error, result = self.state.zabbix_call(call)
+                response = {"jsonrpc": "2.0", "id": call.get("id")}
+                if error:
+                    response["error"] = error
+                else:
+                    response["result"] = result
+                responses.append(response)
+
+        self.send_json(200, responses if isinstance(request, list) else responses[0])
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state):
+        super().__init__(address, FakeHandler)
+        self.state = state
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(state, host="127.0.0.1", port=0):
+    """
+    Spusti server ve vlakne na pozadi, vraci instanci serveru
+    Parameters:
+        state: FakeState
+        host: adresa
+        port: port (0 = libovolny volny)
+    """
+    server = FakeServer((host, port), state)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokalni GLPI a Zabbix API")
+    parser.add_argument("--devices", type=int, default=1000, help="pocet zarizeni")
+    parser.add_argument("--proxies", type=int, default=4, help="pocet proxy")
+    parser.add_argument(
+        "--multi-interface",
+        type=float,
+        default=0.05,
+        help="podil zarizeni se dvema rozhranimi",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="zpozdeni pozadavku v sekundach"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="podil chybnych volani (0 - 1)"
+    )
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    fake_state = FakeState(
+        generate_devices(args.devices, args.proxies, args.multi_interface),
+        proxies=args.proxies,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    fake_server = FakeServer(("127.0.0.1", args.port), fake_state)
+    print(f"GLPI: {fake_server.base_url}{GLPI_PATH}")
+    print(f"Zabbix: {fake_server.base_url}/zabbix")
+    fake_server.serve_forever()
@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+
+# Popis: Mereni vykonu synchronizace proti lokalnimu GLPI a Zabbixu (fake_server)
+#        Pro kazdou velikost spusti zbximport.py jako samostatny proces: prvni import
+#        (prazdny Zabbix), behy bez zmen a behy po zmenach v GLPI. Vypise cas behu,
+#        pocty pozadavku na obe API, prenesena data a maximalni pamet (RSS) procesu.
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import argparse
+import configparser
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+import fake_server
+
+REPO_PATH = pathlib.Path(__file__).resolve().parent.parent
+SCRIPT = REPO_PATH / "zbximport.py"
+
+
+def write_config(work_dir, server, proxies, engine, extra):
+    """
+    Vytvori config.ini pro beh proti fake serveru (z config.ini v repozitari)
+    Parameters:
+        work_dir: adresar behu (log, stav, metriky)
+        server: FakeServer
+        proxies: pocet proxy
+        engine: sync nebo async
+        extra: dalsi nastaveni - {(sekce, klic): hodnota}
+    """
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(REPO_PATH / "config.ini", encoding="utf-8")
+
+    settings = {
+        ("logging", "log-level"): "info",
+        ("logging", "file-max-bytes"): "10000000",
+        ("glpi-server", "url"): server.base_url + fake_server.GLPI_PATH,
+        ("zabbix-server", "url"): server.base_url + "/zabbix",
+        ("misc", "engine"): engine,
+        ("misc", "token-cache"): "",
+        ("metrics", "textfile"): "",
+    }
+    settings.update(extra)
+
+    for (section, key), value in settings.items():
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, key, value)
+
+    config.remove_section("proxy-list")
+    config.add_section("proxy-list")
+    for index in range(proxies):
+        config.set("proxy-list", f"proxy-{index}", None)
+
+    config_path = work_dir / "config.ini"
+    with open(config_path, "w", encoding="utf-8") as config_file:
+        config.write(config_file)
+
+    return config_path
+
+
+def run_import(config_path, state, label, args=()):
+    """
+    Spusti jeden import a vrati namerene hodnoty
+    Parameters:
+        config_path: cesta ke config.ini
+        state: FakeState - citace pozadavku
+        label: nazev behu
+        args: dalsi parametry pro zbximport.py
+    """
+    with state.lock:
+        state.requests.clear()
+        state.bytes_sent = 0
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, str(SCRIPT), "--config", str(config_path), *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    stderr = process.stderr.read()
+    # wait4 vraci spotrebu prostredku prave tohoto procesu (ru_maxrss v KiB na Linuxu)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+
+    if process.returncode != 0:
+        print(stderr.decode("utf-8", "replace")[-2000:], file=sys.stderr)
+
+    with state.lock:
+        requests = dict(state.requests)
+        sent = state.bytes_sent
+
+    return {
+        "run": label,
+        "returncode": process.returncode,
+        "wall_seconds": round(elapsed, 3),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "max_rss_kib": usage.ru_maxrss,
+        "glpi_requests": sum(v for k, v in requests.items() if k.startswith("glpi ")),
+        "zabbix_http_requests": requests.get("zabbix http", 0),
+        "zabbix_calls": sum(
+            v
+            for k, v in requests.items()
+            if k.startswith("zabbix ") and k != "zabbix http"
+        ),
+        "response_bytes": sent,
+        "requests": requests,
+        "hosts": len(state.hosts),
+    }
+
+
+def bench_size(options, devices):
+    """
+    Cely scenar pro jednu velikost: prvni import, behy bez zmen, behy po zmenach
+    Parameters:
+        options: parametry prikazove radky
+        devices: pocet zarizeni
+    """
+    state = fake_server.FakeState(
+        fake_server.generate_devices(
+            devices, options.proxies, options.multi_interface
+        ),
+        proxies=options.proxies,
+        latency=options.latency,
+        error_rate=options.error_rate,
+    )
+    server = fake_server.start_server(state)
+    churn = max(1, int(devices * options.churn))
+    touch = int(devices * options.touch)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="zbximport-bench-") as work_dir:
+            config_path = write_config(
+                pathlib.Path(work_dir),
+                server,
+                options.proxies,
+                options.engine,
+                {("misc", "full-sync-interval"): str(options.full_sync_interval)},
+            )
+
+            results = [run_import(config_path, state, "first")]
+
+            for index in range(options.no_change_runs):
+                results.append(run_import(config_path, state, f"no-change-{index + 1}"))
+
+            for index in range(options.churn_runs):
+                state.churn(
+                    modified=churn,
+                    added=churn // 2,
+                    removed=churn // 4,
+                    touched=touch,
+                    now=f"2030-01-01 00:00:{index:02d}",
+                )
+                results.append(run_import(config_path, state, f"churn-{index + 1}"))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for result in results:
+        result["devices"] = devices
+
+    return results
+
+
+def print_table(results):
+    columns = (
+        ("devices", "zarizeni"),
+        ("run", "beh"),
+        ("wall_seconds", "cas [s]"),
+        ("cpu_seconds", "CPU [s]"),
+        ("max_rss_kib", "RSS [KiB]"),
+        ("glpi_requests", "GLPI"),
+        ("zabbix_http_requests", "Zabbix HTTP"),
+        ("zabbix_calls", "Zabbix volani"),
+        ("response_bytes", "prijato [B]"),
+        ("returncode", "rc"),
+    )
+    rows = [[title for _, title in columns]]
+    rows.extend([str(result[key]) for key, _ in columns] for result in results)
+    widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mereni vykonu zbximport.py")
+    parser.add_argument(
+        "--devices",
+        default="1000",
+        help="pocty zarizeni oddelene carkou (napr. 1000,10000,100000)",
+    )
+    parser.add_argument("--proxies", type=int, default=4, help="pocet proxy")
+    parser.add_argument(
+        "--multi-interface",
+        type=float,
+        default=0.05,
+        help="podil zarizeni se dvema rozhranimi",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="zpozdeni pozadavku v sekundach"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="podil chybnych volani (0 - 1)"
+    )
+    parser.add_argument("--engine", default="sync", choices=("sync", "async", "pipeline"))
+    parser.add_argument(
+        "--no-change-runs", type=int, default=2, help="pocet behu bez zmen"
+    )
+    parser.add_argument(
+        "--churn-runs", type=int, default=2, help="pocet behu po zmenach"
+    )
+    parser.add_argument(
+        "--churn", type=float, default=0.01, help="podil zmenenych zarizeni pred behem"
+    )
+    parser.add_argument(
+        "--touch",
+        type=float,
+        default=0.0,
+        help="podil zarizeni se zmenou jen date_mod pred behem po zmenach",
+    )
+    parser.add_argument(
+        "--full-sync-interval",
+        type=int,
+        default=86400,
+        help="[misc] full-sync-interval pro behy (0 = vzdy plny export)",
+    )
+    parser.add_argument("--json", metavar="FILE", help="ulozit vysledky jako JSON")
+    options = parser.parse_args()
+
+    results = []
+    for devices in (int(count) for count in options.devices.split(",")):
+        results.extend(bench_size(options, devices))
+
+    print_table(results)
+
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# Popis: Asynchronni (asyncio) klienti pro GLPI a Zabbix API a asynchronni synchronizace GLPI -> Zabbix
+#        Blokujici klienti (GlpiConnector, ZabbixAPI) bezi v poolu vlaken, soubeznost omezuji semafory,
+#        takze se cteni z GLPI a zapisy do Zabbixu prekryvaji
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+
+# Zabbix API + funkce
+import pyzabbix
+
+# stav synchronizace hostu
+import pystate
+
+# polozky planu - spolecne s postupnou synchronizaci
+import pyplan
+
+# metriky pro Prometheus
+from pymetrics import REGISTRY
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class AsyncClient:
+    """ Zaklad asynchronniho klienta - vola metody blokujiciho klienta v poolu vlaken pod semaforem """
+
+    def __init__(self, client, concurrency=8):
+        """
+        Parameters:
+            client: blokujici klient (GlpiConnector, ZabbixAPI)
+            concurrency: maximalni pocet soubeznych pozadavku
+        """
+        self.client = client
+        self.concurrency = max(1, int(concurrency))
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.concurrency
+        )
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # semafor se vytvari az uvnitr bezici smycky
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def call(self, function, *args, **kwargs):
+        """ Zavola blokujici funkci ve vlakne a pocka na vysledek
+            Parameters:
+                function: volana funkce
+                args, kwargs: jeji parametry
+        """
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(function, *args, **kwargs)
+            )
+
+    def close(self):
+        """ Ukonci pool vlaken """
+        self.executor.shutdown(wait=True)
+
+
+class AsyncGlpiConnector(AsyncClient):
+    """ Asynchronni GLPI connector nad GlpiConnector """
+
+    async def init_session(self):
+        return await self.call(self.client.init_session)
+
+    async def kill_session(self):
+        return await self.call(self.client.kill_session)
+
+    async def get_items_network_ports(self, item_ids):
+        return await self.call(self.client.get_items_network_ports, item_ids)
+
+    async def get_item_parameters(self, item_id):
+        return await self.call(self.client.get_item_parameters, item_id)
+
+    async def construct_list(self, iter_dict, data_dict, failed=None):
+        return await self.call(
+            self.client.construct_list, iter_dict, data_dict, failed=failed
+        )
+
+    def parse_item_parameters(self, network_item):
+        # jen zpracovani dat, bez pozadavku na API
+        return self.client.parse_item_parameters(network_item)
+
+
+class AsyncZabbixAPI(AsyncClient):
+    """ Asynchronni Zabbix API nad ZabbixAPI - volani: await azapi.host.get(...) """
+
+    async def login(self, user="", password=""):
+        return await self.call(self.client.login, user, password)
+
+    async def do_request(self, method, params=None):
+        return await self.call(self.client.do_request, method, params)
+
+    def __getattr__(self, attr):
+        """Dynamically create an object class (ie: host)"""
+        return AsyncZabbixAPIObjectClass(attr, self)
+
+
+class AsyncZabbixAPIObjectClass(object):
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+
+    def __getattr__(self, attr):
+        """Dynamically create a coroutine method (ie: get)"""
+
+        async def new_fn(*args, **kwargs):
+            if args and kwargs:
+                raise TypeError("Found both args and kwargs")
+
+            response = await self.parent.do_request(
+                "{0}.{1}".format(self.name, attr), args or kwargs
+            )
+            return response["result"]
+
+        return new_fn
+
+
+class AsyncSyncDriver:
+    """ Asynchronni synchronizace GLPI -> Zabbix
+        Export z GLPI a nacteni dat ze Zabbixu bezi soubezne, porovnani je stejne jako
+        u postupne synchronizace (pyplan.diff_export) a nasledne mazani, vytvareni a upravy
+        hostu bezi soubezne pod semafory klientu.
+    """
+
+    def __init__(
+        self,
+        glpi,
+        zabbix,
+        proxy_list,
+        sync_state,
+        last_import_time,
+        create_chunk_size=1,
+        batch_size=100,
+        mass_update_min_hosts=2,
+        since=None,
+    ):
+        """
+        Parameters:
+            glpi: AsyncGlpiConnector s otevrenou session
+            zabbix: AsyncZabbixAPI s prihlasenim
+            proxy_list: seznam proxy v GLPI (bez prefixu "zbx-")
+            sync_state: pystate.SyncStateStore
+            last_import_time: cas posledniho importu pro hosty, kteri nejsou ve stavu synchronizace
+            create_chunk_size: pocet hostu vytvorenych jednim volanim host.create
+            batch_size: maximalni pocet volani v jednom batch pozadavku
+            mass_update_min_hosts: nejmensi pocet hostu se stejnou zmenou pro host.massupdate
+            since: pokud je zadan, ziskaji se z GLPI jen polozky zmenene po tomto case (bez mazani)
+        """
+        self.glpi = glpi
+        self.zabbix = zabbix
+        self.proxy_list = proxy_list
+        self.sync_state = sync_state
+        self.last_import_time = last_import_time
+        self.create_chunk_size = max(1, int(create_chunk_size))
+        self.batch_size = batch_size
+        self.mass_update_min_hosts = mass_update_min_hosts
+        self.since = since
+
+        # pyplan.GlpiExport - az po export_glpi
+        self.export = None
+
+        self.zbx_proxies = {}
+        self.zbx_groups = {}
+        self.zbx_templates = {}
+        self.inventory = None
+        # stav hostu z minulych behu (sync_state.load_all) - az pred porovnanim
+        self.sync_states = None
+
+        self.counters = {"created": 0, "deleted": 0, "updated": 0}
+
+    @property
+    def newest_date_mod(self):
+        return self.export.newest_date_mod if self.export is not None else None
+
+    def _export_devices(self):
+        """ Export zarizeni z GLPI (bezi ve vlakne) - stejny jako u SyncEngine.export """
+        self.export = pyplan.export_devices(
+            self.glpi.client,
+            self.proxy_list,
+            self.sync_state,
+            since=self.since,
+            newest_date_mod=self.sync_state.get_meta("glpi_watermark"),
+        )
+
+    async def export_glpi(self):
+        """ Export zarizeni z GLPI """
+        with REGISTRY.phase("glpi_export"):
+            await self.glpi.call(self._export_devices)
+        logger.debug(f"Ziskano {len(self.export.no_sort)} zarizeni z GLPI")
+
+        # polozky z cache se pouziji jen se shodnym date_mod
+        item_cache = self.glpi.client.item_cache
+        if item_cache is not None:
+            item_cache.start_run(
+                {item["id"]: item["date_mod"] for item in self.export.no_sort.values()}
+            )
+
+    async def load_zabbix_reference(self):
+        """ Nacteni proxy, skupin a sablon ze Zabbixu - soubezne """
+        client = self.zabbix.client
+
+        with REGISTRY.phase("zabbix_reference"):
+            (
+                self.zbx_proxies,
+                self.zbx_groups,
+                self.zbx_templates,
+            ) = await asyncio.gather(
+                self.zabbix.call(pyzabbix.get_zabbix_items, "proxy", client),
+                self.zabbix.call(pyzabbix.get_zabbix_items, "hostgroup", client),
+                self.zabbix.call(pyzabbix.get_zabbix_items, "template", client),
+            )
+
+    async def delete_hosts(self, to_delete):
+        """ Smaze hosty, kteri jsou v Zabbixu, ale ne v GLPI - ID hostu z inventory
+            Parameters:
+                to_delete: seznam nazvu hostu
+        """
+        # multi interface nazev---rozhrani se nemaze, pokud rozhrani v GLPI stale je
+        entries = await self.glpi.call(
+            pyplan.plan_deletes,
+            self.glpi.client,
+            self.inventory,
+            self.export.no_sort,
+            to_delete,
+        )
+
+        self.counters["deleted"] += await self.zabbix.call(
+            pyplan.apply_deletes, self.zabbix.client, entries
+        )
+
+    async def create_chunk(self, chunk):
+        """ Ziska z GLPI parametry davky hostu a vytvori je v Zabbixu
+            Parameters:
+                chunk: seznam nazvu hostu
+        """
+        try:
+            failed = []
+            host_params = await self.glpi.construct_list(
+                chunk, self.export.no_sort, failed=failed
+            )
+            entries, states = pyplan.plan_creates(
+                host_params,
+                self.export.no_sort,
+                self.zbx_groups,
+                self.zbx_templates,
+                self.zbx_proxies,
+                existing=self.inventory.host_ids,
+            )
+
+            for state in states + pyplan.failed_states(self.export.no_sort, failed):
+                pyplan.record_state(self.sync_state, state)
+
+            self.counters["created"] += await self.zabbix.call(
+                pyplan.apply_creates,
+                self.zabbix.client,
+                entries,
+                self.sync_state,
+                chunk_size=self.create_chunk_size,
+            )
+        except Exception as e:
+            logger.error(f"Vyjimka: {e}")
+            self.mark_failed(chunk)
+
+    def mark_failed(self, chunk):
+        """ Zapise hostum davky neuspesnou synchronizaci - pristi beh je zkusi znovu
+            Parameters:
+                chunk: seznam nazvu hostu
+        """
+        for host_name in chunk:
+            self.sync_state.record(
+                self.export.no_sort[host_name]["id"],
+                host_name=host_name,
+                status=pystate.STATUS_FAILED,
+            )
+
+    def plan_host_update(self, host_name, network_item):
+        """ Porovna hosta v GLPI a Zabbixu (nejdriv otisk, pak index Zabbixu) - bez dotazu
+            do Zabbixu. Vraci polozku planu pro upravu nebo None.
+            Parameters:
+                host_name: nazev hosta
+                network_item: polozka z GLPI vcetne portu
+        """
+        update, state = pyplan.plan_update(
+            self.glpi.client,
+            self.inventory,
+            self.export.no_sort,
+            host_name,
+            network_item,
+            self.zbx_groups,
+            self.zbx_templates,
+            self.zbx_proxies,
+            sync_state=self.sync_state,
+            sync_states=self.sync_states,
+        )
+
+        if state is not None:
+            pyplan.record_state(self.sync_state, state)
+
+        return update
+
+    async def update_chunk(self, chunk):
+        """ Ziska z GLPI davku polozek a upravi hosty v Zabbixu - upravy cele davky
+            v batch pozadavcich, stejne zmeny vice hostu jednim host.massupdate
+            Parameters:
+                chunk: seznam nazvu hostu
+        """
+        item_ids = [self.export.no_sort[host_name]["id"] for host_name in chunk]
+
+        try:
+            network_items = await self.glpi.get_items_network_ports(item_ids)
+
+            updates = [
+                update
+                for update in (
+                    self.plan_host_update(host_name, network_item)
+                    for host_name, network_item in zip(chunk, network_items)
+                )
+                if update is not None
+            ]
+
+            if updates:
+                self.counters["updated"] += await self.zabbix.call(
+                    pyplan.apply_updates,
+                    self.zabbix.client,
+                    updates,
+                    self.sync_state,
+                    batch_size=self.batch_size,
+                    mass_update_min_hosts=self.mass_update_min_hosts,
+                )
+        except Exception as e:
+            logger.error(f"Vyjimka: {e}")
+            self.mark_failed(chunk)
+
+    def _chunks(self, host_names):
+        host_names = list(host_names)
+        size = max(self.create_chunk_size, self.glpi.client.chunk_size)
+        return [host_names[i : i + size] for i in range(0, len(host_names), size)]
+
+    async def run(self):
+        """ Provede synchronizaci, vraci citace vytvorenych, smazanych a upravenych hostu """
+        # GLPI a Zabbix soubezne - faze se meri kazda zvlast (stejne nazvy jako SyncEngine)
+        await asyncio.gather(self.export_glpi(), self.load_zabbix_reference())
+
+        with REGISTRY.phase("zabbix_reference"):
+            self.inventory = await self.zabbix.call(
+                pyzabbix.get_zabbix_inventory,
+                self.zabbix.client,
+                self.zbx_proxies,
+                proxy_ids=[
+                    self.zbx_proxies[proxy_name]
+                    for proxy_name in self.export.proxies_with_hosts
+                    if proxy_name in self.zbx_proxies
+                ],
+            )
+
+        # stejne porovnani jako u postupne synchronizace (SyncEngine.diff)
+        REGISTRY.start_phase("diff")
+        self.sync_states = self.sync_state.load_all()
+        to_delete, to_create, to_update, to_record = pyplan.diff_export(
+            self.export,
+            self.inventory,
+            self.zbx_proxies,
+            self.sync_state,
+            self.last_import_time,
+            sync_states=self.sync_states,
+        )
+
+        for state in to_record:
+            pyplan.record_state(self.sync_state, state)
+
+        # mazani, vytvareni a upravy se prekryvaji - apply je celkova doba,
+        # delete, create a update doba od zacatku do konce vsech uloh dane operace
+        REGISTRY.start_phase("apply")
+        deletes = [self.delete_hosts(to_delete)] if to_delete else []
+        creates = [self.create_chunk(chunk) for chunk in self._chunks(to_create)]
+        updates = [self.update_chunk(chunk) for chunk in self._chunks(to_update)]
+
+        await asyncio.gather(
+            self._timed("delete", deletes),
+            self._timed("create", creates),
+            self._timed("update", updates),
+        )
+        REGISTRY.end_phase()
+
+        return self.counters
+
+    async def _timed(self, phase, tasks):
+        """ Spusti ulohy soubezne a zmeri jejich celkovou dobu jako fazi phase
+            Parameters:
+                phase: nazev faze (viz MetricsRegistry.phase)
+                tasks: seznam korutin
+        """
+        with REGISTRY.phase(phase):
+            # chyba jedne ulohy nesmi zrusit ostatni - vysledky se zkontroluji az po dokonceni
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.error(f"Vyjimka: {result}")
@@ -0,0 +1,229 @@
+# Popis: Cache polozek z GLPI (vcetne portu) - v ramci behu podle ID, volitelne mezi behy
+#        na disku (SQLite) podle ID a date_mod s omezenim velikosti (LRU)
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import collections
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+# metriky pro Prometheus
+from pymetrics import REGISTRY
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# pocet ID v jednom dotazu do SQLite (limit poctu parametru)
+_QUERY_CHUNK = 500
+
+# udaje polozky a typy portu, ktere synchronizace pouziva (GlpiConnector.parse_item_parameters)
+ITEM_FIELDS = ("id", "name", "date_mod", "groups_id", "domains_id", "networks_id")
+PORT_TYPES = ("NetworkPortAlias", "NetworkPortEthernet")
+
+
+def slim_item(item):
+    """ Vrati kopii polozky jen s udaji, ktere synchronizace pouziva - ostatni udaje
+        zarizeni a portu by v cache jen zabiraly misto. Ostatni typy portu zustavaji
+        jako prazdne seznamy (parse_item_parameters zalezi na jejich poradi). Polozka
+        s portem v jinem tvaru, nez se ocekava, se vrati beze zmeny.
+        Parameters:
+            item: polozka z GLPI vcetne portu
+    """
+    try:
+        ports = {
+            port_type: [
+                {
+                    "NetworkName": {
+                        "name": port["NetworkName"]["name"],
+                        "FQDN": {"fqdn": port["NetworkName"]["FQDN"]["fqdn"]},
+                        "IPAddress": [
+                            {"name": address["name"]}
+                            for address in port["NetworkName"]["IPAddress"][:1]
+                        ],
+                    }
+                }
+                for port in (ports if port_type in PORT_TYPES else ())
+            ]
+            for port_type, ports in item["_networkports"].items()
+        }
+    except (KeyError, TypeError, AttributeError):
+        return item
+
+    slim = {key: item[key] for key in ITEM_FIELDS if key in item}
+    slim["_networkports"] = ports
+
+    return slim
+
+
+class ItemCache(object):
+    """
+    Polozky z GLPI ziskane v tomto behu (ID -> polozka) a volitelne ulozene z minulych behu
+    (ID + date_mod -> polozka). Polozka z disku se pouzije, jen pokud se jeji date_mod shoduje
+    s date_mod z aktualniho exportu (start_run) - zmenene zarizeni se stahne znovu.
+    Uklada se jen to, co synchronizace z polozky pouziva (slim_item).
+    """
+
+    def __init__(self, path=None, max_items=50000, memory_items=10000):
+        """
+        Parameters:
+            path: cesta k databazi cache, None = jen v ramci behu
+            max_items: maximalni pocet polozek na disku, nejdele nepouzite se mazou
+            memory_items: maximalni pocet polozek v pameti
+        """
+        self.path = path
+        self.max_items = max(1, int(max_items))
+        self.memory_items = max(1, int(memory_items))
+        self.lock = threading.Lock()
+
+        # ID -> polozka, poradi = posledni pouziti
+        self.memory = collections.OrderedDict()
+        # ID -> date_mod z aktualniho exportu
+        self.date_mods = {}
+        # ID pouzitych polozek z disku - cas posledniho pouziti se zapise v end_run
+        self.used = set()
+
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(str(path), check_same_thread=False)
+            with self.connection:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS item_cache ("
+                    "glpi_id TEXT PRIMARY KEY, date_mod TEXT, item TEXT, used_at REAL)"
+                )
+
+    def start_run(self, date_mods):
+        """ Zacatek behu - zapomene polozky z minuleho behu v pameti
+            Parameters:
+                date_mods: date_mod zarizeni z aktualniho exportu - ID:date_mod
+        """
+        with self.lock:
+            self.memory.clear()
+            self.used.clear()
+            self.date_mods = {
+                str(item_id): date_mod for item_id, date_mod in date_mods.items()
+            }
+
+    def get_many(self, item_ids):
+        """ Vrati polozky, ktere jsou v cache - ID:polozka
+            Parameters:
+                item_ids: seznam ID polozek
+        """
+        found = {}
+        missing = []
+
+        with self.lock:
+            for item_id in item_ids:
+                item_id = str(item_id)
+                if item_id in self.memory:
+                    self.memory.move_to_end(item_id)
+                    found[item_id] = self.memory[item_id]
+                elif item_id in self.date_mods:
+                    missing.append(item_id)
+
+            if self.connection is not None and missing:
+                for stored_id, item in self._load(missing):
+                    found[stored_id] = item
+                    self.used.add(stored_id)
+                    self._remember(stored_id, item)
+
+        REGISTRY.inc(
+            "glpi_item_cache_total",
+            len(found),
+            labels={"result": "hit"},
+            help_text="Pocet polozek z GLPI nalezenych / nenalezenych v cache",
+        )
+        REGISTRY.inc(
+            "glpi_item_cache_total",
+            len(set(map(str, item_ids))) - len(found),
+            labels={"result": "miss"},
+            help_text="Pocet polozek z GLPI nalezenych / nenalezenych v cache",
+        )
+
+        return found
+
+    def get(self, item_id):
+        """ Vrati polozku nebo None
+            Parameters:
+                item_id: ID polozky
+        """
+        return self.get_many([item_id]).get(str(item_id))
+
+    def put(self, item):
+        """ Ulozi polozku ziskanou z GLPI - bez ID (chybova odpoved) se neuklada
+            Parameters:
+                item: polozka z GLPI vcetne portu
+        """
+        if type(item) is not dict or "id" not in item:
+            return
+
+        item_id = str(item["id"])
+        item = slim_item(item)
+
+        with self.lock:
+            self._remember(item_id, item)
+
+            if self.connection is not None:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO item_cache (glpi_id, date_mod, item, used_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (item_id, item.get("date_mod"), json.dumps(item), time.time()),
+                )
+
+    def end_run(self):
+        """ Konec behu - zapise casy pouziti, smaze nejdele nepouzite polozky nad limit """
+        if self.connection is None:
+            return
+
+        with self.lock:
+            now = time.time()
+            self.connection.executemany(
+                "UPDATE item_cache SET used_at = ? WHERE glpi_id = ?",
+                ((now, item_id) for item_id in self.used),
+            )
+            removed = self.connection.execute(
+                "DELETE FROM item_cache WHERE glpi_id IN (SELECT glpi_id FROM item_cache "
+                "ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_items,),
+            ).rowcount
+            self.connection.commit()
+            self.used.clear()
+
+        if removed:
+            logger.debug(f"Z cache polozek odstraneno {removed} nejdele nepouzitych")
+
+    def close(self):
+        """ Ulozi a zavre databazi """
+        if self.connection is not None:
+            self.end_run()
+            self.connection.close()
+            self.connection = None
+
+    def _load(self, item_ids):
+        """ Nacte z disku polozky s date_mod shodnym s aktualnim exportem (pod zamkem) """
+        for start in range(0, len(item_ids), _QUERY_CHUNK):
+            chunk = item_ids[start : start + _QUERY_CHUNK]
+            rows = self.connection.execute(
+                "SELECT glpi_id, date_mod, item FROM item_cache "
+                f"WHERE glpi_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+
+            for stored_id, date_mod, item in rows:
+                if date_mod is not None and date_mod == self.date_mods.get(stored_id):
+                    try:
+                        yield stored_id, json.loads(item)
+                    except ValueError:
+                        logger.warning(f"Poskozena polozka {stored_id} v cache")
+
+    def _remember(self, item_id, item):
+        """ Ulozi polozku do pameti, nejdele nepouzite nad limit zapomene (pod zamkem) """
+        self.memory[item_id] = item
+        self.memory.move_to_end(item_id)
+
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
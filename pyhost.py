@@ -0,0 +1,131 @@
+# Popis: Kompaktni zaznamy hostu a zarizeni (__slots__) misto slovniku - pro velke pocty
+#        zarizeni, opakovane retezce (proxy, skupina, domena) jsou sdilene (sys.intern)
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import logging
+import sys
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# udaje hosta, ktere se synchronizuji z GLPI do Zabbixu (a porovnavaji)
+SYNC_FIELDS = (
+    "host_name",
+    "ip_addr",
+    "dns_name",
+    "groups_id",
+    "domains_id",
+    "zbx_proxy",
+)
+
+
+def intern_value(value):
+    """ Vrati sdilenou instanci retezce - pro hodnoty, ktere se opakuji u mnoha hostu
+        Parameters:
+            value: hodnota (prevede se na str)
+    """
+    return sys.intern(str(value))
+
+
+class Record(object):
+    """
+    Zaklad zaznamu s __slots__ - pristup jako ke slovniku (record["ip_addr"], get, keys),
+    takze funguje vsude, kde se driv pouzival slovnik. Nenastavene polozky v zaznamu nejsou.
+    """
+
+    __slots__ = ()
+
+    # nazvy polozek - v potomcich stejne jako __slots__
+    FIELDS = frozenset()
+
+    def __init__(self, **values):
+        for key, value in values.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and hasattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def copy(self):
+        new_record = self.__class__.__new__(self.__class__)
+        for key in self.keys():
+            setattr(new_record, key, getattr(self, key))
+        return new_record
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self.items() == other.items()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+class GlpiDevice(Record):
+    """ Zarizeni z exportu GLPI - ID a posledni zmena """
+
+    __slots__ = ("id", "date_mod")
+    FIELDS = frozenset(__slots__)
+
+    def __init__(self, id, date_mod):
+        self.id = id
+        self.date_mod = date_mod
+
+
+class HostRecord(Record):
+    """
+    Host - parametry z GLPI (GlpiConnector.parse_item_parameters) nebo ze Zabbixu
+    (pyzabbix.parse_zbx_host). Spolecne jsou jen SYNC_FIELDS, ostatni polozky ma jen
+    jedna strana - porovnani (DictDiffer) tak probiha jen nad synchronizovanymi udaji.
+    """
+
+    __slots__ = (
+        # spolecne
+        "host_name",
+        "dns_name",
+        "ip_addr",
+        "groups_id",
+        "domains_id",
+        "zbx_proxy",
+        # z GLPI
+        "id",
+        "name",
+        "date_mod",
+        "sub_group_id",
+        "networks_id",
+        "multi_interface",
+        # ze Zabbixu
+        "zbx_id",
+        "zbx_interface_id",
+    )
+    FIELDS = frozenset(__slots__)
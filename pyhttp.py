@@ -0,0 +1,78 @@
+# Popis: Spolecna HTTP vrstva pro GLPI a Zabbix API - sdileny pool spojeni (keep-alive), gzip, timeouty
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class PooledSession(requests.Session):
+    """ requests.Session s vychozim timeoutem pro vsechny pozadavky """
+
+    def __init__(self, timeout=None):
+        """
+        Parameters:
+            timeout: vychozi timeout - cislo nebo dvojice (connect, read), None = bez limitu
+        """
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        # pokud volajici timeout nezada (nebo preda None), pouzije se vychozi
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        return super().request(method, url, **kwargs)
+
+
+def create_session(
+    pool_connections=10,
+    pool_maxsize=10,
+    pool_block=True,
+    max_retries=0,
+    connect_timeout=None,
+    read_timeout=None,
+):
+    """
+    Vytvori session se sdilenym poolem spojeni, ktera se predava GlpiConnectoru a ZabbixAPI
+    Parameters:
+        pool_connections: pocet serveru (hostu), pro ktere se drzi pool spojeni
+        pool_maxsize: maximalni pocet otevrenych spojeni na jeden server
+        pool_block: pri vycerpani poolu cekat na volne spojeni misto otevirani dalsiho
+        max_retries: pocet opakovani pri selhani navazani spojeni
+        connect_timeout: timeout navazani spojeni v sekundach
+        read_timeout: timeout cteni odpovedi v sekundach
+    """
+
+    if connect_timeout is None and read_timeout is None:
+        timeout = None
+    else:
+        timeout = (connect_timeout, read_timeout)
+
+    session = PooledSession(timeout=timeout)
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # komprimovane odpovedi a udrzovani spojeni
+    session.headers.update(
+        {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+    )
+
+    logger.debug(
+        f"HTTP session: pool {pool_connections}x{pool_maxsize}, timeout {timeout}"
+    )
+
+    return session
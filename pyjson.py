@@ -0,0 +1,283 @@
+# Popis: Kodovani JSON pro klienty API - rychlejsi knihovna (orjson, ujson), pokud je
+#        nainstalovana, jinak standardni json. Postupne (streamove) dekodovani velkych
+#        JSON odpovedi - prvky pole se ctou a vraci jeden po druhem, v pameti neni cely
+#        text odpovedi ani cely strom objektu
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import codecs
+import json
+import logging
+import re
+
+# rychlejsi knihovny JSON - volitelne, bez nich se pouzije standardni json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# velikost casti odpovedi ctene najednou (bajty)
+CHUNK_SIZE = 65536
+
+# bile znaky mezi hodnotami dle RFC 8259
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# znaky, ktere mohou nasledovat za hodnotou
+_DELIMITERS = frozenset(" \t\n\r,:]}")
+
+
+class JsonCodec(object):
+    """
+    Kodovani JSON standardnim modulem json. dumps vraci primo bytes (UTF-8) pro telo
+    pozadavku, loads prijima bytes i str - odpoved se neprevadi na text (response.text).
+    Chyba dekodovani je ValueError u vsech kodeku.
+    """
+
+    name = "json"
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """ Kodovani JSON knihovnou orjson - serializuje primo do bytes """
+
+    name = "orjson"
+
+    @staticmethod
+    def dumps(value):
+        return orjson.dumps(value)
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """ Kodovani JSON knihovnou ujson """
+
+    name = "ujson"
+
+    @staticmethod
+    def dumps(value):
+        return ujson.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def loads(data):
+        return ujson.loads(data)
+
+
+# dostupne kodeky - nazev:trida, v poradi preference pro "auto"
+CODECS = {}
+if orjson is not None:
+    CODECS[OrjsonCodec.name] = OrjsonCodec
+if ujson is not None:
+    CODECS[UjsonCodec.name] = UjsonCodec
+CODECS[JsonCodec.name] = JsonCodec
+
+
+def get_codec(name="auto"):
+    """ Vrati kodek JSON dle nazvu, nenainstalovana knihovna = standardni json
+        Parameters:
+            name: auto (nejrychlejsi dostupny), orjson, ujson nebo json
+    """
+    name = (name or "auto").lower()
+
+    if name == "auto":
+        return next(iter(CODECS.values()))()
+
+    if name not in (OrjsonCodec.name, UjsonCodec.name, JsonCodec.name):
+        raise ValueError(f"Neznamy kodek JSON: {name}")
+
+    if name not in CODECS:
+        logger.warning(f"Knihovna {name} neni nainstalovana, pouzivam json")
+        return JsonCodec()
+
+    return CODECS[name]()
+
+
+class JsonStreamError(ValueError):
+    """ Odpoved neni platny JSON nebo nema ocekavanou strukturu """
+
+    pass
+
+
+class ArrayStream(object):
+    """
+    Prvky pole z JSON odpovedi ctene po castech (generator pres iter).
+    Pole je bud cela odpoved (GLPI networkequipment: [...]), nebo hodnota klice key
+    v objektu (Zabbix: {"jsonrpc": ..., "result": [...], "id": ...}). Ostatni clenove
+    objektu (napr. "error") jsou po precteni odpovedi v members.
+    Kazdy prvek se dekoduje samostatne (json.JSONDecoder.raw_decode), v bufferu je
+    nejvyse jedna cast odpovedi a rozpracovany prvek.
+    """
+
+    def __init__(self, chunks, key=None):
+        """
+        Parameters:
+            chunks: casti odpovedi (bytes) - napr. response.iter_content(CHUNK_SIZE)
+            key: klic pole v objektu odpovedi (None = odpoved je primo pole)
+        """
+        self.chunks = iter(chunks)
+        self.key = key
+        # ostatni clenove objektu odpovedi - nazev:hodnota
+        self.members = {}
+        # pocet vracenych prvku a prijatych bajtu
+        self.count = 0
+        self.received = 0
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    @classmethod
+    def from_response(cls, response, key=None, chunk_size=CHUNK_SIZE):
+        """ Prvky pole z odpovedi requests otevrene s stream=True
+            Parameters:
+                response: requests.Response
+                key: klic pole v objektu odpovedi (None = odpoved je primo pole)
+                chunk_size: velikost ctene casti v bajtech
+        """
+        return cls(response.iter_content(chunk_size), key)
+
+    def __iter__(self):
+        if self.key is None:
+            yield from self._array()
+        else:
+            yield from self._object()
+
+        if self._peek():
+            raise self._error("Neocekavana data za koncem odpovedi")
+
+    ##############################################################################################################
+    # Cteni #########################
+    ##############################################################################################################
+
+    def _fill(self):
+        """ Nacte dalsi cast odpovedi, zpracovany zacatek bufferu zahodi
+            Vraci False na konci odpovedi
+        """
+        if self._eof:
+            return False
+
+        for chunk in self.chunks:
+            if not chunk:
+                continue
+            self.received += len(chunk)
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer = self._buffer[self._pos :] + text
+                self._pos = 0
+                return True
+
+        self._eof = True
+        rest = self._decoder.decode(b"", final=True)
+        self._buffer = self._buffer[self._pos :] + rest
+        self._pos = 0
+        return bool(rest)
+
+    def _peek(self):
+        """ Preskoci bile znaky, vrati nasledujici znak ("" = konec odpovedi) """
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise self._error(f"Ocekavano '{char}'")
+        self._pos += 1
+
+    def _value(self):
+        """ Dekoduje jednu celou hodnotu od aktualni pozice """
+        self._peek()
+
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # hodnota muze pokracovat v dalsi casti odpovedi
+                if self._fill():
+                    continue
+                raise JsonStreamError(f"Neplatny JSON: {e}") from None
+
+            # cislo na konci bufferu muze byt useknute ("12" z "123", "1" z "1.5") -
+            # za hodnotou musi nasledovat oddelovac
+            if (
+                end == len(self._buffer) or self._buffer[end] not in _DELIMITERS
+            ) and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def _array(self):
+        """ Prvky pole od aktualni pozice (generator) """
+        self._expect("[")
+
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            item = self._value()
+            self.count += 1
+            yield item
+
+            char = self._peek()
+            if char != "," and char != "]":
+                raise self._error("Ocekavano ',' nebo ']'")
+            self._pos += 1
+            if char == "]":
+                return
+
+    def _object(self):
+        """ Prvky pole pod klicem key, ostatni clenove do members (generator) """
+        self._expect("{")
+
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            name = self._value()
+            if type(name) is not str:
+                raise self._error("Klic objektu neni retezec")
+            self._expect(":")
+
+            if name == self.key and self._peek() == "[":
+                yield from self._array()
+            else:
+                self.members[name] = self._value()
+
+            char = self._peek()
+            if char != "," and char != "}":
+                raise self._error("Ocekavano ',' nebo '}'")
+            self._pos += 1
+            if char == "}":
+                return
+
+    def _error(self, message):
+        context = self._buffer[self._pos : self._pos + 40]
+        return JsonStreamError(f"{message} (prvek {self.count}, text: {context!r})")
@@ -0,0 +1,134 @@
+# Popis: Logovani mimo hlavni vlakno (QueueHandler/QueueListener), odlozene formatovani a skryti hesel a tokenu
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import re
+
+# nazvy polozek s citlivymi udaji - hodnota se v logu nahradi
+SENSITIVE_KEYS = (
+    r"password|auth|sessionid|session[_ -]?token|user[_ -]?token|app[_ -]?token|authorization"
+)
+
+# "klic": "hodnota" nebo 'klic': 'hodnota' (JSON, slovnik, hlavicky) - hodnota
+# vcetne escapovanych uvozovek ("a\"b")
+QUOTED_SECRET = re.compile(
+    rf"""(["']?\b(?:{SENSITIVE_KEYS})\b["']?\s*[:=]\s*)(["'])(?:\\.|(?!\2)[^\\])*\2""",
+    re.IGNORECASE,
+)
+
+# klic: hodnota bez uvozovek (napr. "Session token: abc")
+PLAIN_SECRET = re.compile(
+    rf"""(\b(?:{SENSITIVE_KEYS})\b\s*[:=]\s*)(?!["'*])((?:user_token\s+)?[^\s"',}}\]]+)""",
+    re.IGNORECASE,
+)
+
+# nazev klice s citlivym udajem (cely klic, pro skryti ve strukture pred serializaci)
+SENSITIVE_KEY = re.compile(rf"(?:{SENSITIVE_KEYS})", re.IGNORECASE)
+
+REDACTED = "***"
+
+
+def redact_value(value, secret_keys=()):
+    """ Vrati kopii hodnoty, ve ktere jsou hodnoty citlivych klicu nahrazene (i vnorene)
+        Parameters:
+            value: slovnik, seznam nebo jina hodnota
+            secret_keys: dalsi klice, jejichz hodnota se skryje (napr. "result" u user.login)
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED
+            if key in secret_keys
+            or (isinstance(key, str) and SENSITIVE_KEY.fullmatch(key))
+            else redact_value(item, secret_keys)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact_value(item, secret_keys) for item in value]
+    return value
+
+
+class LazyJson:
+    """ Odlozena serializace do JSONu - provede se az pri formatovani zaznamu,
+        tedy jen pokud je zaznam opravdu zapsan (napr. jen pri DEBUG).
+        Citlive hodnoty se skryji ve strukture jeste pred serializaci.
+    """
+
+    __slots__ = ("value", "secret_keys")
+
+    def __init__(self, value, secret_keys=()):
+        """
+        Parameters:
+            value: serializovana hodnota
+            secret_keys: dalsi klice, jejichz hodnota se v logu skryje
+        """
+        self.value = value
+        self.secret_keys = secret_keys
+
+    def __str__(self):
+        return json.dumps(
+            redact_value(self.value, self.secret_keys),
+            indent=4,
+            separators=(",", ": "),
+            default=str,
+        )
+
+
+def redact(message):
+    """ Nahradi hodnoty hesel a tokenu ve zprave
+        Parameters:
+            message: text zpravy
+    """
+    message = QUOTED_SECRET.sub(rf"\1\2{REDACTED}\2", message)
+    return PLAIN_SECRET.sub(rf"\1{REDACTED}", message)
+
+
+class RedactingFilter(logging.Filter):
+    """ Filtr pro handler - zformatuje zpravu a skryje v ni hesla a tokeny """
+
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        return True
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """ QueueHandler, ktery ve volajicim vlakne jen sestavi text zpravy (getMessage,
+        vcetne LazyJson) - argumenty (slovniky) muze volajici po zalogovani zmenit.
+        Formatovani zaznamu (cas, traceback) a zapis probehne ve vlakne QueueListeneru.
+        Fronta je jen uvnitr procesu, zaznam se proto nemusi serializovat.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def start_queue_logging(logger, *handlers):
+    """ Presmeruje logovani do fronty, zapis provadi vlakno na pozadi
+        Parameters:
+            logger: logger (typicky root), kteremu se prida QueueHandler
+            handlers: handlery, ktere zapisuji (ve vlakne QueueListeneru)
+        Vraci spusteny QueueListener - zastavi se sam pri ukonceni programu
+    """
+    log_queue = queue.SimpleQueue()
+
+    logger.addHandler(LazyQueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+
+    # pri ukonceni se zapisou zbyvajici zaznamy z fronty
+    atexit.register(listener.stop)
+
+    return listener
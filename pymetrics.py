@@ -0,0 +1,284 @@
+# Popis: Metriky behu importu (pocty a doby volani API, doby fazi, prenesena data)
+#        zapisovane do textoveho souboru pro Prometheus node-exporter (textfile collector)
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# hranice histogramu doby volani API v sekundach
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+METRIC_PREFIX = "zbximport"
+
+
+class Histogram:
+    """ Histogram s pevnymi hranicemi (kumulativni pocty jako v Prometheu) """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class MetricsRegistry:
+    """ Uloziste metrik jednoho behu - citace, hodnoty (gauge) a histogramy """
+
+    def __init__(self, prefix=METRIC_PREFIX):
+        """
+        Parameters:
+            prefix: prefix nazvu vsech metrik
+        """
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """ Vynuluje vsechny metriky (napr. pred dalsim behem) """
+        with self.lock:
+            self.types = {}
+            self.helps = {}
+            self.values = {}
+            self.phase_name = None
+            self.phase_start = None
+
+    def _key(self, name, kind, help_text, labels):
+        self.types.setdefault(name, kind)
+        self.helps.setdefault(name, help_text)
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, value=1, labels=None, help_text=""):
+        """ Zvysi citac
+            Parameters:
+                name: nazev metriky (bez prefixu)
+                value: o kolik
+                labels: slovnik stitku
+                help_text: popis metriky
+        """
+        with self.lock:
+            key = self._key(name, "counter", help_text, labels)
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, labels=None, help_text=""):
+        """ Nastavi hodnotu (gauge) """
+        with self.lock:
+            key = self._key(name, "gauge", help_text, labels)
+            self.values[key] = value
+
+    def observe(self, name, value, labels=None, help_text=""):
+        """ Zaznamena hodnotu do histogramu """
+        with self.lock:
+            key = self._key(name, "histogram", help_text, labels)
+            if key not in self.values:
+                self.values[key] = Histogram()
+            self.values[key].observe(value)
+
+    def observe_request(self, api, method, duration, status, sent=0, received=0):
+        """ Zaznamena jedno volani API
+            Parameters:
+                api: glpi nebo zabbix
+                method: JSON-RPC metoda nebo prikaz GLPI
+                duration: doba volani v sekundach
+                status: ok nebo error
+                sent: odeslano bajtu (viz request_size)
+                received: prijato bajtu (viz response_size)
+        """
+        self.inc(
+            "api_requests_total",
+            labels={"api": api, "method": method, "status": status},
+            help_text="Pocet volani API",
+        )
+        self.observe(
+            "api_request_duration_seconds",
+            duration,
+            labels={"api": api, "method": method},
+            help_text="Doba volani API",
+        )
+        self.inc(
+            "api_sent_bytes_total",
+            sent,
+            labels={"api": api},
+            help_text="Odeslano bajtu na API",
+        )
+        self.observe_received(api, received)
+
+    def observe_received(self, api, received):
+        """ Zaznamena prijata data - u postupne ctenych odpovedi az po jejich precteni
+            Parameters:
+                api: glpi nebo zabbix
+                received: prijato bajtu
+        """
+        self.inc(
+            "api_received_bytes_total",
+            received,
+            labels={"api": api},
+            help_text="Prijato bajtu z API",
+        )
+
+    def start_phase(self, phase):
+        """ Zahaji fazi importu, predchozi faze se ukonci
+            Parameters:
+                phase: nazev faze (glpi_export, zabbix_reference, diff, plan, apply, pipeline, shards)
+        """
+        self.end_phase()
+        with self.lock:
+            self.phase_name = phase
+            self.phase_start = time.monotonic()
+
+    def end_phase(self):
+        """ Ukonci aktualni fazi a zaznamena jeji dobu """
+        with self.lock:
+            phase, start = self.phase_name, self.phase_start
+            self.phase_name = self.phase_start = None
+
+        if phase is None:
+            return
+
+        self._add_phase_duration(phase, time.monotonic() - start)
+
+    @contextlib.contextmanager
+    def phase(self, phase):
+        """ Zmeri dobu casti behu nezavisle na aktualni fazi (start_phase) - napr. mazani,
+            vytvareni a upravy uvnitr faze apply. Doby soubezne bezicich casti se scitaji.
+            Parameters:
+                phase: nazev casti (delete, create, update)
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._add_phase_duration(phase, time.monotonic() - start)
+
+    def _add_phase_duration(self, phase, duration):
+        # gauge - faze se muze v jednom behu opakovat, doby se scitaji
+        with self.lock:
+            key = self._key(
+                "phase_duration_seconds",
+                "gauge",
+                "Doba trvani faze importu",
+                {"phase": phase},
+            )
+            self.values[key] = self.values.get(key, 0) + duration
+
+    def render(self):
+        """ Vrati metriky v textovem formatu Prometheu """
+        lines = []
+
+        with self.lock:
+            names = sorted(self.types)
+            values = sorted(self.values.items(), key=lambda item: item[0])
+
+            for name in names:
+                full_name = f"{self.prefix}_{name}"
+                kind = self.types[name]
+                lines.append(f"# HELP {full_name} {self.helps[name] or name}")
+                lines.append(f"# TYPE {full_name} {kind}")
+
+                for (metric_name, labels), value in values:
+                    if metric_name != name:
+                        continue
+
+                    if kind == "histogram":
+                        lines.extend(self._render_histogram(full_name, labels, value))
+                    else:
+                        lines.append(
+                            f"{full_name}{self._render_labels(labels)} {_number(value)}"
+                        )
+
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, full_name, labels, histogram):
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            bucket_labels = labels + (("le", _number(bound)),)
+            yield f"{full_name}_bucket{self._render_labels(bucket_labels)} {count}"
+        inf_labels = labels + (("le", "+Inf"),)
+        yield f"{full_name}_bucket{self._render_labels(inf_labels)} {histogram.count}"
+        yield f"{full_name}_sum{self._render_labels(labels)} {_number(histogram.sum)}"
+        yield f"{full_name}_count{self._render_labels(labels)} {histogram.count}"
+
+    @staticmethod
+    def _render_labels(labels):
+        if not labels:
+            return ""
+        escaped = (
+            (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for key, value in labels
+        )
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    def write_textfile(self, path):
+        """ Atomicky zapise metriky do souboru pro node-exporter (docasny soubor + prejmenovani)
+            Parameters:
+                path: cesta k souboru *.prom
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=".zbximport.", suffix=".tmp"
+        )
+
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as temp_file:
+                temp_file.write(self.render())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+        logger.debug(f"Metriky zapsany do {path}")
+
+
+def request_size(request):
+    """ Velikost odeslaneho pozadavku v bajtech - radek pozadavku, hlavicky a telo
+        (hlavicky doplnene az pri odeslani, napr. Host, se nepocitaji)
+        Parameters:
+            request: requests.PreparedRequest (response.request)
+    """
+    size = len(f"{request.method} {request.path_url} HTTP/1.1\r\n\r\n")
+    size += sum(len(f"{name}: {value}\r\n") for name, value in request.headers.items())
+
+    body = request.body or b""
+    return size + len(body.encode("utf-8") if isinstance(body, str) else body)
+
+
+def response_size(response):
+    """ Velikost tela odpovedi v bajtech tak, jak prislo po siti (pred dekompresi gzip)
+        - Content-Length, jinak pocet bajtu prectenych z response.raw. Volat az po precteni
+        tela (u stream=True po projiti response.iter_content).
+        Parameters:
+            response: requests.Response
+    """
+    if "Content-Length" in response.headers:
+        return int(response.headers["Content-Length"])
+
+    # urllib3.HTTPResponse.tell() - bajty prectene ze spojeni, ne po dekompresi
+    tell = getattr(response.raw, "tell", None)
+    return tell() if tell is not None else 0
+
+
+def _number(value):
+    """ Cislo ve formatu pro Prometheus (bez zbytecnych desetinnych mist) """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# metriky celeho procesu - pouzivaji je GlpiConnector i ZabbixAPI
+REGISTRY = MetricsRegistry()
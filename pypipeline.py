@@ -0,0 +1,319 @@
+# Popis: Proudove zpracovani synchronizace - ziskani polozek z GLPI, sestaveni parametru
+#        a zapis do Zabbixu bezi soubezne, mezi kroky jsou fronty s omezenou delkou
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import logging
+import queue
+import threading
+
+import pyplan
+
+# metriky pro Prometheus
+from pymetrics import REGISTRY
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# konec fronty
+_DONE = object()
+
+# jak dlouho (v sekundach) cekat na frontu pred kontrolou preruseni
+_PUT_TIMEOUT = 0.5
+
+
+class PipelineError(Exception):
+    """ Chyba v nekterem z kroku pipeline """
+    pass
+
+
+class SyncPipeline(object):
+    """ Tri kroky propojene frontami:
+        fetch (GLPI getMultipleItems) -> build (parametry pro Zabbix) -> write (Zabbix API)
+        V pameti je najednou nejvyse queue_size davek v kazde fronte.
+    """
+
+    def __init__(
+        self,
+        connector,
+        zabbix_api,
+        inventory,
+        no_sort,
+        zbx_groups,
+        zbx_templates,
+        zbx_proxies,
+        sync_state=None,
+        sync_states=None,
+        create_chunk_size=1,
+        batch_size=100,
+        queue_size=4,
+        mass_update_min_hosts=2,
+    ):
+        """
+        Parameters:
+            connector: pyglpi.GlpiConnector s otevrenou session
+            zabbix_api: prihlasene API Zabbixu
+            inventory: pyzabbix.ZabbixInventory
+            no_sort: vsechna zarizeni z GLPI - nazev:{"id", "date_mod"}
+            zbx_groups: skupiny v Zabbixu - jméno:ID
+            zbx_templates: šablony v Zabbixu -  jméno:ID
+            zbx_proxies: proxy v Zabbixu - jméno:ID
+            sync_state: pystate.SyncStateStore (None = stav se nezapisuje)
+            sync_states: stav hostu z sync_state.load_all() (viz pyplan.plan_update)
+            create_chunk_size: pocet hostu vytvarenych jednim volanim host.create
+            batch_size: maximalni pocet volani v jednom batch pozadavku
+            queue_size: maximalni pocet davek cekajicich mezi kroky
+            mass_update_min_hosts: nejmensi pocet hostu se stejnou zmenou pro host.massupdate
+        """
+        self.connector = connector
+        self.zabbix_api = zabbix_api
+        self.inventory = inventory
+        self.no_sort = no_sort
+        self.zbx_groups = zbx_groups
+        self.zbx_templates = zbx_templates
+        self.zbx_proxies = zbx_proxies
+        self.sync_state = sync_state
+        self.sync_states = sync_states
+        self.create_chunk_size = max(1, create_chunk_size)
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+        self.mass_update_min_hosts = mass_update_min_hosts
+
+        # velikost davky z GLPI - jedna davka zamestna vsechny workery konektoru
+        self.fetch_size = max(1, connector.chunk_size) * max(1, connector.workers)
+
+        self._stop = threading.Event()
+        self._errors = []
+
+    def run(self, to_delete, to_create, to_update, records=None):
+        """ Provede synchronizaci, vraci citace {"created", "deleted", "updated"}
+            Parameters:
+                to_delete: nazvy hostu ke smazani
+                to_create: nazvy hostu k vytvoreni
+                to_update: nazvy hostu ke kontrole zmen
+                records: zaznamy stavu nezmenenych hostu (argumenty SyncStateStore.record)
+        """
+        for state in records or []:
+            pyplan.record_state(self.sync_state, state)
+
+        counters = {"created": 0, "deleted": 0, "updated": 0}
+
+        # mazani je jedno volani, probehne pred vytvarenim (uvolni nazvy)
+        delete_entries = pyplan.plan_deletes(
+            self.connector, self.inventory, self.no_sort, to_delete
+        )
+        with REGISTRY.phase("delete"):
+            counters["deleted"] = pyplan.apply_deletes(self.zabbix_api, delete_entries)
+
+        work = [("create", name) for name in to_create]
+        work.extend(("update", name) for name in to_update)
+
+        if not work:
+            return counters
+
+        fetched = queue.Queue(maxsize=self.queue_size)
+        built = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(
+                target=self._guard,
+                args=(self._fetch, work, fetched),
+                name="pipeline-fetch",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._guard,
+                args=(self._build, fetched, built),
+                name="pipeline-build",
+                daemon=True,
+            ),
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            created, updated = self._write(built)
+        except BaseException:
+            # zapis selhal - zastavit ostatni kroky
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            error = self._errors[0]
+            raise PipelineError(f"Pipeline prerusena: {error}") from error
+
+        counters["created"] = created
+        counters["updated"] = updated
+
+        return counters
+
+    ##############################################################################################################
+    # Kroky #########################
+    ##############################################################################################################
+
+    def _guard(self, stage, source, target):
+        """ Spusti krok, pri vyjimce zastavi pipeline a preda konec dalsimu kroku """
+        try:
+            stage(source, target)
+        except Exception as e:
+            logger.exception(f"Chyba v kroku {threading.current_thread().name}")
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            self._put(target, _DONE, force=True)
+
+    def _put(self, target, item, force=False):
+        """ Vlozi do fronty, ceka na misto jen dokud neni pipeline zastavena
+            Vraci False, pokud byla pipeline zastavena
+        """
+        while True:
+            if self._stop.is_set() and not force:
+                return False
+            try:
+                target.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                if self._stop.is_set():
+                    # nikdo uz z fronty necte
+                    return False
+
+    def _get(self, source):
+        """ Vybere z fronty, None = konec nebo zastaveni pipeline """
+        while True:
+            try:
+                item = source.get(timeout=_PUT_TIMEOUT)
+                return None if item is _DONE else item
+            except queue.Empty:
+                if self._stop.is_set():
+                    return None
+
+    def _fetch(self, work, fetched):
+        """ Ziska polozky vcetne portu z GLPI po davkach """
+        for start in range(0, len(work), self.fetch_size):
+            chunk = work[start : start + self.fetch_size]
+            network_items = self.connector.get_items_network_ports(
+                [self.no_sort[name]["id"] for _, name in chunk]
+            )
+
+            if not self._put(fetched, list(zip(chunk, network_items))):
+                return
+
+    def _build(self, fetched, built):
+        """ Z polozek GLPI sestavi polozky planu (vytvoreni, uprava) a zaznamy stavu """
+        while True:
+            chunk = self._get(fetched)
+            if chunk is None:
+                return
+
+            creates = []
+            updates = []
+            records = []
+
+            for (action, host_name), network_item in chunk:
+                if action == "create":
+                    entries, states = self._build_create(host_name, network_item)
+                    creates.extend(entries)
+                    records.extend(states)
+                    continue
+
+                update, state = pyplan.plan_update(
+                    self.connector,
+                    self.inventory,
+                    self.no_sort,
+                    host_name,
+                    network_item,
+                    self.zbx_groups,
+                    self.zbx_templates,
+                    self.zbx_proxies,
+                    sync_state=self.sync_state,
+                    sync_states=self.sync_states,
+                )
+                if update is not None:
+                    updates.append(update)
+                if state is not None:
+                    records.append(state)
+
+            if not self._put(built, (creates, updates, records)):
+                return
+
+    def _build_create(self, host_name, network_item):
+        """ Polozky planu pro vytvoreni jednoho zarizeni (vice rozhrani = vice hostu)
+            a zaznamy stavu, viz pyplan.plan_creates
+        """
+        try:
+            items = self.connector.parse_item_parameters(network_item)
+        except (KeyError, IndexError) as e:
+            logger.warning(f"Preskakuji: {host_name} -> nema spravnou strukturu portu! {e}")
+            return [], pyplan.failed_states(self.no_sort, [host_name])
+
+        if type(items) is not list:
+            items = [items]
+
+        return pyplan.plan_creates(
+            items,
+            self.no_sort,
+            self.zbx_groups,
+            self.zbx_templates,
+            self.zbx_proxies,
+            existing=self.inventory.host_ids,
+        )
+
+    def _write(self, built):
+        """ Zapise do Zabbixu - vytvareni po create_chunk_size, upravy po batch_size volani """
+        created = 0
+        updated = 0
+        pending_creates = []
+        pending_updates = []
+
+        while True:
+            chunk = self._get(built)
+
+            if chunk is None:
+                break
+
+            creates, updates, records = chunk
+
+            for state in records:
+                pyplan.record_state(self.sync_state, state)
+
+            pending_creates.extend(creates)
+            pending_updates.extend(updates)
+
+            if len(pending_creates) >= self.create_chunk_size:
+                created += self._write_creates(pending_creates)
+                pending_creates = []
+
+            if sum(len(entry["calls"]) for entry in pending_updates) >= self.batch_size:
+                updated += self._write_updates(pending_updates)
+                pending_updates = []
+
+        # zbytek po posledni davce
+        created += self._write_creates(pending_creates)
+        updated += self._write_updates(pending_updates)
+
+        return created, updated
+
+    def _write_creates(self, entries):
+        with REGISTRY.phase("create"):
+            return pyplan.apply_creates(
+                self.zabbix_api,
+                entries,
+                self.sync_state,
+                chunk_size=self.create_chunk_size,
+            )
+
+    def _write_updates(self, entries):
+        with REGISTRY.phase("update"):
+            return pyplan.apply_updates(
+                self.zabbix_api,
+                entries,
+                self.sync_state,
+                batch_size=self.batch_size,
+                mass_update_min_hosts=self.mass_update_min_hosts,
+            )
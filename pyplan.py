@@ -0,0 +1,906 @@
+# Popis: Plan synchronizace GLPI -> Zabbix - vypocet planu (vytvoreni, smazani a upravy
+#        jednotlivych polozek hostu) z hromadnych snimku GLPI a Zabbixu, jeho ulozeni
+#        do JSONu a provedeni planu
+# Autor: prispevatele zbximport, porovnani (diff_export) vychazi z puvodniho zbximport.py
+#        (Jan Polák, 2018)
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+
+# Zabbix API + funkce
+import pyzabbix
+
+# stav synchronizace hostu
+import pystate
+
+# zaznamy hostu a zarizeni
+import pyhost
+
+# metriky pro Prometheus
+from pymetrics import REGISTRY
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# verze formatu ulozeneho planu
+PLAN_VERSION = 1
+
+# format date_mod v GLPI
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class SyncPlanError(Exception):
+    """ Chyba nacteni planu (neznama verze, poskozeny soubor) """
+
+
+class SyncPlan(object):
+    """
+    Kompletni plan zmen v Zabbixu - vse potrebne pro provedeni bez dalsich dotazu do GLPI
+    delete: [{"host", "hostid"}]
+    create: [{"host", "glpi_id", "date_mod", "fingerprint", "params"}] - params pro host.create
+    update: [{"host", "glpi_id", "date_mod", "fingerprint", "hostid", "interfaceid", "calls"}]
+            calls = [[metoda, parametry], ...] - upravy jednotlivych polozek hosta
+    fingerprint: otisk synchronizovanych udaju z GLPI (pystate.fingerprint), ve starsich
+                 planech chybi
+    record: [{...}] - zaznamy stavu bez zmeny v Zabbixu (argumenty SyncStateStore.record)
+    """
+
+    def __init__(self, incremental=False, newest_date_mod=None, created_at=None):
+        """
+        Parameters:
+            incremental: plan vznikl z inkrementalniho exportu (bez mazani)
+            newest_date_mod: nejnovejsi date_mod ze zarizeni z GLPI (watermark)
+            created_at: cas vytvoreni planu (ISO format), None = ted
+        """
+        self.created_at = created_at or datetime.datetime.now().isoformat(
+            timespec="seconds"
+        )
+        self.incremental = incremental
+        self.newest_date_mod = newest_date_mod
+        self.delete = []
+        self.create = []
+        self.update = []
+        self.record = []
+
+    def is_empty(self):
+        """ Plan nemeni nic v Zabbixu """
+        return not (self.delete or self.create or self.update)
+
+    def summary(self):
+        """ Vrati citelny souhrn planu (pro log a --dry-run) """
+        lines = [
+            f"Plan z {self.created_at}"
+            f" ({'inkrementalni' if self.incremental else 'plny'} export):"
+            f" smazat {len(self.delete)}, vytvorit {len(self.create)},"
+            f" upravit {len(self.update)}, jen stav {len(self.record)}"
+        ]
+
+        for entry in self.delete:
+            lines.append(f"  --DEL-- {entry['host']}")
+        for entry in self.create:
+            lines.append(f"  --ADD-- {entry['host']}")
+        for entry in self.update:
+            for method, params in entry["calls"]:
+                fields = ", ".join(
+                    f"{key}={value}"
+                    for key, value in params.items()
+                    if key not in ("hostid", "interfaceid")
+                )
+                lines.append(f"  --UPD-- {entry['host']}: {method} {fields}")
+
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "version": PLAN_VERSION,
+            "created_at": self.created_at,
+            "incremental": self.incremental,
+            "newest_date_mod": self.newest_date_mod,
+            "delete": self.delete,
+            "create": self.create,
+            "update": self.update,
+            "record": self.record,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != PLAN_VERSION:
+            raise SyncPlanError(f"Nepodporovana verze planu: {data.get('version')}")
+
+        plan = cls(
+            incremental=data["incremental"],
+            newest_date_mod=data["newest_date_mod"],
+            created_at=data["created_at"],
+        )
+        plan.delete = data["delete"]
+        plan.create = data["create"]
+        plan.update = data["update"]
+        plan.record = data["record"]
+
+        return plan
+
+    def save(self, path):
+        """ Atomicky ulozi plan do JSON souboru
+            Parameters:
+                path: cesta k souboru planu
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=".zbximport-plan.", suffix=".tmp"
+        )
+
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as temp_file:
+                json.dump(self.to_dict(), temp_file, ensure_ascii=False, indent=1)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+        logger.info(f"Plan ulozen do {path}")
+
+    @classmethod
+    def load(cls, path):
+        """ Nacte plan z JSON souboru
+            Parameters:
+                path: cesta k souboru planu
+        """
+        try:
+            with open(path, encoding="utf-8") as plan_file:
+                data = json.load(plan_file)
+        except ValueError as e:
+            raise SyncPlanError(f"Poskozeny soubor planu {path}: {e}")
+
+        return cls.from_dict(data)
+
+
+class GlpiExport(object):
+    """
+    Vysledek exportu z GLPI
+    no_sort: vsechna vybrana zarizeni - nazev:pyhost.GlpiDevice (["id"], ["date_mod"])
+    proxies_with_hosts: nazev proxy v Zabbixu (zbx-...) -> nazev:GlpiDevice (stejny zaznam)
+    newest_date_mod: nejnovejsi date_mod (watermark)
+    since: date_mod, od ktereho se exportovalo (None = plny export)
+    """
+
+    def __init__(self, proxy_list, newest_date_mod=None, since=None):
+        self.no_sort = {}
+        # vytvoreni slovniku proxy s hosty - dulezite je item:{}
+        self.proxies_with_hosts = {"zbx-" + item: {} for item in proxy_list}
+        self.newest_date_mod = newest_date_mod
+        self.since = since
+
+    @property
+    def incremental(self):
+        return self.since is not None
+
+    def add(self, item):
+        """ Zaradi zarizeni z GLPI """
+        # jeden zaznam s __slots__ pro oba slovniky
+        device = pyhost.GlpiDevice(item["id"], item["date_mod"])
+        self.no_sort[item["name"]] = device
+
+        # TODO pridat groups_id ????
+        # zapis polozky - prefix "zbx-" je kvuli nazvu proxy v Zabbixu
+        self.proxies_with_hosts["zbx-" + item["networks_id"]][item["name"]] = device
+
+        if item["date_mod"] and (
+            self.newest_date_mod is None or item["date_mod"] > self.newest_date_mod
+        ):
+            self.newest_date_mod = item["date_mod"]
+
+
+def export_devices(connector, proxy_list, sync_state, since=None, newest_date_mod=None):
+    """
+    Export zarizeni z GLPI - zarizeni, ktera nejsou sablona, nejsou smazana a maji proxy
+    ze seznamu. Pri inkrementalnim exportu i neuspesne synchronizovana zarizeni.
+    Parameters:
+        connector: pyglpi.GlpiConnector s otevrenou session
+        proxy_list: seznam proxy v GLPI (bez prefixu "zbx-")
+        sync_state: pystate.SyncStateStore
+        since: jen zarizeni zmenena od date_mod (None = plny export)
+        newest_date_mod: watermark z minulych behu
+    Vraci GlpiExport
+    """
+    export = GlpiExport(proxy_list, newest_date_mod=newest_date_mod, since=since)
+
+    if since is not None:
+        logger.info(f"Inkrementalni export - zmeny od {since}")
+        all_devices = connector.iter_modified_network_items(since)
+    else:
+        # strankovany export - zarizeni prichazeji postupne, v pameti je vzdy jen jedna stranka
+        logger.info("Plny export")
+        all_devices = connector.iter_network_items()
+
+    # hosti, kteri nejsou sablona, nejsou smazani a maji nastaveno proxy ze seznamu
+    # filtruje se prubezne (generator), ne az nad celym seznamem
+    # pokud bude vytvorena nová proxy, pridat nazev do config file
+    logger.debug("Prochazim jednotliva zarizeni")
+    proxy_list = set(proxy_list)
+    seen_ids = set()
+
+    def add_device(item):
+        seen_ids.add(str(item["id"]))
+        if item["is_template"] != 1 and item["is_deleted"] != 1:
+            if item["networks_id"] in proxy_list:
+                export.add(item)
+
+    for item in all_devices:
+        add_device(item)
+
+    if since is not None:
+        # neuspesne synchronizovana zarizeni se v GLPI nezmenila - bez nich by se
+        # opakovala az pri dalsim plnem exportu
+        failed_ids = [i for i in sync_state.get_failed_ids() if i not in seen_ids]
+        if failed_ids:
+            logger.info(
+                f"Opakuji {len(failed_ids)} neuspesne synchronizovanych zarizeni"
+            )
+            for item in connector.iter_network_items_by_id(failed_ids):
+                add_device(item)
+
+    return export
+
+
+def diff_export(
+    export, inventory, zbx_proxies, sync_state, last_import_time, sync_states=None
+):
+    """
+    Porovna export z GLPI s hosty v Zabbixu - nic nemeni
+    Parameters:
+        export: GlpiExport
+        inventory: pyzabbix.ZabbixInventory
+        zbx_proxies: proxy v Zabbixu - jméno:ID
+        sync_state: pystate.SyncStateStore
+        last_import_time: cas posledniho importu (datetime) - pro hosty, kteri jeste
+                          nejsou ve stavu synchronizace
+        sync_states: stav hostu z sync_state.load_all() (None = nacte se)
+    Vraci (ke smazani, k vytvoreni, ke kontrole zmen, zaznamy stavu nezmenenych hostu)
+    """
+    # "Globalni" seznam
+    global_to_delete = []
+    global_to_create = []
+    global_to_update = []
+
+    # zaznamy stavu nezmenenych hostu - zapisou se az pri provedeni planu
+    global_to_record = []
+
+    # stav synchronizace hostu z minulych behu - glpi_id:stav
+    if sync_states is None:
+        sync_states = sync_state.load_all()
+
+    # iterace pres jednotlive proxy s hosty
+    for glpi_proxy_name, glpi_proxy_hosts_ids in export.proxies_with_hosts.items():
+
+        # kontrola, jestli je proxy z GLPI v aktualne ziskanych Zabbix proxy
+        if glpi_proxy_name in zbx_proxies:
+
+            # ziskani vsech hostu s danou(aktualni) proxy z indexu = vraci seznam s jmeny
+            zabbix_hosts_list = inventory.get_hosts_from_proxy(glpi_proxy_name)
+
+            # prunik(spolecne prvky) nazvu hostu v zabbixu a glpi
+            intersect = set(glpi_proxy_hosts_ids).intersection(set(zabbix_hosts_list))
+
+            # polozky co jsou v Zabbixu, ale nejsou v GLPI = vymazat ze Zabbixu
+            to_be_deleted_keys = set(zabbix_hosts_list) - intersect
+
+            # polozky co jsou v GLPI, ale nejsou v Zabbixu = vytvorit v Zabbixu
+            to_be_created_keys = set(glpi_proxy_hosts_ids) - intersect
+
+            # polozky co jsou v GLPI i v Zabbixu = overit datum zmeny a porovnat s datem posledniho importu
+            to_be_same_keys = intersect
+
+            # zarizeni s vice rozhranimi jsou v Zabbixu jako nazev---rozhrani, s nazvem
+            # z GLPI se nikdy neshoduji - nezmenene zarizeni se nevytvari ani nekontroluje
+            for device_name, interface_hosts in inventory.get_interface_hosts(
+                glpi_proxy_name
+            ).items():
+                if device_name not in to_be_created_keys:
+                    continue
+
+                device_state = sync_states.get(
+                    str(glpi_proxy_hosts_ids[device_name]["id"])
+                )
+                if device_state is not None and not sync_state.needs_sync(
+                    device_state, glpi_proxy_hosts_ids[device_name]["date_mod"]
+                ):
+                    to_be_created_keys.discard(device_name)
+                    to_be_deleted_keys.difference_update(interface_hosts)
+
+            # pokud je neco k odstraneni
+            if to_be_deleted_keys:
+                global_to_delete.extend(list(to_be_deleted_keys))
+
+            # pokud je neco k vytvoreni
+            if to_be_created_keys:
+                global_to_create.extend(list(to_be_created_keys))
+
+            # pokud jsou stejne, kontroluji zmenu
+            for host_name in to_be_same_keys:
+
+                glpi_id = str(glpi_proxy_hosts_ids[host_name]["id"])
+                date_mod = glpi_proxy_hosts_ids[host_name]["date_mod"]
+                host_state = sync_states.get(glpi_id)
+
+                if host_state is not None:
+                    # zmena date_mod nebo neuspesna minula synchronizace
+                    if sync_state.needs_sync(host_state, date_mod):
+                        global_to_update.append(host_name)
+                    continue
+
+                # host jeste neni ve stavu - rozhoduje cas posledniho importu
+                item_last_mod_time = datetime.datetime.strptime(date_mod, DATE_FORMAT)
+
+                if item_last_mod_time > last_import_time:
+                    global_to_update.append(host_name)
+                else:
+                    # nezmeneny host - zalozeni stavu, pristi beh uz rozhoduje stav
+                    zabbix_item = inventory.get_params(host_name) or {}
+                    global_to_record.append(
+                        {
+                            "glpi_id": glpi_id,
+                            "host_name": host_name,
+                            "date_mod": date_mod,
+                            "zbx_hostid": zabbix_item.get("zbx_id"),
+                            "zbx_interfaceid": zabbix_item.get("zbx_interface_id"),
+                        }
+                    )
+        else:
+            logger.error(f"Proxy {glpi_proxy_name} neni v Zabbixu!")
+
+    # pro pripad, ze se zmeni proxy, pak je host v delete i create
+    changed_proxy_hosts = set(global_to_delete).intersection(set(global_to_create))
+
+    # pokud je zmena proxy
+    for host in changed_proxy_hosts:
+
+        # vyjmout z delete a create (je v obou) a spravne pridat do update
+        global_to_delete.remove(host)
+        global_to_create.remove(host)
+        global_to_update.append(host)
+
+    # pri inkrementalnim exportu chybi nezmenene polozky, mazani jen pri plnem exportu
+    if export.incremental:
+        global_to_delete = []
+
+    return global_to_delete, global_to_create, global_to_update, global_to_record
+
+
+def build_plan(
+    connector,
+    inventory,
+    no_sort,
+    to_delete,
+    to_create,
+    to_update,
+    zbx_groups,
+    zbx_templates,
+    zbx_proxies,
+    incremental=False,
+    newest_date_mod=None,
+    records=None,
+    sync_state=None,
+    sync_states=None,
+):
+    """
+    Sestavi plan zmen - z GLPI se davkove ziskaji detaily vytvarenych a upravovanych
+    hostu, Zabbix se nedotazuje (vse je v inventory). Nic nemeni.
+    Parameters:
+        connector: pyglpi.GlpiConnector s otevrenou session
+        inventory: pyzabbix.ZabbixInventory
+        no_sort: vsechna zarizeni z GLPI - nazev:{"id", "date_mod"}
+        to_delete: nazvy hostu ke smazani
+        to_create: nazvy hostu k vytvoreni
+        to_update: nazvy hostu ke kontrole zmen
+        zbx_groups: skupiny v Zabbixu - jméno:ID
+        zbx_templates: šablony v Zabbixu -  jméno:ID
+        zbx_proxies: proxy v Zabbixu - jméno:ID
+        incremental: inkrementalni export
+        newest_date_mod: nejnovejsi date_mod z GLPI
+        records: zaznamy stavu nezmenenych hostu (argumenty SyncStateStore.record)
+        sync_state: pystate.SyncStateStore - otisky z minuleho behu (None = vzdy porovnat)
+        sync_states: stav hostu z sync_state.load_all() (viz plan_update)
+    """
+    plan = SyncPlan(incremental=incremental, newest_date_mod=newest_date_mod)
+    plan.record.extend(records or [])
+
+    plan.delete.extend(plan_deletes(connector, inventory, no_sort, to_delete))
+
+    if to_create:
+        # ziskani parametru vsech hostu ze seznamu - zarizeni se spatnou strukturou
+        # se zapisou jako neuspesna a nezastavi ostatni
+        failed = []
+        entries, states = plan_creates(
+            connector.construct_list(to_create, no_sort, failed=failed),
+            no_sort,
+            zbx_groups,
+            zbx_templates,
+            zbx_proxies,
+            existing=inventory.host_ids,
+        )
+        plan.create.extend(entries)
+        plan.record.extend(states)
+        plan.record.extend(failed_states(no_sort, failed))
+
+    if to_update:
+        # davkove ziskani vsech polozek k uprave z GLPI
+        update_ids = [no_sort[host_name]["id"] for host_name in to_update]
+        network_items = connector.get_items_network_ports(update_ids)
+
+        for host_name, network_item in zip(to_update, network_items):
+            update, state = plan_update(
+                connector,
+                inventory,
+                no_sort,
+                host_name,
+                network_item,
+                zbx_groups,
+                zbx_templates,
+                zbx_proxies,
+                sync_state=sync_state,
+                sync_states=sync_states,
+            )
+            if update is not None:
+                plan.update.append(update)
+            if state is not None:
+                plan.record.append(state)
+
+    logger.info(plan.summary().splitlines()[0])
+
+    return plan
+
+
+def plan_deletes(connector, inventory, no_sort, to_delete):
+    """
+    Vrati polozky planu pro smazani hostu
+    Parameters:
+        connector: pyglpi.GlpiConnector s otevrenou session
+        inventory: pyzabbix.ZabbixInventory
+        no_sort: vsechna zarizeni z GLPI - nazev:{"id", "date_mod"}
+        to_delete: nazvy hostu ke smazani
+    """
+    to_delete = list(to_delete)
+
+    # vytvori seznam multi interface int1---int2
+    check_del_list = [i for i in to_delete if "---" in i]
+
+    if check_del_list:
+        # vybere jen prvni casti nazvu interface - pokud rozhrani v GLPI stale je, nemaze se
+        splitted = set([x.split("---")[0] for x in check_del_list])
+
+        for item in connector.construct_list(splitted, no_sort):
+            if item["host_name"] in to_delete:
+                to_delete.remove(item["host_name"])
+
+    return [
+        {"host": host_name, "hostid": inventory.host_ids[host_name]}
+        for host_name in to_delete
+    ]
+
+
+def plan_creates(items, no_sort, zbx_groups, zbx_templates, zbx_proxies, existing=None):
+    """
+    Vrati polozky planu pro vytvoreni hostu a zaznamy stavu zarizeni, jejichz hosty
+    uz v Zabbixu vsechny jsou (zarizeni s vice rozhranimi nazev---rozhrani)
+    Parameters:
+        items: polozky s parametry z GLPI (viz GlpiConnector.construct_list)
+        no_sort: vsechna zarizeni z GLPI - nazev:{"id", "date_mod"}
+        zbx_groups: skupiny v Zabbixu - jméno:ID
+        zbx_templates: šablony v Zabbixu -  jméno:ID
+        zbx_proxies: proxy v Zabbixu - jméno:ID
+        existing: hosty, ktere uz v Zabbixu jsou - nazev:ID (nevytvari se)
+    Vraci (polozky planu, zaznamy stavu)
+    """
+    entries = []
+    existing = existing or {}
+    # zarizeni, jejichz nektery host uz v Zabbixu je - nazev v GLPI:zaznam stavu
+    existing_states = {}
+
+    for item in items:
+        try:
+            parameters = pyzabbix.get_zbx_host_create_params(
+                item, zbx_groups, zbx_templates, zbx_proxies
+            )
+        except KeyError as e:
+            logger.warning(f"Preskakuji: {item['host_name']} -> neni v Zabbixu {e}")
+            continue
+
+        if parameters is None:
+            continue
+
+        glpi_item = no_sort.get(item["name"], {})
+
+        if parameters["host"] in existing:
+            # jinak by host.create selhalo na "already exists" pri kazdem behu
+            logger.debug(f"Preskakuji: {parameters['host']} -> uz je v Zabbixu")
+            if glpi_item.get("id") is not None:
+                existing_states[item["name"]] = {
+                    "glpi_id": glpi_item["id"],
+                    "host_name": parameters["host"],
+                    "date_mod": glpi_item.get("date_mod"),
+                    "zbx_hostid": existing[parameters["host"]],
+                }
+            continue
+
+        entries.append(
+            {
+                "host": parameters["host"],
+                "glpi_id": glpi_item.get("id"),
+                "date_mod": glpi_item.get("date_mod"),
+                "fingerprint": pystate.fingerprint(item),
+                "params": parameters,
+            }
+        )
+
+    # stav se zaklada jen u zarizeni bez novych hostu - jinak az po jejich vytvoreni
+    created_ids = {entry["glpi_id"] for entry in entries}
+    states = [
+        state
+        for state in existing_states.values()
+        if state["glpi_id"] not in created_ids
+    ]
+
+    return entries, states
+
+
+def failed_states(no_sort, host_names):
+    """
+    Vrati zaznamy stavu STATUS_FAILED pro zarizeni, ktera nesla zpracovat
+    Parameters:
+        no_sort: vsechna zarizeni z GLPI - nazev:{"id", "date_mod"}
+        host_names: nazvy zarizeni
+    """
+    return [
+        {
+            "glpi_id": no_sort[host_name]["id"],
+            "host_name": host_name,
+            "date_mod": no_sort[host_name]["date_mod"],
+            "status": pystate.STATUS_FAILED,
+        }
+        for host_name in host_names
+    ]
+
+
+def plan_update(
+    connector,
+    inventory,
+    no_sort,
+    host_name,
+    network_item,
+    zbx_groups,
+    zbx_templates,
+    zbx_proxies,
+    sync_state=None,
+    sync_states=None,
+):
+    """
+    Porovna hosta v GLPI a Zabbixu a vrati dvojici (polozka planu pro upravu, zaznam stavu),
+    kazda muze byt None. Pokud se otisk udaju z GLPI nezmenil, Zabbix se neporovnava.
+    Parameters:
+        connector: pyglpi.GlpiConnector (jen parsovani polozky)
+        inventory: pyzabbix.ZabbixInventory
+        no_sort: vsechna zarizeni z GLPI - nazev:{"id", "date_mod"}
+        host_name: nazev hosta
+        network_item: polozka z GLPI vcetne portu
+        zbx_groups: skupiny v Zabbixu - jméno:ID
+        zbx_templates: šablony v Zabbixu -  jméno:ID
+        zbx_proxies: proxy v Zabbixu - jméno:ID
+        sync_state: pystate.SyncStateStore - otisk z minuleho behu (None = vzdy porovnat)
+        sync_states: stav hostu nacteny na zacatku behu (sync_state.load_all()),
+                     None = stav hosta se nacte ze sync_state samostatne
+    """
+    glpi_id = no_sort[host_name]["id"]
+    date_mod = no_sort[host_name]["date_mod"]
+
+    # ziskani parametru hosta - z GLPI
+    try:
+        glpi_item = connector.parse_item_parameters(network_item)
+    except (KeyError, IndexError) as e:
+        logger.warning(f"Preskakuji: {host_name} -> nema spravnou strukturu portu! {e}")
+        # stejne jako pri vytvareni - opakuje se pristi beh
+        return None, failed_states(no_sort, [host_name])[0]
+
+    # zadne platne rozhrani (napr. odebrana IP) nebo vice rozhrani - seznam, jeden host
+    # v Zabbixu nelze upravit podle vice (zadnych) zaznamu
+    if type(glpi_item) is list:
+        if glpi_item:
+            logger.warning(f"Preskakuji: {host_name} -> ma vice rozhrani!")
+        else:
+            logger.warning(f"Preskakuji: {host_name} -> nema platne rozhrani!")
+        # opakuje se az po zmene polozky v GLPI
+        return None, {
+            "glpi_id": glpi_id,
+            "host_name": host_name,
+            "date_mod": date_mod,
+            "status": pystate.STATUS_SKIPPED,
+        }
+
+    item_fingerprint = pystate.fingerprint(glpi_item)
+
+    if sync_state is not None and sync_state.is_unchanged(
+        sync_state.get(glpi_id)
+        if sync_states is None
+        else sync_states.get(str(glpi_id)),
+        item_fingerprint,
+    ):
+        # zmena v GLPI se netykala synchronizovanych udaju
+        logger.debug(f"Beze zmeny: {host_name} -> stejny otisk")
+        return None, {
+            "glpi_id": glpi_id,
+            "host_name": host_name,
+            "date_mod": date_mod,
+        }
+
+    # ze Zabbixu - z indexu
+    zabbix_item = inventory.get_params(host_name)
+
+    if zabbix_item is None:
+        logger.warning(f"Preskakuji: {host_name} -> neni kompletni v Zabbixu!")
+        return None, {
+            "glpi_id": glpi_id,
+            "host_name": host_name,
+            "date_mod": date_mod,
+            "status": pystate.STATUS_SKIPPED,
+        }
+
+    # zjisti co se zmenilo - volani API pro upravu
+    try:
+        calls = pyzabbix.get_zbx_host_changes(
+            glpi_item, zabbix_item, zbx_groups, zbx_templates, zbx_proxies
+        )
+    except Exception as e:
+        logger.error(f"Vyjimka: {e}")
+        return None, {
+            "glpi_id": glpi_id,
+            "host_name": host_name,
+            "status": pystate.STATUS_FAILED,
+        }
+
+    if not calls:
+        # nic se nezmenilo - jen ulozit stav
+        return None, {
+            "glpi_id": glpi_id,
+            "host_name": zabbix_item["host_name"],
+            "date_mod": date_mod,
+            "fingerprint": item_fingerprint,
+            "zbx_hostid": zabbix_item["zbx_id"],
+            "zbx_interfaceid": zabbix_item["zbx_interface_id"],
+        }
+
+    update = {
+        "host": host_name,
+        "glpi_id": glpi_id,
+        "date_mod": date_mod,
+        "fingerprint": item_fingerprint,
+        "hostid": zabbix_item["zbx_id"],
+        "interfaceid": zabbix_item["zbx_interface_id"],
+        "calls": [[method, params] for method, params in calls],
+    }
+
+    return update, None
+
+
+def apply_plan(
+    zabbix_api,
+    plan,
+    sync_state=None,
+    create_chunk_size=1,
+    batch_size=100,
+    mass_update_min_hosts=2,
+):
+    """
+    Provede plan v Zabbixu - mazani jednim host.delete, vytvareni po davkach host.create,
+    upravy v JSON-RPC batch pozadavcich. Vysledky zapise do stavu synchronizace.
+    Doba mazani, vytvareni a uprav se meri zvlast (faze delete, create, update).
+    Parameters:
+        zabbix_api: prihlasene API Zabbixu
+        plan: SyncPlan
+        sync_state: pystate.SyncStateStore (None = stav se nezapisuje)
+        create_chunk_size: pocet hostu vytvarenych jednim volanim host.create
+        batch_size: maximalni pocet volani v jednom batch pozadavku
+        mass_update_min_hosts: nejmensi pocet hostu se stejnou zmenou pro host.massupdate
+    Vraci citace {"created", "deleted", "updated"}
+    """
+    for state in plan.record:
+        record_state(sync_state, state)
+
+    counters = {}
+
+    with REGISTRY.phase("delete"):
+        counters["deleted"] = apply_deletes(zabbix_api, plan.delete)
+
+    with REGISTRY.phase("create"):
+        counters["created"] = apply_creates(
+            zabbix_api, plan.create, sync_state, chunk_size=create_chunk_size
+        )
+
+    with REGISTRY.phase("update"):
+        counters["updated"] = apply_updates(
+            zabbix_api,
+            plan.update,
+            sync_state,
+            batch_size=batch_size,
+            mass_update_min_hosts=mass_update_min_hosts,
+        )
+
+    return counters
+
+
+def record_state(sync_state, state):
+    """ Zapise zaznam stavu (argumenty SyncStateStore.record), sync_state muze byt None """
+    if sync_state is not None:
+        sync_state.record(**state)
+
+
+def apply_deletes(zabbix_api, entries):
+    """
+    Smaze hosty jednim host.delete, vraci pocet smazanych
+    Parameters:
+        zabbix_api: prihlasene API Zabbixu
+        entries: polozky planu pro smazani
+    """
+
+    # test, pokud neni nic ke smazani, tak by smazal vsechno!!!
+    if not entries:
+        return 0
+
+    host_names = [entry["host"] for entry in entries]
+
+    try:
+        # nutno mazat takto, jinak ZabbixApi dava parametry do tuple v request JSONu
+        removed_zbx_hosts = zabbix_api.do_request(
+            "host.delete", params=[entry["hostid"] for entry in entries]
+        )["result"]
+    except Exception as e:
+        logger.error(f"Vyjimka: {e}")
+        logger.exception(f"Problém při smazání {host_names}")
+        return 0
+
+    logger.info(f"--DEL-- Polozky odstraneny: {str(host_names)}")
+    logger.debug(f"Vracene ID: {str(removed_zbx_hosts)} ")
+
+    return len(entries)
+
+
+def apply_creates(zabbix_api, entries, sync_state=None, chunk_size=1):
+    """
+    Vytvori hosty po davkach host.create, vraci pocet vytvorenych. Zarizeni, jehoz
+    nektery host se nevytvoril, dostane stav STATUS_FAILED - pristi beh ho zkusi znovu.
+    Parameters:
+        zabbix_api: prihlasene API Zabbixu
+        entries: polozky planu pro vytvoreni
+        sync_state: pystate.SyncStateStore (None = stav se nezapisuje)
+        chunk_size: pocet hostu vytvarenych jednim volanim host.create
+    """
+    if not entries:
+        return 0
+
+    added_zbx_hosts = pyzabbix.create_zbx_hosts_from_params(
+        zabbix_api, [entry["params"] for entry in entries], chunk_size=chunk_size
+    )
+
+    if added_zbx_hosts:
+        logger.info(f"--ADD-- Polozky vytvoreny: {str(list(added_zbx_hosts))}")
+
+    # zarizeni s vice rozhranimi je neuspesne, pokud selhal kterykoli jeho host
+    failed_ids = {
+        entry["glpi_id"] for entry in entries if entry["host"] not in added_zbx_hosts
+    }
+
+    for entry in entries:
+        if entry["glpi_id"] is None:
+            continue
+
+        if entry["glpi_id"] in failed_ids:
+            if entry["host"] not in added_zbx_hosts:
+                logger.warning(f"Nevytvoren: {entry['host']} -> zkusi se pristi beh")
+                record_state(
+                    sync_state,
+                    {
+                        "glpi_id": entry["glpi_id"],
+                        "host_name": entry["host"],
+                        "date_mod": entry["date_mod"],
+                        "status": pystate.STATUS_FAILED,
+                    },
+                )
+        else:
+            record_state(
+                sync_state,
+                {
+                    "glpi_id": entry["glpi_id"],
+                    "host_name": entry["host"],
+                    "date_mod": entry["date_mod"],
+                    "fingerprint": entry.get("fingerprint"),
+                    "zbx_hostid": added_zbx_hosts[entry["host"]],
+                },
+            )
+
+    return len(added_zbx_hosts)
+
+
+def apply_updates(
+    zabbix_api, entries, sync_state=None, batch_size=100, mass_update_min_hosts=2
+):
+    """
+    Upravi hosty v JSON-RPC batch pozadavcich, stejne zmeny vice hostu jednim
+    host.massupdate. Vraci pocet upravenych.
+    Parameters:
+        zabbix_api: prihlasene API Zabbixu
+        entries: polozky planu pro upravu
+        sync_state: pystate.SyncStateStore (None = stav se nezapisuje)
+        batch_size: maximalni pocet volani v jednom batch pozadavku
+        mass_update_min_hosts: nejmensi pocet hostu se stejnou zmenou pro host.massupdate
+                               (0 = kazdy host vlastnim host.update)
+    """
+    if not entries:
+        return 0
+
+    calls = [(method, params) for entry in entries for method, params in entry["calls"]]
+    grouped, positions = pyzabbix.group_host_updates(calls, mass_update_min_hosts)
+
+    # vysledky jsou znamy az po odeslani davky
+    with zabbix_api.batch(batch_size) as zbatch:
+        sent = [
+            zbatch.do_request(method, params)["result"] for method, params in grouped
+        ]
+
+    results = [sent[position] for position in positions]
+
+    # neuspesny host.massupdate se zopakuje po hostech - chyba jednoho hosta
+    # (napr. mezitim smazaneho) neblokuje ostatni
+    retry = [
+        index
+        for index, position in enumerate(positions)
+        if grouped[position][0] == "host.massupdate" and not sent[position]
+    ]
+
+    if retry:
+        logger.warning(f"host.massupdate selhal, opakuji po hostech ({len(retry)})")
+        with zabbix_api.batch(batch_size) as zbatch:
+            for index in retry:
+                method, params = calls[index]
+                results[index] = zbatch.do_request(method, params)["result"]
+
+    updated = 0
+    offset = 0
+
+    for entry in entries:
+        entry_calls = results[offset : offset + len(entry["calls"])]
+        offset += len(entry["calls"])
+
+        if all(entry_calls):
+            logger.info(f"--UPD-- Polozka upravena: {entry['host']}")
+            logger.debug(f"Vracene ID: {str([call.result for call in entry_calls])}")
+            updated += 1
+            record_state(
+                sync_state,
+                {
+                    "glpi_id": entry["glpi_id"],
+                    "host_name": entry["host"],
+                    "date_mod": entry["date_mod"],
+                    "fingerprint": entry.get("fingerprint"),
+                    "zbx_hostid": entry["hostid"],
+                    "zbx_interfaceid": entry["interfaceid"],
+                },
+            )
+        else:
+            for call in entry_calls:
+                if not call:
+                    logger.error(f"Problém při úpravě {entry['host']}: {call.error}")
+            # date_mod se neuklada, host se zkusi znovu pri dalsim behu
+            record_state(
+                sync_state,
+                {
+                    "glpi_id": entry["glpi_id"],
+                    "host_name": entry["host"],
+                    "status": pystate.STATUS_FAILED,
+                },
+            )
+
+    return updated
@@ -0,0 +1,179 @@
+# Popis: Rozdeleni synchronizace po proxy (shardy) - kazda proxy nebo skupina proxy
+#        se planuje a provadi ve vlastnim vlakne, vysledky se na konci slouci
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import concurrent.futures
+import logging
+import time
+
+# metriky pro Prometheus
+from pymetrics import REGISTRY
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# shard pro hosty, u kterych nelze urcit proxy
+DEFAULT_SHARD = "default"
+
+
+class ShardError(Exception):
+    """ Nektere shardy selhaly - ostatni byly provedeny """
+
+    def __init__(self, failures):
+        """
+        Parameters:
+            failures: nazev shardu:vyjimka
+        """
+        self.failures = failures
+        super().__init__(
+            "Selhaly shardy: "
+            + ", ".join(f"{name} ({error})" for name, error in failures.items())
+        )
+
+
+class Shard(object):
+    """ Cast synchronizace pro jednu proxy nebo skupinu proxy """
+
+    def __init__(self, name, proxies):
+        """
+        Parameters:
+            name: nazev shardu (proxy nebo skupiny z [shard-groups])
+            proxies: nazvy proxy ve shardu
+        """
+        self.name = name
+        self.proxies = list(proxies)
+        self.to_delete = []
+        self.to_create = []
+        self.to_update = []
+
+    def is_empty(self):
+        return not (self.to_delete or self.to_create or self.to_update)
+
+    def size(self):
+        return len(self.to_delete) + len(self.to_create) + len(self.to_update)
+
+
+def parse_shard_groups(config_items):
+    """ Vrati skupiny proxy z [shard-groups] - nazev:seznam proxy
+        Parameters:
+            config_items: polozky sekce (nazev, "proxy-a, proxy-b")
+    """
+    return {
+        name: [proxy.strip() for proxy in value.split(",") if proxy.strip()]
+        for name, value in config_items
+    }
+
+
+def partition(export, inventory, to_delete, to_create, to_update, groups=None):
+    """ Rozdeli vysledek porovnani na shardy podle proxy hostu
+        Porovnani (diff) musi probehnout nad vsemi proxy - host, ktery zmenil proxy,
+        je jedna uprava a nesmi se rozpadnout na smazani v jednom a vytvoreni v jinem shardu.
+        Parameters:
+            export: pyplan.GlpiExport
+            inventory: pyzabbix.ZabbixInventory
+            to_delete: nazvy hostu ke smazani
+            to_create: nazvy hostu k vytvoreni
+            to_update: nazvy hostu ke kontrole zmen
+            groups: skupiny proxy - nazev shardu:seznam proxy (ostatni proxy maji shard kazda)
+        Vraci seznam neprazdnych shardu, nejvetsi prvni
+    """
+    shard_of_proxy = {}
+    shards = {}
+
+    for name, proxies in (groups or {}).items():
+        shards[name] = Shard(name, proxies)
+        for proxy in proxies:
+            shard_of_proxy[proxy] = name
+
+    def shard_for(proxy):
+        name = shard_of_proxy.get(proxy, proxy or DEFAULT_SHARD)
+        if name not in shards:
+            shards[name] = Shard(name, [proxy] if proxy else [])
+        return shards[name]
+
+    # proxy hostu z GLPI (vytvoreni, uprava) a ze Zabbixu (smazani)
+    glpi_proxy = {
+        host_name: proxy
+        for proxy, hosts in export.proxies_with_hosts.items()
+        for host_name in hosts
+    }
+    zabbix_proxy = {
+        host_name: proxy
+        for proxy in export.proxies_with_hosts
+        for host_name in inventory.get_hosts_from_proxy(proxy)
+    }
+
+    for host_name in to_delete:
+        shard_for(zabbix_proxy.get(host_name)).to_delete.append(host_name)
+
+    for host_name in to_create:
+        shard_for(glpi_proxy.get(host_name)).to_create.append(host_name)
+
+    # pri zmene proxy patri uprava do shardu nove proxy (z GLPI)
+    for host_name in to_update:
+        shard_for(glpi_proxy.get(host_name)).to_update.append(host_name)
+
+    # nejvetsi shardy se spousti prvni, aby neblokovaly konec behu
+    return sorted(
+        (shard for shard in shards.values() if not shard.is_empty()),
+        key=lambda shard: shard.size(),
+        reverse=True,
+    )
+
+
+def run_shards(shards, worker, max_workers):
+    """ Provede shardy soubezne a slouci citace
+        Vyjimka jednoho shardu neprerusi ostatni.
+        Parameters:
+            shards: seznam Shard
+            worker: funkce(shard) vracejici citace {"created", "deleted", "updated"}
+            max_workers: maximalni pocet soubezne provadenych shardu
+        Vraci (sloucene citace, selhane shardy - nazev:vyjimka)
+    """
+    counters = {"created": 0, "deleted": 0, "updated": 0}
+    failures = {}
+
+    if not shards:
+        return counters, failures
+
+    def timed(shard):
+        start = time.monotonic()
+        try:
+            return worker(shard)
+        finally:
+            REGISTRY.set(
+                "shard_duration_seconds",
+                time.monotonic() - start,
+                labels={"shard": shard.name},
+                help_text="Doba zpracovani shardu v poslednim behu",
+            )
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(shards))),
+        thread_name_prefix="shard",
+    ) as executor:
+        futures = {executor.submit(timed, shard): shard for shard in shards}
+
+        for future in concurrent.futures.as_completed(futures):
+            shard = futures[future]
+
+            try:
+                shard_counters = future.result()
+            except Exception as e:
+                logger.exception(f"Shard {shard.name} selhal: {e}")
+                failures[shard.name] = e
+                continue
+
+            logger.info(
+                f"Shard {shard.name}: vytvoreno {shard_counters['created']}, "
+                f"odstraneno {shard_counters['deleted']}, "
+                f"upraveno {shard_counters['updated']}"
+            )
+
+            for key in counters:
+                counters[key] += shard_counters.get(key, 0)
+
+    return counters, failures
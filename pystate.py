@@ -0,0 +1,212 @@
+# Popis: Lokalni stav synchronizace hostu (SQLite) - posledni synchronizovany date_mod, otisk, ID v Zabbixu, vysledek
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import logging
+import sqlite3
+import datetime
+import hashlib
+import json
+import threading
+
+# udaje, ktere se synchronizuji do Zabbixu - otisk je prave z nich
+from pyhost import SYNC_FIELDS
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# vysledky synchronizace hosta
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+STATE_COLUMNS = (
+    "glpi_id",
+    "host_name",
+    "date_mod",
+    "fingerprint",
+    "zbx_hostid",
+    "zbx_interfaceid",
+    "status",
+    "synced_at",
+)
+
+
+def fingerprint(item):
+    """ Vrati otisk synchronizovanych udaju polozky - stejne udaje = stejny otisk
+        Parameters:
+            item: polozka s parametry z GLPI (slovnik z parse_item_parameters)
+    """
+    values = [str(item.get(field)) for field in SYNC_FIELDS]
+    return hashlib.sha1(
+        json.dumps(values, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class SyncStateStore:
+    """ Stav synchronizace hostu ulozeny v SQLite, klicem je ID polozky v GLPI """
+
+    def __init__(self, path):
+        """
+        Parameters:
+            path: cesta k souboru s databazi
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS host_state ("
+                "glpi_id TEXT PRIMARY KEY, host_name TEXT, date_mod TEXT, "
+                "fingerprint TEXT, zbx_hostid TEXT, zbx_interfaceid TEXT, "
+                "status TEXT, synced_at TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def load_all(self):
+        """ Vrati stav vsech hostu - slovnik glpi_id:stav (jeden dotaz pro cely beh) """
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT {', '.join(STATE_COLUMNS)} FROM host_state"
+            ).fetchall()
+
+        return {row[0]: dict(zip(STATE_COLUMNS, row)) for row in rows}
+
+    def get(self, glpi_id):
+        """ Vrati stav hosta nebo None
+            Parameters:
+                glpi_id: ID polozky v GLPI
+        """
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT {', '.join(STATE_COLUMNS)} FROM host_state WHERE glpi_id = ?",
+                (str(glpi_id),),
+            ).fetchone()
+
+        return dict(zip(STATE_COLUMNS, row)) if row else None
+
+    def record(
+        self,
+        glpi_id,
+        host_name=None,
+        date_mod=None,
+        fingerprint=None,
+        zbx_hostid=None,
+        zbx_interfaceid=None,
+        status=STATUS_OK,
+    ):
+        """ Zapise vysledek synchronizace hosta, nezadane (None) udaje zustavaji puvodni
+            Parameters:
+                glpi_id: ID polozky v GLPI
+                host_name: nazev hosta
+                date_mod: synchronizovany date_mod z GLPI
+                fingerprint: otisk synchronizovanych udaju
+                zbx_hostid: ID hosta v Zabbixu
+                zbx_interfaceid: ID rozhrani hosta v Zabbixu
+                status: vysledek - STATUS_OK, STATUS_FAILED, STATUS_SKIPPED
+        """
+        synced_at = datetime.datetime.now().isoformat(timespec="seconds")
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO host_state (glpi_id, host_name, date_mod, fingerprint, "
+                "zbx_hostid, zbx_interfaceid, status, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(glpi_id) DO UPDATE SET "
+                "host_name = COALESCE(excluded.host_name, host_name), "
+                "date_mod = COALESCE(excluded.date_mod, date_mod), "
+                "fingerprint = COALESCE(excluded.fingerprint, fingerprint), "
+                "zbx_hostid = COALESCE(excluded.zbx_hostid, zbx_hostid), "
+                "zbx_interfaceid = COALESCE(excluded.zbx_interfaceid, zbx_interfaceid), "
+                "status = excluded.status, synced_at = excluded.synced_at",
+                (
+                    str(glpi_id),
+                    host_name,
+                    date_mod,
+                    fingerprint,
+                    zbx_hostid,
+                    zbx_interfaceid,
+                    status,
+                    synced_at,
+                ),
+            )
+
+    def get_failed_ids(self):
+        """ Vrati ID polozek v GLPI, jejichz posledni synchronizace selhala """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT glpi_id FROM host_state WHERE status = ?", (STATUS_FAILED,)
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def needs_sync(self, state, date_mod):
+        """ Rozhodne, zda je nutne hosta synchronizovat
+            Parameters:
+                state: stav hosta (z load_all/get), None = host jeste neni ve stavu
+                date_mod: aktualni date_mod z GLPI
+        """
+        if state is None:
+            return True
+
+        # neuspesny pokus se opakuje, preskoceny (spatna data) az po zmene v GLPI
+        if state["status"] == STATUS_FAILED:
+            return True
+
+        return state["date_mod"] != date_mod
+
+    def is_unchanged(self, state, item_fingerprint):
+        """ Rozhodne, zda se synchronizovane udaje od posledni uspesne synchronizace nezmenily
+            (zmena date_mod v GLPI se tykala jinych udaju) - Zabbix neni treba porovnavat
+            Parameters:
+                state: stav hosta (z load_all/get), None = host jeste neni ve stavu
+                item_fingerprint: otisk aktualnich udaju z GLPI (fingerprint)
+        """
+        if state is None or state["status"] != STATUS_OK:
+            return False
+
+        return (
+            state["fingerprint"] is not None
+            and state["fingerprint"] == item_fingerprint
+        )
+
+    def get_meta(self, key, default=None):
+        """ Vrati pomocnou hodnotu (napr. watermark)
+            Parameters:
+                key: nazev hodnoty
+                default: vychozi hodnota, pokud neni ulozena
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        """ Ulozi pomocnou hodnotu
+            Parameters:
+                key: nazev hodnoty
+                value: hodnota (ulozi se jako text)
+        """
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(value)),
+            )
+
+    def commit(self):
+        """ Ulozi zmeny na disk """
+        with self.lock:
+            self.connection.commit()
+
+    def close(self):
+        """ Ulozi zmeny a zavre databazi """
+        self.commit()
+        self.connection.close()
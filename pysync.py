@@ -0,0 +1,919 @@
+# Popis: Synchronizace GLPI -> Zabbix jako knihovna - nastaveni z config.ini, pripojeni
+#        k obema API a SyncEngine s oddelenymi fazemi export (GLPI), reconcile (porovnani
+#        se Zabbixem a plan zmen) a apply (provedeni planu)
+# Autor: prispevatele zbximport, prubeh synchronizace vychazi z puvodniho zbximport.py
+#        (Jan Polák, 2018)
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import asyncio
+import configparser
+import datetime
+import hashlib
+import logging
+import os
+import pathlib
+import random
+import time
+
+# GLPI API
+import pyglpi
+
+# Zabbix API + funkce
+import pyzabbix
+
+# spolecna HTTP vrstva
+import pyhttp
+
+# kodovani JSON pro oba klienty
+import pyjson
+
+# stav synchronizace hostu
+import pystate
+
+# asynchronni klienti a synchronizace
+import pyaio
+
+# cache prihlasovacich tokenu
+import pytoken
+
+# cache polozek z GLPI
+import pycache
+
+# plan synchronizace
+import pyplan
+
+# proudove zpracovani (engine = pipeline)
+import pypipeline
+
+# rozdeleni synchronizace po proxy
+import pyshard
+
+# metriky pro Prometheus
+from pymetrics import REGISTRY
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# "Magicka" konstanta
+LAST_IMPORT_FILE_MAGIC_TUPLE = (424_242, 424_242)
+
+
+class SyncSettings(object):
+    """ Nastaveni synchronizace nactene z config.ini """
+
+    def __init__(self, config, base_path):
+        """
+        Parameters:
+            config: configparser.ConfigParser s nactenym config.ini
+            base_path: adresar, vuci kteremu se urcuji cesty k souborum z konfigurace
+        """
+        base_path = pathlib.Path(base_path)
+
+        # GLPI server
+        self.glpi_url = config["glpi-server"]["url"]
+        self.glpi_app_token = config["glpi-server"]["app-token"]
+        self.glpi_user_token = config["glpi-server"]["user-token"]
+        self.glpi_workers = config.getint("glpi-server", "workers", fallback=1)
+        self.glpi_chunk_size = config.getint("glpi-server", "chunk-size", fallback=1)
+        self.glpi_page_size = config.getint("glpi-server", "page-size", fallback=1000)
+
+        # Zabbix server
+        self.zabbix_url = config["zabbix-server"]["url"]
+        self.zabbix_user = config["zabbix-server"]["user"]
+        self.zabbix_password = config["zabbix-server"]["password"]
+        self.zabbix_batch_size = config.getint(
+            "zabbix-server", "batch-size", fallback=100
+        )
+        self.zabbix_create_chunk_size = config.getint(
+            "zabbix-server", "create-chunk-size", fallback=1
+        )
+        # stejna zmena alespon tolika hostu = jeden host.massupdate (0 = vypnuto)
+        self.zabbix_mass_update_min_hosts = config.getint(
+            "zabbix-server", "mass-update-min-hosts", fallback=2
+        )
+
+        # certifikat pro pripojeni - False = bez overeni SSL
+        cert_file = config["zabbix-server"]["cert-file"]
+        if cert_file.lower() == "false":
+            self.zabbix_cert = False
+        else:
+            self.zabbix_cert = (base_path / cert_file).resolve()
+
+        # nastaveni HTTP spojeni - sdileny pool pro GLPI i Zabbix
+        self.http_pool_connections = config.getint(
+            "http", "pool-connections", fallback=4
+        )
+        self.http_pool_maxsize = config.getint("http", "pool-maxsize", fallback=10)
+        self.http_connect_timeout = config.getfloat(
+            "http", "connect-timeout", fallback=None
+        )
+        self.http_read_timeout = config.getfloat("http", "read-timeout", fallback=None)
+        self.http_max_retries = config.getint("http", "max-retries", fallback=0)
+        # velke odpovedi (export z GLPI, host.get) dekodovat postupne po castech
+        self.http_stream_json = config.getboolean("http", "stream-json", fallback=False)
+        # knihovna pro JSON pozadavku a odpovedi: auto, orjson, ujson, json
+        self.http_json_codec = config.get("http", "json-codec", fallback="auto")
+
+        # soubor pro indikaci posledniho importu
+        self.last_import_file = (
+            base_path / config["misc"]["last-import-file"]
+        ).resolve()
+
+        # databaze se stavem synchronizace jednotlivych hostu
+        self.state_file = (
+            base_path / config.get("misc", "state-file", fallback="sync_state.sqlite")
+        ).resolve()
+
+        # jak casto (v sekundach) probiha plny export z GLPI vcetne mazani,
+        # mezi tim jen zmenene polozky. 0 = vzdy plny export
+        self.full_sync_interval = config.getint(
+            "misc", "full-sync-interval", fallback=0
+        )
+
+        # synchronizace: sync = postupne, async = soubezne pres asyncio (pyaio),
+        # pipeline = GLPI a Zabbix soubezne ve vlaknech propojenych frontami (pypipeline)
+        self.engine = config.get("misc", "engine", fallback="sync").lower()
+        self.pipeline_queue_size = config.getint(
+            "pipeline", "queue-size", fallback=4
+        )
+
+        # rozdeleni po proxy - pocet soubezne zpracovavanych shardu (0, 1 = vypnuto)
+        # a skupiny proxy zpracovane spolecne v jednom shardu
+        self.shard_workers = config.getint("shards", "workers", fallback=0)
+        # v configu nazvy proxy z GLPI (jako [proxy-list]), shardy pracuji s nazvy v Zabbixu
+        shard_groups = (
+            config.items("shard-groups") if config.has_section("shard-groups") else []
+        )
+        self.shard_groups = {
+            name: ["zbx-" + proxy for proxy in proxies]
+            for name, proxies in pyshard.parse_shard_groups(shard_groups).items()
+        }
+        self.async_glpi_concurrency = config.getint(
+            "async", "glpi-concurrency", fallback=8
+        )
+        self.async_zabbix_concurrency = config.getint(
+            "async", "zabbix-concurrency", fallback=4
+        )
+
+        # rezim daemon - interval mezi behy, nahodne posunuti
+        # a obnova proxy, skupin a sablon (v sekundach)
+        self.daemon_interval = config.getfloat("daemon", "interval", fallback=300)
+        self.daemon_jitter = config.getfloat("daemon", "jitter", fallback=0)
+        self.reference_refresh = config.getfloat(
+            "daemon", "reference-refresh", fallback=3600
+        )
+
+        # cache tokenu Zabbixu a GLPI mezi behy, None = vzdy nove prihlaseni
+        token_cache = config.get("misc", "token-cache", fallback="")
+        self.token_cache_file = (
+            (base_path / token_cache).resolve() if token_cache else None
+        )
+
+        # cache polozek z GLPI mezi behy (SQLite), None = jen v ramci behu
+        item_cache = config.get("misc", "item-cache", fallback="")
+        self.item_cache_file = (
+            (base_path / item_cache).resolve() if item_cache else None
+        )
+        self.item_cache_size = config.getint("misc", "item-cache-size", fallback=50000)
+        # pocet polozek drzenych v pameti (nezavisle na velikosti cache na disku)
+        self.item_cache_memory_size = config.getint(
+            "misc", "item-cache-memory-size", fallback=10000
+        )
+
+        # soubor s metrikami pro node-exporter (textfile collector), prazdne = nezapisovat
+        self.metrics_file = config.get("metrics", "textfile", fallback="")
+
+        # Seznam proxy v GLPI - vygenerovan seznam z configu
+        self.proxy_list = [i[0] for i in config.items("proxy-list")]
+
+        # nastaveni logovani
+        self.log_file = (base_path / config["logging"]["log-file"]).resolve()
+        self.log_bytes = int(config["logging"]["file-max-bytes"])
+        self.log_counts = int(config["logging"]["file-count"])
+        self.log_level = config["logging"]["log-level"]
+
+    @classmethod
+    def from_file(cls, config_file):
+        """ Nacte nastaveni ze souboru, relativni cesty jsou vuci jeho adresari
+            Parameters:
+                config_file: cesta ke config.ini
+        """
+        config_file = pathlib.Path(config_file).resolve()
+
+        # nastaveni parseru, povoleni klicu bez hodnot
+        config = configparser.ConfigParser(allow_no_value=True)
+        if not config.read(config_file, encoding="utf-8"):
+            raise FileNotFoundError(f"Konfigurace {config_file} neexistuje")
+
+        return cls(config, config_file.parent)
+
+    def create_http_session(self):
+        """ Vytvori HTTP session s poolem spojeni dle nastaveni [http] """
+        return pyhttp.create_session(
+            pool_connections=self.http_pool_connections,
+            pool_maxsize=self.http_pool_maxsize,
+            max_retries=self.http_max_retries,
+            connect_timeout=self.http_connect_timeout,
+            read_timeout=self.http_read_timeout,
+        )
+
+
+class SyncClients(object):
+    """
+    Pripojeni ke GLPI a Zabbixu a referencni data Zabbixu (proxy, skupiny, sablony).
+    V rezimu daemon zustavaji mezi behy - prihlaseni se opakuje jen pri neplatne session.
+    """
+
+    def __init__(self, settings, token_cache=None):
+        """
+        Parameters:
+            settings: SyncSettings
+            token_cache: pytoken.TokenCache - prihlaseni se pouzije znovu i v dalsim procesu
+        """
+        self.settings = settings
+        self.token_cache = token_cache
+        # session patri uzivateli - jiny user-token nesmi dostat cizi session,
+        # v klici je jen otisk tokenu, ne token samotny
+        user_token_hash = hashlib.sha256(settings.glpi_user_token.encode()).hexdigest()
+        self.glpi_token_key = f"glpi:{settings.glpi_url}:{user_token_hash[:16]}"
+        self.zabbix_token_key = f"zabbix:{settings.zabbix_url}:{settings.zabbix_user}"
+
+        # polozky z GLPI se v jednom behu stahuji jen jednou, s item-cache ani mezi behy
+        self.item_cache = pycache.ItemCache(
+            settings.item_cache_file,
+            max_items=settings.item_cache_size,
+            memory_items=settings.item_cache_memory_size,
+        )
+
+        # jeden kodek JSON pro GLPI i Zabbix
+        self.codec = pyjson.get_codec(settings.http_json_codec)
+        logger.debug(f"Kodek JSON: {self.codec.name}")
+
+        # jeden connector (a jedna session) pro export i detaily zarizeni
+        self.glpi = pyglpi.GlpiConnector(
+            settings.glpi_url,
+            settings.glpi_app_token,
+            settings.glpi_user_token,
+            session=settings.create_http_session(),
+            workers=settings.glpi_workers,
+            chunk_size=settings.glpi_chunk_size,
+            page_size=settings.glpi_page_size,
+            item_cache=self.item_cache,
+            stream_json=settings.http_stream_json,
+            codec=self.codec,
+        )
+        self.zabbix = None
+
+        # proxy, skupiny, sablony - nazev:ID
+        self.zbx_proxies = None
+        self.zbx_groups = None
+        self.zbx_templates = None
+        self.reference_time = None
+
+    def ensure_glpi(self):
+        """ Otevre session do GLPI, pokud neni nebo uz neplati """
+        if self.glpi.session_token is None and self.token_cache is not None:
+            self.glpi.session_token = self.token_cache.get(self.glpi_token_key)
+
+        if self.glpi.session_token is not None and self.glpi.check_session():
+            return
+
+        logger.debug("Zahajuji spojeni do GLPI")
+        self.glpi.init_session()
+        # token se do logu nezapisuje
+        logger.debug("Spojeni do GLPI zahajeno")
+
+        if self.token_cache is not None:
+            self.token_cache.set(self.glpi_token_key, self.glpi.session_token)
+
+    def ensure_zabbix(self):
+        """ Prihlasi se do Zabbixu, pokud neni prihlaseno nebo session uz neplati """
+        if self.zabbix is None:
+            # vlastni session kvuli certifikatu (verify), ale se stejnym nastavenim poolu
+            self.zabbix = pyzabbix.ZabbixAPI(
+                self.settings.zabbix_url,
+                session=self.settings.create_http_session(),
+                stream_json=self.settings.http_stream_json,
+                codec=self.codec,
+            )
+            self.zabbix.session.verify = self.settings.zabbix_cert
+
+            if self.token_cache is not None:
+                self.zabbix.auth = self.token_cache.get(self.zabbix_token_key) or ""
+
+        if self.zabbix.auth:
+            try:
+                self.zabbix.check_authentication()
+                return
+            except pyzabbix.ZabbixAPIException as e:
+                logger.info(f"Session do Zabbixu neplati, prihlasuji znovu: {e}")
+
+        # Prihlaseni k API
+        self.zabbix.login(self.settings.zabbix_user, self.settings.zabbix_password)
+
+        if self.token_cache is not None:
+            self.token_cache.set(self.zabbix_token_key, self.zabbix.auth)
+
+    def ensure_reference(self, max_age=None):
+        """ Nacte ze Zabbixu proxy, skupiny a sablony, pokud nejsou nebo jsou starsi nez max_age
+            Parameters:
+                max_age: maximalni stari v sekundach (None = nacist jen poprve)
+        """
+        if self.reference_time is not None and (
+            max_age is None or time.monotonic() - self.reference_time < max_age
+        ):
+            return
+
+        # ziskani dvojic "nazev:ID": proxy, skupiny, sablony
+        self.zbx_proxies = pyzabbix.get_zabbix_items("proxy", self.zabbix)
+        self.zbx_groups = pyzabbix.get_zabbix_items("hostgroup", self.zabbix)
+        self.zbx_templates = pyzabbix.get_zabbix_items("template", self.zabbix)
+        self.reference_time = time.monotonic()
+
+    def close(self):
+        """ Ukonci session do GLPI - s cache tokenu zustava otevrena pro dalsi beh """
+        if self.glpi.session_token is not None and self.token_cache is None:
+            logger.debug("Ukonceni spojeni")
+            try:
+                self.glpi.kill_session()
+            except Exception as e:
+                logger.warning(f"Nelze ukoncit session do GLPI: {e}")
+
+        self.item_cache.close()
+
+
+class SyncEngine(object):
+    """
+    Synchronizace GLPI -> Zabbix po fazich, ktere lze volat a merit samostatne:
+        export() -> pyplan.GlpiExport
+        reconcile(export) -> pyplan.SyncPlan
+        apply(plan) -> citace {"created", "deleted", "updated"}
+    run() provede vse vcetne ulozeni stavu a metrik. Pripojeni zustavaji mezi behy.
+    """
+
+    def __init__(self, settings, sync_state=None, clients=None):
+        """
+        Parameters:
+            settings: SyncSettings
+            sync_state: pystate.SyncStateStore (None = otevre se settings.state_file)
+            clients: SyncClients (None = vytvori se nove)
+        """
+        self.settings = settings
+        self.sync_state = sync_state or pystate.SyncStateStore(settings.state_file)
+
+        if clients is None:
+            token_cache = None
+            if settings.token_cache_file is not None:
+                token_cache = pytoken.TokenCache(settings.token_cache_file)
+            clients = SyncClients(settings, token_cache)
+        self.clients = clients
+
+        # Pokud neni pomocny soubor z posledniho importu, vytvori novy a nastavi posledni pristup s casem 1970-01-05 22:50:42
+        # Je to kvuli prvnimu importu, aby se importovalo vsechno
+        if os.path.isfile(settings.last_import_file) is False:
+            pathlib.Path(settings.last_import_file).touch()
+            os.utime(settings.last_import_file, LAST_IMPORT_FILE_MAGIC_TUPLE)
+
+    def close(self):
+        """ Ukonci pripojeni a zavre databazi stavu """
+        self.clients.close()
+        self.sync_state.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def incremental_since(self):
+        """ Rozhodne, zda probehne inkrementalni export
+            Vraci date_mod, od ktereho se exportuji zmenene polozky (None = plny export)
+        """
+        # posledni plny export a nejnovejsi date_mod z GLPI (watermark) z minulych behu
+        last_full_sync = float(self.sync_state.get_meta("last_full_sync", 0))
+        watermark = self.sync_state.get_meta("glpi_watermark")
+
+        if not (
+            self.settings.full_sync_interval > 0
+            and watermark is not None
+            and time.time() - last_full_sync < self.settings.full_sync_interval
+        ):
+            return None
+
+        # jen zmenene polozky - o sekundu zpet kvuli zmenam ve stejne sekunde, duplicity odfiltruje stav
+        return (
+            datetime.datetime.strptime(watermark, pyplan.DATE_FORMAT)
+            - datetime.timedelta(seconds=1)
+        ).strftime(pyplan.DATE_FORMAT)
+
+    ##############################################################################################################
+    # GLPI export #########################
+    ##############################################################################################################
+
+    def export(self, since=None):
+        """ Export zarizeni z GLPI
+            Parameters:
+                since: jen zarizeni zmenena od date_mod (None = plny export)
+        """
+        REGISTRY.start_phase("glpi_export")
+
+        # pripojeni do GLPI - session zustava i pro ziskani detailu zarizeni
+        connector = self.clients.glpi
+        self.clients.ensure_glpi()
+
+        export = pyplan.export_devices(
+            connector,
+            self.settings.proxy_list,
+            self.sync_state,
+            since=since,
+            newest_date_mod=self.sync_state.get_meta("glpi_watermark"),
+        )
+        logger.debug("Ziskana zarizeni z GLPI")
+
+        # polozky z cache se pouziji jen se shodnym date_mod
+        self.clients.item_cache.start_run(
+            {item["id"]: item["date_mod"] for item in export.no_sort.values()}
+        )
+
+        return export
+
+    ##############################################################################################################
+    # Porovnani se Zabbixem a plan #########################
+    ##############################################################################################################
+
+    def load_zabbix(self, proxy_names):
+        """ Prihlaseni do Zabbixu, referencni data a hosty danych proxy (jeden host.get)
+            Parameters:
+                proxy_names: nazvy proxy v Zabbixu (zbx-...)
+            Vraci pyzabbix.ZabbixInventory
+        """
+        REGISTRY.start_phase("zabbix_reference")
+
+        # prihlaseni (jen pokud session neplati) a proxy, skupiny, sablony
+        self.clients.ensure_zabbix()
+        self.clients.ensure_reference(self.settings.reference_refresh)
+
+        logger.debug("Prace se Zabbixem")
+
+        zbx_proxies = self.clients.zbx_proxies
+
+        # vsechny hosty z proxy ze seznamu - jeden host.get pro cely beh
+        return pyzabbix.get_zabbix_inventory(
+            self.clients.zabbix,
+            zbx_proxies,
+            proxy_ids=[
+                zbx_proxies[proxy_name]
+                for proxy_name in proxy_names
+                if proxy_name in zbx_proxies
+            ],
+        )
+
+    def diff(self, export, inventory, sync_states):
+        """ Porovna export z GLPI s hosty v Zabbixu
+            Parameters:
+                export: pyplan.GlpiExport
+                inventory: pyzabbix.ZabbixInventory
+                sync_states: stav hostu z sync_state.load_all()
+            Vraci (ke smazani, k vytvoreni, ke kontrole zmen, zaznamy stavu nezmenenych hostu)
+        """
+        REGISTRY.start_phase("diff")
+
+        # cas posledniho importu - pro hosty, kteri jeste nejsou ve stavu synchronizace
+        last_import_time = datetime.datetime.fromtimestamp(
+            os.path.getmtime(self.settings.last_import_file)
+        )
+
+        return pyplan.diff_export(
+            export,
+            inventory,
+            self.clients.zbx_proxies,
+            self.sync_state,
+            last_import_time,
+            sync_states=sync_states,
+        )
+
+    def reconcile(self, export):
+        """ Porovna export z GLPI se Zabbixem a sestavi plan zmen - nic nemeni
+            Parameters:
+                export: pyplan.GlpiExport
+            Vraci pyplan.SyncPlan
+        """
+        inventory = self.load_zabbix(export.proxies_with_hosts)
+        sync_states = self.sync_state.load_all()
+        to_delete, to_create, to_update, to_record = self.diff(
+            export, inventory, sync_states
+        )
+
+        REGISTRY.start_phase("plan")
+
+        # plan vsech zmen - detaily z GLPI se ziskaji davkove, Zabbix se uz nedotazuje
+        return pyplan.build_plan(
+            self.clients.glpi,
+            inventory,
+            export.no_sort,
+            to_delete,
+            to_create,
+            to_update,
+            self.clients.zbx_groups,
+            self.clients.zbx_templates,
+            self.clients.zbx_proxies,
+            incremental=export.incremental,
+            newest_date_mod=export.newest_date_mod,
+            records=to_record,
+            sync_state=self.sync_state,
+            sync_states=sync_states,
+        )
+
+    ##############################################################################################################
+    # Provedeni planu #########################
+    ##############################################################################################################
+
+    def apply(self, plan):
+        """ Provede plan v Zabbixu a zapise vysledky do stavu synchronizace
+            Parameters:
+                plan: pyplan.SyncPlan
+            Vraci citace {"created", "deleted", "updated"}
+        """
+        REGISTRY.start_phase("apply")
+
+        # po reconcile je prihlaseno, overuje se jen samostatne provadeny plan
+        if self.clients.zabbix is None:
+            self.clients.ensure_zabbix()
+
+        return pyplan.apply_plan(
+            self.clients.zabbix,
+            plan,
+            self.sync_state,
+            create_chunk_size=self.settings.zabbix_create_chunk_size,
+            batch_size=self.settings.zabbix_batch_size,
+            mass_update_min_hosts=self.settings.zabbix_mass_update_min_hosts,
+        )
+
+    def finish(
+        self,
+        start_time,
+        counters,
+        newest_date_mod,
+        incremental,
+        complete=True,
+        exported_at=None,
+    ):
+        """ Ulozi stav synchronizace, watermark a cas posledniho importu a zapise souhrn
+            Parameters:
+                start_time: zacatek behu
+                counters: pocty vytvorenych, smazanych a upravenych hostu
+                newest_date_mod: nejnovejsi date_mod ze zarizeni z GLPI
+                incremental: probehl inkrementalni import
+                complete: vsechny zmeny byly zpracovany - jinak se ulozi jen stav hostu,
+                          watermark ani cas plneho exportu se neposouvaji
+                exported_at: cas exportu z GLPI (u ulozeneho planu jeho vytvoreni),
+                             None = start_time
+        """
+
+        REGISTRY.end_phase()
+
+        self.clients.item_cache.end_run()
+
+        created = counters["created"]
+        deleted = counters["deleted"]
+        updated = counters["updated"]
+
+        # ulozeni stavu synchronizace a watermarku - watermark ani cas plneho exportu
+        # se nevraci zpet (starsi plan)
+        current_watermark = self.sync_state.get_meta("glpi_watermark")
+        if (
+            complete
+            and newest_date_mod is not None
+            and (current_watermark is None or newest_date_mod > current_watermark)
+        ):
+            self.sync_state.set_meta("glpi_watermark", newest_date_mod)
+        full_sync_time = (exported_at or start_time).timestamp()
+        if (
+            complete
+            and not incremental
+            and full_sync_time > float(self.sync_state.get_meta("last_full_sync", 0))
+        ):
+            self.sync_state.set_meta("last_full_sync", full_sync_time)
+        self.sync_state.commit()
+
+        # Pokud se provedla nejaka akce (smazani, vytvoreni, uprava) "touchne" se soubor a bude mit aktualni cas posledni zmeny
+        if (created or deleted or updated) != 0:
+            pathlib.Path(self.settings.last_import_file).touch()
+
+            logger.info(f" Celkem vytvoreno hostu: {str(created)}")
+            logger.info(f" Celkem odstraneno hostu: {str(deleted)}")
+            logger.info(f" Celkem upravenych hostu: {str(updated)}")
+        else:
+            logger.info("Neprobehla zmena")
+
+        logger.info(f"Celkovy cas importu: {str(datetime.datetime.now() - start_time)}")
+
+        # zapis metrik behu
+        if self.settings.metrics_file:
+            for action, count in (
+                ("created", created),
+                ("deleted", deleted),
+                ("updated", updated),
+            ):
+                REGISTRY.set(
+                    "hosts",
+                    count,
+                    labels={"action": action},
+                    help_text="Pocet zmenenych hostu v poslednim behu",
+                )
+            REGISTRY.set(
+                "run_duration_seconds",
+                (datetime.datetime.now() - start_time).total_seconds(),
+                help_text="Doba posledniho behu importu",
+            )
+            REGISTRY.set(
+                "last_run_timestamp_seconds",
+                time.time(),
+                help_text="Cas dokonceni posledniho behu importu",
+            )
+
+            try:
+                REGISTRY.write_textfile(self.settings.metrics_file)
+            except OSError as e:
+                logger.error(f"Nelze zapsat metriky do {self.settings.metrics_file}: {e}")
+
+    ##############################################################################################################
+    # Cele behy #########################
+    ##############################################################################################################
+
+    def run(self, plan_out=None):
+        """ Provede jeden beh synchronizace GLPI -> Zabbix
+            Parameters:
+                plan_out: cesta, kam ulozit plan pred provedenim (None = neukladat)
+            Vraci citace {"created", "deleted", "updated"}
+        """
+
+        # metriky jsou za jeden beh
+        REGISTRY.reset()
+
+        # Pro urceni celkoveho casu
+        start_time = datetime.datetime.now()
+        logger.debug("Start importu")
+
+        since = self.incremental_since()
+
+        if self.settings.engine == "async":
+            if plan_out:
+                # asynchronni engine planuje a provadi prubezne, plan umi jen postupna synchronizace
+                logger.warning("Plan (--plan-out) neni pro engine = async, pouzit sync")
+            else:
+                counters, newest_date_mod = asyncio.run(self.run_async(since))
+                self.finish(start_time, counters, newest_date_mod, since is not None)
+                return counters
+
+        export = self.export(since)
+
+        if self.settings.shard_workers > 1:
+            if plan_out:
+                logger.warning("Plan (--plan-out) se sestavuje bez rozdeleni po proxy")
+            else:
+                counters, failures = self.run_sharded(export)
+                self.finish(
+                    start_time,
+                    counters,
+                    export.newest_date_mod,
+                    export.incremental,
+                    complete=not failures,
+                )
+                if failures:
+                    raise pyshard.ShardError(failures)
+                return counters
+
+        if self.settings.engine == "pipeline":
+            if plan_out:
+                # pipeline zapisuje prubezne, cely plan neni nikdy v pameti
+                logger.warning("Plan (--plan-out) neni pro engine = pipeline, pouzit sync")
+            else:
+                counters = self.run_pipeline(export)
+                self.finish(
+                    start_time, counters, export.newest_date_mod, export.incremental
+                )
+                return counters
+
+        plan = self.reconcile(export)
+
+        if plan_out:
+            plan.save(plan_out)
+
+        counters = self.apply(plan)
+        self.finish(start_time, counters, export.newest_date_mod, export.incremental)
+
+        return counters
+
+    def dry_run(self, plan_out=None):
+        """ Jen vypocita plan zmen - nic se nezapisuje do Zabbixu ani do stavu synchronizace
+            Parameters:
+                plan_out: cesta, kam ulozit plan (None = neukladat)
+            Vraci pyplan.SyncPlan
+        """
+        REGISTRY.reset()
+
+        plan = self.reconcile(self.export(self.incremental_since()))
+        REGISTRY.end_phase()
+
+        if plan_out:
+            plan.save(plan_out)
+
+        logger.info(plan.summary())
+
+        return plan
+
+    def apply_saved_plan(self, path):
+        """ Provede drive ulozeny plan - bez exportu z GLPI a porovnani
+            Parameters:
+                path: cesta k souboru planu
+        """
+        REGISTRY.reset()
+        start_time = datetime.datetime.now()
+
+        logger.info(f"Provadim plan {path}")
+        saved_plan = pyplan.SyncPlan.load(path)
+        logger.info(saved_plan.summary())
+
+        self.clients.ensure_zabbix()
+
+        counters = self.apply(saved_plan)
+        # plan odpovida stavu GLPI v case sveho vytvoreni, ne v case provedeni
+        self.finish(
+            start_time,
+            counters,
+            saved_plan.newest_date_mod,
+            saved_plan.incremental,
+            exported_at=datetime.datetime.fromisoformat(saved_plan.created_at),
+        )
+
+        return counters
+
+    def run_pipeline(self, export):
+        """ Porovna export se Zabbixem a zmeny provadi prubezne - detaily z GLPI se ziskavaji
+            soubezne se zapisem do Zabbixu (pypipeline)
+            Parameters:
+                export: pyplan.GlpiExport
+            Vraci citace {"created", "deleted", "updated"}
+        """
+        inventory = self.load_zabbix(export.proxies_with_hosts)
+        sync_states = self.sync_state.load_all()
+        to_delete, to_create, to_update, to_record = self.diff(
+            export, inventory, sync_states
+        )
+
+        REGISTRY.start_phase("pipeline")
+
+        return self._pipeline(export, inventory, sync_states).run(
+            to_delete, to_create, to_update, records=to_record
+        )
+
+    def _pipeline(self, export, inventory, sync_states):
+        return pypipeline.SyncPipeline(
+            self.clients.glpi,
+            self.clients.zabbix,
+            inventory,
+            export.no_sort,
+            self.clients.zbx_groups,
+            self.clients.zbx_templates,
+            self.clients.zbx_proxies,
+            sync_state=self.sync_state,
+            sync_states=sync_states,
+            create_chunk_size=self.settings.zabbix_create_chunk_size,
+            batch_size=self.settings.zabbix_batch_size,
+            queue_size=self.settings.pipeline_queue_size,
+            mass_update_min_hosts=self.settings.zabbix_mass_update_min_hosts,
+        )
+
+    def run_sharded(self, export):
+        """ Porovna export se Zabbixem a zmeny provede po shardech (proxy nebo skupina proxy),
+            shardy bezi soubezne nad spolecnymi pripojenimi
+            Parameters:
+                export: pyplan.GlpiExport
+            Vraci (sloucene citace {"created", "deleted", "updated"}, selhane shardy)
+        """
+        inventory = self.load_zabbix(export.proxies_with_hosts)
+
+        # porovnani probiha nad vsemi proxy najednou (zmena proxy = uprava)
+        sync_states = self.sync_state.load_all()
+        to_delete, to_create, to_update, to_record = self.diff(
+            export, inventory, sync_states
+        )
+
+        REGISTRY.start_phase("shards")
+
+        for state in to_record:
+            pyplan.record_state(self.sync_state, state)
+
+        shards = pyshard.partition(
+            export,
+            inventory,
+            to_delete,
+            to_create,
+            to_update,
+            groups=self.settings.shard_groups,
+        )
+        logger.info(
+            f"Shardy: {', '.join(f'{shard.name} ({shard.size()})' for shard in shards)}"
+        )
+
+        def worker(shard):
+            if self.settings.engine == "pipeline":
+                return self._pipeline(export, inventory, sync_states).run(
+                    shard.to_delete, shard.to_create, shard.to_update
+                )
+
+            plan = pyplan.build_plan(
+                self.clients.glpi,
+                inventory,
+                export.no_sort,
+                shard.to_delete,
+                shard.to_create,
+                shard.to_update,
+                self.clients.zbx_groups,
+                self.clients.zbx_templates,
+                self.clients.zbx_proxies,
+                incremental=export.incremental,
+                newest_date_mod=export.newest_date_mod,
+                sync_state=self.sync_state,
+                sync_states=sync_states,
+            )
+
+            return pyplan.apply_plan(
+                self.clients.zabbix,
+                plan,
+                self.sync_state,
+                create_chunk_size=self.settings.zabbix_create_chunk_size,
+                batch_size=self.settings.zabbix_batch_size,
+                mass_update_min_hosts=self.settings.zabbix_mass_update_min_hosts,
+            )
+
+        return pyshard.run_shards(shards, worker, self.settings.shard_workers)
+
+    async def run_async(self, since):
+        """ Cela synchronizace pres asynchronni klienty (pyaio) nad pripojenimi ze SyncClients
+            Parameters:
+                since: date_mod pro inkrementalni export (None = plny export)
+        """
+        self.clients.ensure_glpi()
+        self.clients.ensure_zabbix()
+
+        glpi = pyaio.AsyncGlpiConnector(
+            self.clients.glpi, concurrency=self.settings.async_glpi_concurrency
+        )
+        zabbix = pyaio.AsyncZabbixAPI(
+            self.clients.zabbix, concurrency=self.settings.async_zabbix_concurrency
+        )
+
+        try:
+            driver = pyaio.AsyncSyncDriver(
+                glpi,
+                zabbix,
+                self.settings.proxy_list,
+                self.sync_state,
+                datetime.datetime.fromtimestamp(
+                    os.path.getmtime(self.settings.last_import_file)
+                ),
+                create_chunk_size=self.settings.zabbix_create_chunk_size,
+                batch_size=self.settings.zabbix_batch_size,
+                mass_update_min_hosts=self.settings.zabbix_mass_update_min_hosts,
+                since=since,
+            )
+            counters = await driver.run()
+        finally:
+            glpi.close()
+            zabbix.close()
+
+        return counters, driver.newest_date_mod
+
+    def run_daemon(self, stop_event):
+        """ Opakuje synchronizaci v intervalu s nahodnym posunutim, dokud neni nastaven stop_event
+            Pripojeni a referencni data Zabbixu zustavaji mezi behy.
+            Parameters:
+                stop_event: threading.Event pro ukonceni (SIGTERM, SIGINT)
+        """
+        interval = self.settings.daemon_interval
+        jitter = self.settings.daemon_jitter
+
+        logger.info(f"Rezim daemon - interval {interval} s, posunuti az {jitter} s")
+
+        while not stop_event.is_set():
+            run_start = time.monotonic()
+
+            try:
+                self.run()
+            except Exception as e:
+                # chyba jednoho behu daemon neukonci - dalsi beh overi a obnovi pripojeni
+                logger.exception(f"Beh synchronizace selhal: {e}")
+
+            # dalsi beh az po intervalu od zacatku tohoto behu + nahodne posunuti
+            delay = max(
+                0.0,
+                interval - (time.monotonic() - run_start) + random.uniform(0, jitter),
+            )
+            logger.debug(f"Dalsi beh za {delay:.1f} s")
+            stop_event.wait(delay)
+
+        logger.info("Rezim daemon ukoncen")
@@ -0,0 +1,90 @@
+# Popis: Cache prihlasovacich tokenu (Zabbix auth, GLPI session token) na disku mezi behy,
+#        soubor je citelny jen pro vlastnika (0600)
+# Autor: prispevatele zbximport
+# Licence: MIT https://spdx.org/licenses/MIT.html
+# Copyright 2026 prispevatele zbximport
+
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+
+# nastaveni logovani - best practice
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class TokenCache(object):
+    """ Tokeny ulozene v JSON souboru - klic (napr. zabbix:URL:uzivatel) -> token """
+
+    def __init__(self, path):
+        """
+        Parameters:
+            path: cesta k souboru cache
+        """
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.tokens = self._load()
+
+    def _load(self):
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            return {}
+
+        if mode & (stat.S_IRWXG | stat.S_IRWXO):
+            # cizi muze token precist - nepouzit a prepsat
+            logger.warning(f"Cache tokenu {self.path} je citelna pro ostatni, ignoruji")
+            return {}
+
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                tokens = json.load(cache_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Nelze nacist cache tokenu {self.path}: {e}")
+            return {}
+
+        return tokens if isinstance(tokens, dict) else {}
+
+    def _save(self):
+        # mkstemp vytvari soubor s pravy 0600, prejmenovani je atomicke
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=".zbximport-tokens.", suffix=".tmp"
+        )
+
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as temp_file:
+                json.dump(self.tokens, temp_file)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            os.unlink(temp_path)
+            logger.warning(f"Nelze zapsat cache tokenu {self.path}: {e}")
+
+    def get(self, key):
+        """ Vrati token (None pokud neni)
+            Parameters:
+                key: klic tokenu
+        """
+        with self.lock:
+            return self.tokens.get(key)
+
+    def set(self, key, token):
+        """ Ulozi token (None = smaze)
+            Parameters:
+                key: klic tokenu
+                token: token
+        """
+        with self.lock:
+            if token is None:
+                if self.tokens.pop(key, None) is None:
+                    return
+            elif self.tokens.get(key) == token:
+                return
+            else:
+                self.tokens[key] = token
+
+            self._save()
@@ -12,10 +12,20 @@
 import logging
 import requests
 import json
+import threading
+import time
+
+from pyjson import ArrayStream, get_codec
+from pylog import LazyJson
+from pyhost import HostRecord, SYNC_FIELDS, intern_value
+from pymetrics import REGISTRY, request_size, response_size
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# metody, jejichz vysledek (result) je token prihlaseni - v logu se skryje
+LOGIN_METHODS = ("user.login", "user.authenticate")
+
 
 class ZabbixAPIException(Exception):
     """ generic zabbix api exception
@@ -36,6 +46,8 @@ class ZabbixAPI(object):
         use_authenticate=False,
         timeout=None,
         proxies=None,
+        stream_json=False,
+        codec=None,
     ):
         """
         Parameters:
@@ -46,6 +58,8 @@ class ZabbixAPI(object):
                      None (if you're using Requests >= 2.4 you can set it as tuple: "(connect, read)"
                      which is used to set individual connect and read timeouts.)
             proxies: Proxy authentication
+            stream_json: iter_request decodes the result array incrementally (pyjson)
+            codec: JSON codec (pyjson.get_codec), default: fastest installed library
         """
 
         if session:
@@ -65,9 +79,13 @@ class ZabbixAPI(object):
         self.use_authenticate = use_authenticate
         self.auth = ""
         self.id = 0
+        # id pozadavku muze zvysovat vice vlaken zaroven
+        self.id_lock = threading.Lock()
 
         self.timeout = timeout
         self.proxies = proxies
+        self.stream_json = stream_json
+        self.codec = codec or get_codec()
         self.url = server + "/api_jsonrpc.php"
         logger.debug(f"JSON-RPC Server Endpoint: {str(self.url)}")
 
@@ -107,12 +125,28 @@ class ZabbixAPI(object):
     def api_version(self):
         return self.apiinfo.version()
 
-    def do_request(self, method, params=None):
+    def batch(self, size=100):
+        """Collect API calls and send them as JSON-RPC 2.0 batch requests
+           Usage:
+               with zapi.batch() as b:
+                   call = b.host.update(hostid="10084", status=0)
+               call.result
+           :param size: maximum number of calls in one HTTP request
+        """
+
+        return ZabbixAPIBatch(self, size)
+
+    def build_request(self, method, params=None):
+        """Create JSON-RPC request object with a new id and the auth token"""
+        with self.id_lock:
+            request_id = self.id
+            self.id += 1
+
         request_json = {
             "jsonrpc": "2.0",
             "method": method,
             "params": params or {},
-            "id": self.id,
+            "id": request_id,
         }
 
         # We don't have to pass the auth token if asking for the apiinfo.version or user.checkAuthentication
@@ -123,48 +157,137 @@ class ZabbixAPI(object):
         ):
             request_json["auth"] = self.auth
 
-        logger.debug(
-            f"Sending: {json.dumps(request_json, indent=4, separators=(',', ': '))}"
-        )
-        response = self.session.post(
-            self.url,
-            data=json.dumps(request_json),
-            timeout=self.timeout,
-            proxies=self.proxies,
-        )
-        logger.debug(f"Response Code: {str(response.status_code)}")
+        return request_json
 
-        # NOTE: Getting a 412 response code means the headers are not in the
-        # list of allowed headers.
-        response.raise_for_status()
+    def post(self, request_json):
+        """Send JSON-RPC request object (or batch array) and return parsed response"""
+        # serializace pro log az pri zapisu zaznamu (jen DEBUG)
+        logger.debug("Sending: %s", LazyJson(request_json))
 
-        if not len(response.text):
-            raise ZabbixAPIException("Received empty response")
+        # stitek metriky - metoda, u davky "batch"
+        method = request_json["method"] if isinstance(request_json, dict) else "batch"
+        data = self.codec.dumps(request_json)
+        start = time.monotonic()
+        status = "error"
+        response = None
 
         try:
-            response_json = json.loads(response.text)
-        except ValueError:
-            raise ZabbixAPIException("Unable to parse json: %s" % response.text)
-        logger.debug(
-            f"Response Body: {json.dumps(response_json, indent=4, separators=(',', ': '))}"
+            response = self.session.post(
+                self.url, data=data, timeout=self.timeout, proxies=self.proxies
+            )
+            logger.debug("Response Code: %s", response.status_code)
+
+            # NOTE: Getting a 412 response code means the headers are not in the
+            # list of allowed headers.
+            response.raise_for_status()
+
+            if not len(response.content):
+                raise ZabbixAPIException("Received empty response")
+
+            try:
+                response_json = self.codec.loads(response.content)
+            except ValueError:
+                raise ZabbixAPIException("Unable to parse json: %s" % response.text)
+            logger.debug(
+                "Response Body: %s",
+                LazyJson(
+                    response_json,
+                    secret_keys=("result",) if method in LOGIN_METHODS else (),
+                ),
+            )
+
+            if not (isinstance(response_json, dict) and "error" in response_json):
+                status = "ok"
+        finally:
+            # pozadavek vcetne hlavicek, odpoved pred dekompresi - stejne jako GLPI
+            REGISTRY.observe_request(
+                "zabbix",
+                method,
+                time.monotonic() - start,
+                status,
+                sent=request_size(response.request) if response is not None else 0,
+                received=response_size(response) if response is not None else 0,
+            )
+
+        return response_json
+
+    @staticmethod
+    def response_error(response_json):
+        """Create ZabbixAPIException from JSON-RPC error response"""
+        if (
+            "data" not in response_json["error"]
+        ):  # some errors don't contain 'data': workaround for ZBX-9340
+            response_json["error"]["data"] = "No data"
+        msg = "Error {code}: {message}, {data}".format(
+            code=response_json["error"]["code"],
+            message=response_json["error"]["message"],
+            data=response_json["error"]["data"],
         )
+        return ZabbixAPIException(msg, response_json["error"]["code"])
 
-        self.id += 1
+    def do_request(self, method, params=None):
+        response_json = self.post(self.build_request(method, params))
 
         if "error" in response_json:  # some exception
-            if (
-                "data" not in response_json["error"]
-            ):  # some errors don't contain 'data': workaround for ZBX-9340
-                response_json["error"]["data"] = "No data"
-            msg = "Error {code}: {message}, {data}".format(
-                code=response_json["error"]["code"],
-                message=response_json["error"]["message"],
-                data=response_json["error"]["data"],
-            )
-            raise ZabbixAPIException(msg, response_json["error"]["code"])
+            raise self.response_error(response_json)
 
         return response_json
 
+    def iter_request(self, method, params=None):
+        """Call method and yield elements of the result array one at a time
+           With stream_json the response body is read and decoded incrementally,
+           so neither the whole text nor the whole result is held in memory.
+           :param method: JSON-RPC method returning an array (ie: host.get)
+           :param params: method parameters
+        """
+        if not self.stream_json:
+            yield from self.do_request(method, params)["result"]
+            return
+
+        request_json = self.build_request(method, params)
+        logger.debug("Sending (stream): %s", LazyJson(request_json))
+
+        data = self.codec.dumps(request_json)
+        start = time.monotonic()
+        status = "error"
+        response = None
+        stream = None
+
+        try:
+            response = self.session.post(
+                self.url,
+                data=data,
+                timeout=self.timeout,
+                proxies=self.proxies,
+                stream=True,
+            )
+            logger.debug("Response Code: %s", response.status_code)
+            response.raise_for_status()
+
+            stream = ArrayStream.from_response(response, key="result")
+            try:
+                yield from stream
+            except ValueError as e:
+                raise ZabbixAPIException("Unable to parse json: %s" % e)
+
+            if "error" in stream.members:
+                raise self.response_error(stream.members)
+
+            logger.debug("Response Body: %s items", stream.count)
+            status = "ok"
+        finally:
+            # doba vcetne zpracovani prvku volajicim - odpoved se cte prubezne
+            REGISTRY.observe_request(
+                "zabbix",
+                method,
+                time.monotonic() - start,
+                status,
+                sent=request_size(response.request) if response is not None else 0,
+                received=response_size(response) if response is not None else 0,
+            )
+            if response is not None:
+                response.close()
+
     def __getattr__(self, attr):
         """Dynamically create an object class (ie: host)"""
         return ZabbixAPIObjectClass(attr, self)
@@ -189,6 +312,108 @@ class ZabbixAPIObjectClass(object):
         return new_fn
 
 
+class ZabbixAPIBatchCall(object):
+    """Result of one call in a batch, filled in after the batch is sent"""
+
+    def __init__(self, method, request_id):
+        self.method = method
+        self.id = request_id
+        self.done = False
+        self.error = None
+        self._result = None
+
+    @property
+    def result(self):
+        """Returned value of the call, raises ZabbixAPIException if the call failed"""
+        if not self.done:
+            raise ZabbixAPIException(f"Batch with {self.method} has not been sent yet")
+        if self.error is not None:
+            raise self.error
+        return self._result
+
+    def __bool__(self):
+        return self.done and self.error is None
+
+
+class ZabbixAPIBatch(object):
+    """Collects calls made through it and sends them as JSON-RPC batch arrays"""
+
+    def __init__(self, parent, size=100):
+        self.parent = parent
+        self.size = max(1, int(size))
+        self.requests = []
+        self.calls = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # pri vyjimce uvnitr bloku se rozpracovana davka neodesila
+        if exc_type is None:
+            self.send()
+        return False
+
+    def do_request(self, method, params=None):
+        request_json = self.parent.build_request(method, params)
+        call = ZabbixAPIBatchCall(method, request_json["id"])
+
+        self.requests.append(request_json)
+        self.calls[request_json["id"]] = call
+
+        if len(self.requests) >= self.size:
+            self.send()
+
+        # stejny tvar jako ZabbixAPI.do_request, aby fungoval ZabbixAPIObjectClass
+        return {"result": call}
+
+    def send(self):
+        """Send collected calls in one HTTP request and map responses back by id"""
+        if not self.requests:
+            return
+
+        requests_json, self.requests = self.requests, []
+        calls, self.calls = self.calls, {}
+
+        try:
+            response_json = self.parent.post(requests_json)
+
+            # chyba cele davky (napr. Invalid request) prijde jako jeden objekt
+            if isinstance(response_json, dict):
+                if "error" in response_json:
+                    raise self.parent.response_error(response_json)
+                response_json = [response_json]
+
+        except (requests.RequestException, ZabbixAPIException) as error:
+            logger.error(f"Davka {len(calls)} volani selhala: {error}")
+            for call in calls.values():
+                call.error = error
+                call.done = True
+            return
+
+        for item in response_json:
+            call = calls.pop(item.get("id"), None)
+
+            if call is None:
+                continue
+
+            if "error" in item:
+                call.error = self.parent.response_error(item)
+                logger.error(f"Volani {call.method} (id {call.id}): {call.error}")
+            else:
+                call._result = item.get("result")
+
+            call.done = True
+
+        # volani, na ktera server neodpovedel
+        for call in calls.values():
+            call.error = ZabbixAPIException(f"No response for {call.method} (id {call.id})")
+            call.done = True
+
+    def __getattr__(self, attr):
+        """Dynamically create an object class (ie: host)"""
+        return ZabbixAPIObjectClass(attr, self)
+
+
 def get_zabbix_items(item_type, zabbix_api):
     """
     Ziska ze Zabbixu polozku dle parametru
@@ -281,6 +506,22 @@ class DictDiffer(object):
         return tuple(self.tmp_unchanged)
 
 
+def changed_fields(current, past, fields=SYNC_FIELDS):
+    """
+    Vrati nazvy polozek, ktere maji oba hosty a lisi se - jako DictDiffer.changed(),
+    ale jen pro dane polozky a bez sestavovani mnozin
+    Parameters:
+        current: parametry hosta (HostRecord nebo slovnik)
+        past: parametry hosta (HostRecord nebo slovnik)
+        fields: porovnavane polozky
+    """
+    return tuple(
+        field
+        for field in fields
+        if field in current and field in past and current[field] != past[field]
+    )
+
+
 def get_hosts_from_proxy(zabbix_api, proxy_id):
     """
     Ziska ze Zabbixu polozku dle parametru
@@ -288,8 +529,8 @@ def get_hosts_from_proxy(zabbix_api, proxy_id):
         proxy_id: ID proxy v Zabbixu
         zabbix_api: API Zabbixu
     """
-    # ziskani vsech hostu s danou(aktualni) proxy
-    zabbix_hosts = zabbix_api.host.get(proxyids=proxy_id)
+    # ziskani vsech hostu s danou(aktualni) proxy - postupne, viz ZabbixAPI.iter_request
+    zabbix_hosts = zabbix_api.iter_request("host.get", {"proxyids": proxy_id})
 
     # extrakce polozek z Zabbix JSONu - kvuli porovnani - potrebuje jen nazvy
     zabbix_hosts_list = [i["host"] for i in zabbix_hosts]
@@ -332,7 +573,12 @@ def delete_zbx_hosts(zabbix_api, list_to_delete):
 
 
 def create_zbx_hosts(
-    zabbix_api, list_of_host_params, zbx_groups, zbx_templates, zbx_proxies
+    zabbix_api,
+    list_of_host_params,
+    zbx_groups,
+    zbx_templates,
+    zbx_proxies,
+    chunk_size=1,
 ):
     """
     Vytvori v Zabbixu polozky
@@ -342,89 +588,162 @@ def create_zbx_hosts(
         zbx_groups: skupiny v Zabbixu - jméno:ID
         zbx_templates: šablony v Zabbixu -  jméno:ID
         zbx_proxies: proxy v Zabbixu - jméno:ID
+        chunk_size: pocet hostu vytvarenych jednim volanim host.create
     """
     logger.info(
         f"Je nutne vytvorit hosty {str([i['name'] for i in list_of_host_params])}"
     )
-    created_hosts = []
+    all_parameters = []
 
     for item in list_of_host_params:
-
-        # pokud je host_name nebo ip_addr "None" NEBO group_id nebo domains_id "0", preskoc polozku
-        #
-        if "None" in {item["dns_name"]} or "0" in {
-            item["groups_id"],
-            item["domains_id"],
-        }:
-            logger.warning(f"Preskakuji: {item['host_name']} -> chybeji udaje.")
-            continue
-
-        # kontrola name == hostname
-        if (item["name"] != item["host_name"]) and (item["multi_interface"] == False):
-            logger.warning(
-                f"Preskakuji: {item['host_name']} -> hostname({item['host_name']}) != name({item['name']})"
+        # skupina, sablona nebo proxy, ktera v Zabbixu neni - preskoci se jen tento host
+        try:
+            parameters = get_zbx_host_create_params(
+                item, zbx_groups, zbx_templates, zbx_proxies
             )
+        except KeyError as e:
+            logger.warning(f"Preskakuji: {item['host_name']} -> neni v Zabbixu {e}")
             continue
 
-        # "vyroba" parametru pro vytvoreni polozky v Zabbixu
-
-        # pokud je to UPS
-        if "ups" in item["groups_id"]:
-            parameters = {
-                "host": item["host_name"],  # host_name
-                "interfaces": [
-                    {
-                        "type": 2,
-                        "main": 1,
-                        "useip": 1,  # pouziti IP misto DNS
-                        "ip": item["ip_addr"],
-                        "dns": item["dns_name"],
-                        "port": "161",
-                        "bulk": "0",
-                    }
-                ],
-                "macros": [{"macro": "{$SNMP_COMMUNITY}", "value": "public"}],
-                "groups": [{"groupid": zbx_groups[item["groups_id"]]}],
-                "templates": [{"templateid": zbx_templates[item["domains_id"]]}],
-                "proxy_hostid": zbx_proxies[item["zbx_proxy"]],
-                "inventory_mode": -1,
-            }
-        # neni UPS
-        else:
-            parameters = {
-                "host": item["host_name"],
-                "interfaces": [
-                    {
-                        "type": 1,
-                        "main": 1,
-                        "useip": 1,  # pouziti IP misto DNS
-                        "ip": item["ip_addr"],
-                        "dns": item["dns_name"],
-                        "port": "10050",
-                    }
-                ],
-                "groups": [{"groupid": zbx_groups[item["groups_id"]]}],
-                "templates": [{"templateid": zbx_templates[item["domains_id"]]}],
-                "proxy_hostid": zbx_proxies[item["zbx_proxy"]],
-                "inventory_mode": -1,
-            }
-        logger.debug(f"Parametry noveho objektu: {str(parameters)}")
+        if parameters is not None:
+            all_parameters.append(parameters)
 
-        # vytvoreni noveho hosta s parametry - viz vyse
+    return list(create_zbx_hosts_from_params(zabbix_api, all_parameters, chunk_size))
 
-        try:
-            new_zabbix_host = zabbix_api.host.create(parameters)
-        except Exception as error:
+
+def get_zbx_host_create_params(item, zbx_groups, zbx_templates, zbx_proxies):
+    """
+    Sestavi parametry pro host.create z polozky z GLPI
+    Parameters:
+        item: polozka s parametry (viz GlpiConnector.parse_item_parameters)
+        zbx_groups: skupiny v Zabbixu - jméno:ID
+        zbx_templates: šablony v Zabbixu -  jméno:ID
+        zbx_proxies: proxy v Zabbixu - jméno:ID
+    Vraci None, pokud se ma polozka preskocit
+    """
+
+    # pokud je host_name nebo ip_addr "None" NEBO group_id nebo domains_id "0", preskoc polozku
+    #
+    if "None" in {item["dns_name"]} or "0" in {
+        item["groups_id"],
+        item["domains_id"],
+    }:
+        logger.warning(f"Preskakuji: {item['host_name']} -> chybeji udaje.")
+        return None
+
+    # kontrola name == hostname
+    if (item["name"] != item["host_name"]) and (item["multi_interface"] == False):
+        logger.warning(
+            f"Preskakuji: {item['host_name']} -> hostname({item['host_name']}) != name({item['name']})"
+        )
+        return None
+
+    # "vyroba" parametru pro vytvoreni polozky v Zabbixu
+
+    # pokud je to UPS
+    if "ups" in item["groups_id"]:
+        parameters = {
+            "host": item["host_name"],  # host_name
+            "interfaces": [
+                {
+                    "type": 2,
+                    "main": 1,
+                    "useip": 1,  # pouziti IP misto DNS
+                    "ip": item["ip_addr"],
+                    "dns": item["dns_name"],
+                    "port": "161",
+                    "bulk": "0",
+                }
+            ],
+            "macros": [{"macro": "{$SNMP_COMMUNITY}", "value": "public"}],
+            "groups": [{"groupid": zbx_groups[item["groups_id"]]}],
+            "templates": [{"templateid": zbx_templates[item["domains_id"]]}],
+            "proxy_hostid": zbx_proxies[item["zbx_proxy"]],
+            "inventory_mode": -1,
+        }
+    # neni UPS
+    else:
+        parameters = {
+            "host": item["host_name"],
+            "interfaces": [
+                {
+                    "type": 1,
+                    "main": 1,
+                    "useip": 1,  # pouziti IP misto DNS
+                    "ip": item["ip_addr"],
+                    "dns": item["dns_name"],
+                    "port": "10050",
+                }
+            ],
+            "groups": [{"groupid": zbx_groups[item["groups_id"]]}],
+            "templates": [{"templateid": zbx_templates[item["domains_id"]]}],
+            "proxy_hostid": zbx_proxies[item["zbx_proxy"]],
+            "inventory_mode": -1,
+        }
+    logger.debug(f"Parametry noveho objektu: {str(parameters)}")
+
+    return parameters
+
+
+def create_zbx_hosts_from_params(zabbix_api, all_parameters, chunk_size=1):
+    """
+    Vytvori v Zabbixu hosty z hotovych parametru pro host.create po davkach
+    Parameters:
+        zabbix_api: API Zabbixu
+        all_parameters: seznam parametru hostu (viz get_zbx_host_create_params)
+        chunk_size: pocet hostu vytvarenych jednim volanim host.create
+    Vraci slovnik nazev vytvoreneho hosta:ID
+    """
+    created_hosts = {}
+    chunk_size = max(1, int(chunk_size))
+
+    for i in range(0, len(all_parameters), chunk_size):
+        created_hosts.update(
+            _create_zbx_hosts_chunk(zabbix_api, all_parameters[i : i + chunk_size])
+        )
+
+    return created_hosts
+
+
+def _create_zbx_hosts_chunk(zabbix_api, chunk):
+    """
+    Vytvori davku hostu jednim volanim host.create. Zabbix vytvari davku v transakci,
+    takze pri chybe jednoho hosta se nevytvori nic - davka se pak puli, dokud se nenajde
+    vadny host, a ostatni se vytvori.
+    Parameters:
+        zabbix_api: API Zabbixu
+        chunk: seznam parametru hostu pro host.create
+    Vraci slovnik nazev vytvoreneho hosta:ID
+    """
+
+    try:
+        # nutno volat takto, jinak ZabbixApi dava parametry do tuple v request JSONu
+        new_zabbix_hosts = zabbix_api.do_request("host.create", params=chunk)["result"]
+    except ZabbixAPIException as error:
+        if len(chunk) == 1:
             logger.exception(error)
-            logger.exception(f"Nesel vytvorit {item['host_name']}")
-            new_zabbix_host = None
+            logger.exception(f"Nesel vytvorit {chunk[0]['host']}")
             logger.exception("Chyba pri vytvoreni hosta")
+            return {}
 
-        if new_zabbix_host:
-            logger.info(
-                f"Vytvoren host {item['host_name']} s ID {str(new_zabbix_host['hostids'][0])}"
-            )
-        created_hosts.append(item["host_name"])
+        logger.warning(f"Davka {len(chunk)} hostu selhala, delim na poloviny: {error}")
+        half = len(chunk) // 2
+
+        created_hosts = _create_zbx_hosts_chunk(zabbix_api, chunk[:half])
+        created_hosts.update(_create_zbx_hosts_chunk(zabbix_api, chunk[half:]))
+
+        return created_hosts
+    except Exception as error:
+        # chyba spojeni apod. - puleni by nepomohlo
+        logger.exception(error)
+        logger.exception(f"Nesly vytvorit hosty {str([i['host'] for i in chunk])}")
+        return {}
+
+    created_hosts = {}
+
+    for parameters, host_id in zip(chunk, new_zabbix_hosts["hostids"]):
+        logger.info(f"Vytvoren host {parameters['host']} s ID {str(host_id)}")
+        created_hosts[parameters["host"]] = host_id
 
     return created_hosts
 
@@ -445,113 +764,270 @@ def get_params_zbx_host(zabbix_api, host_name, zbx_proxies):
         output=["name", "proxy_hostid"],
     )
 
-    host_name = zabb_host[0]["name"]
-    dns_name = zabb_host[0]["interfaces"][0]["dns"]
-    ip_addr = zabb_host[0]["interfaces"][0]["ip"]
-
-    proxy = zabb_host[0]["proxy_hostid"]
-    zbx_proxy = list(zbx_proxies.keys())[list(zbx_proxies.values()).index(proxy)]
-    groups_id = zabb_host[0]["groups"][0]["name"]
-    domains_id = zabb_host[0]["parentTemplates"][0]["name"]
-    zbx_id = zabb_host[0]["hostid"]
-    interface_id = zabb_host[0]["interfaces"][0]["interfaceid"]
-
-    new_host = {
-        "host_name": host_name,
-        "dns_name": dns_name,
-        "ip_addr": ip_addr,
-        "zbx_proxy": zbx_proxy,
-        "groups_id": groups_id,
-        "domains_id": domains_id,
-        "zbx_id": zbx_id,
-        "zbx_interface_id": interface_id,
-    }
+    proxy_names = {proxy_id: name for name, proxy_id in zbx_proxies.items()}
 
-    return new_host
+    return parse_zbx_host(zabb_host[0], proxy_names)
 
 
-def update_zbx_host(
-    zabbix_api, glpi_host, zbx_host, zbx_groups, zbx_templates, zbx_proxies
-):
+def parse_zbx_host(zabb_host, proxy_names):
     """"
-    Zjisti rozdil mezi hostem v GLPI a Zabbixu a upravy zmenene polozky dle GLPI.
+    Parsovani hosta ze Zabbixu (vysledek host.get se select* parametry)
+    Parameters:
+        zabb_host: host ze Zabbixu
+        proxy_names: proxy v Zabbixu - ID:jméno
+    """
+
+    host_name = zabb_host["name"]
+    if host_name == zabb_host.get("host"):
+        # stejny retezec jako klic v indexech ZabbixInventory
+        host_name = zabb_host["host"]
+    dns_name = zabb_host["interfaces"][0]["dns"]
+    ip_addr = zabb_host["interfaces"][0]["ip"]
+
+    zbx_proxy = proxy_names.get(zabb_host["proxy_hostid"])
+    groups_id = zabb_host["groups"][0]["name"]
+    domains_id = zabb_host["parentTemplates"][0]["name"]
+    zbx_id = zabb_host["hostid"]
+    interface_id = zabb_host["interfaces"][0]["interfaceid"]
+
+    # zaznam s __slots__ - proxy, skupina a sablona jsou sdilene retezce (intern)
+    new_host = HostRecord(
+        host_name=host_name,
+        dns_name=dns_name,
+        ip_addr=ip_addr,
+        zbx_proxy=intern_value(zbx_proxy) if zbx_proxy is not None else None,
+        groups_id=intern_value(groups_id),
+        domains_id=intern_value(domains_id),
+        zbx_id=zbx_id,
+        zbx_interface_id=interface_id,
+    )
+
+    return new_host
+
+
+class ZabbixInventory(object):
+    """
+    Index hostu ze Zabbixu ziskanych jednim host.get - pro cely beh importu
+    by_name: nazev hosta -> parametry hosta (stejny format jako get_params_zbx_host)
+    by_proxy: nazev proxy -> seznam nazvu hostu
+    host_ids: nazev hosta -> ID hosta (i pro hosty bez kompletnich parametru)
+    proxy_names: ID proxy -> nazev proxy
+    """
+
+    def __init__(self, zabbix_hosts, zbx_proxies):
+        """
+        Parameters:
+            zabbix_hosts: hosty z host.get se select* parametry (seznam nebo generator)
+            zbx_proxies: proxy v Zabbixu - jméno:ID
+        """
+        self.proxy_names = {proxy_id: name for name, proxy_id in zbx_proxies.items()}
+        self.by_name = {}
+        self.by_proxy = {name: [] for name in zbx_proxies}
+        self.host_ids = {}
+
+        for zabb_host in zabbix_hosts:
+            self.host_ids[zabb_host["host"]] = zabb_host["hostid"]
+            proxy_name = self.proxy_names.get(zabb_host["proxy_hostid"])
+
+            if proxy_name is not None:
+                self.by_proxy[proxy_name].append(zabb_host["host"])
+
+            try:
+                self.by_name[zabb_host["host"]] = parse_zbx_host(
+                    zabb_host, self.proxy_names
+                )
+            except (KeyError, IndexError):
+                # host bez rozhrani, skupiny nebo sablony - nelze porovnavat
+                logger.warning(f"Host {zabb_host['host']} nema kompletni parametry")
+                self.by_name[zabb_host["host"]] = None
+
+    def get_hosts_from_proxy(self, proxy_name):
+        """
+        Vrati seznam nazvu hostu s danou proxy
+        Parameters:
+            proxy_name: nazev proxy v Zabbixu
+        """
+        return self.by_proxy.get(proxy_name, [])
+
+    def get_interface_hosts(self, proxy_name):
+        """
+        Vrati hosty zarizeni s vice rozhranimi (nazev---rozhrani) s danou proxy
+        - nazev zarizeni v GLPI:seznam nazvu hostu
+        Parameters:
+            proxy_name: nazev proxy v Zabbixu
+        """
+        interface_hosts = {}
+
+        for host_name in self.get_hosts_from_proxy(proxy_name):
+            if "---" in host_name:
+                interface_hosts.setdefault(host_name.split("---")[0], []).append(
+                    host_name
+                )
+
+        return interface_hosts
+
+    def get_params(self, host_name):
+        """
+        Vrati parametry hosta (None pokud host neni nebo nema kompletni parametry)
+        Parameters:
+            host_name: nazev hosta
+        """
+        return self.by_name.get(host_name)
+
+
+def get_zabbix_inventory(zabbix_api, zbx_proxies, proxy_ids=None):
+    """
+    Ziska ze Zabbixu jednim host.get vsechny hosty danych proxy vcetne parametru
     Parameters:
         zabbix_api: API Zabbixu
+        zbx_proxies: proxy v Zabbixu - jméno:ID
+        proxy_ids: seznam ID proxy, jejichz hosty se maji ziskat (None = vsechny proxy)
+    """
+    if proxy_ids is None:
+        proxy_ids = list(zbx_proxies.values())
+
+    # hosty se zpracuji postupne, se stream_json bez celeho vysledku host.get v pameti
+    zabbix_hosts = zabbix_api.iter_request(
+        "host.get",
+        {
+            "proxyids": list(proxy_ids),
+            "selectParentTemplates": ["name"],
+            "selectGroups": ["name"],
+            "selectInterfaces": ["dns", "port", "ip", "interfaceid"],
+            "output": ["host", "name", "proxy_hostid"],
+        },
+    )
+    inventory = ZabbixInventory(zabbix_hosts, zbx_proxies)
+    logger.debug(f"Ziskano {len(inventory.host_ids)} hostu ze Zabbixu")
+
+    return inventory
+
+
+def get_zbx_host_changes(glpi_host, zbx_host, zbx_groups, zbx_templates, zbx_proxies):
+    """"
+    Zjisti rozdil mezi hostem v GLPI a Zabbixu a sestavi volani API, ktera upravi
+    zmenene polozky dle GLPI. Nic neodesila.
+    Parameters:
         glpi_host: Parametry hosta v GLPI
         zbx_host: Parametry hosta v Zabbixu
         zbx_groups: skupiny v Zabbixu - jméno:ID
         zbx_templates: šablony v Zabbixu -  jméno:ID
         zbx_proxies: proxy v Zabbixu - jméno:ID
+    Vraci seznam dvojic (metoda, parametry) - prazdny, pokud se nic nezmenilo
     """
-    diff = DictDiffer(glpi_host, zbx_host)
+    # porovnavaji se jen synchronizovane udaje, ktere maji obe strany (viz DictDiffer)
+    differences = changed_fields(glpi_host, zbx_host)
 
-    val = None
-    differences = diff.changed()
+    # vsechny zmenene polozky hosta jednim host.update, rozhrani jednim hostinterface.update
+    host_params = {}
+    interface_params = {}
 
-    for diff in differences:
+    if "zbx_proxy" in differences:
+        # zmena proxy
+        host_params["proxy_hostid"] = zbx_proxies[glpi_host["zbx_proxy"]]
 
-        if diff == "ip_addr":
+    if "groups_id" in differences:
+        # zmena skupiny - nutno sestavit parameter pro groups stejne jako je v JSONu ze Zabbixu - staci ID skupiny
+        host_params["groups"] = [{"groupid": zbx_groups[glpi_host["groups_id"]]}]
 
-            # zmena ip
-            params = {
-                "interfaceid": zbx_host["zbx_interface_id"],
-                "ip": glpi_host["ip_addr"],
-            }
-            try:
-                val = zabbix_api.hostinterface.update(params)
-            except Exception as error:
-                logger.exception(error)
-                logger.exception(f"Problém při úpravě {glpi_host['name']}")
-            # pass
-
-        if diff == "zbx_proxy":
-
-            # zmena proxy
-            params = {
-                "hostid": zbx_host["zbx_id"],
-                "proxy_hostid": zbx_proxies[glpi_host["zbx_proxy"]],
-            }
-            try:
-                val = zabbix_api.host.update(params)
-            except Exception as error:
-                logger.exception(error)
-                logger.exception(f"Problém při úpravě {glpi_host['name']}")
+    if "domains_id" in differences:
+        host_params["templates"] = [
+            {"templateid": zbx_templates[glpi_host["domains_id"]]}
+        ]
 
-        if diff == "groups_id":
+    if "ip_addr" in differences:
+        # zmena ip
+        interface_params["ip"] = glpi_host["ip_addr"]
 
-            # zmena skupiny - nutno sestavit parameter pro groups stejne jako je v JSONu ze Zabbixu - staci ID skupiny
-            params = {
-                "hostid": zbx_host["zbx_id"],
-                "groups": [{"groupid": zbx_groups[glpi_host["groups_id"]]}],
-            }
-            try:
-                val = zabbix_api.host.update(params)
-            except Exception as error:
-                logger.exception(error)
-                logger.exception(f"Problém při úpravě {glpi_host['name']}")
+    if "dns_name" in differences:
+        interface_params["dns"] = glpi_host["dns_name"]
 
-        if diff == "domains_id":
+    changes = []
 
-            params = {
-                "hostid": zbx_host["zbx_id"],
-                "templates": [{"templateid": zbx_templates[glpi_host["domains_id"]]}],
-            }
-            try:
-                val = zabbix_api.host.update(params)
-            except Exception as error:
-                logger.exception(error)
-                logger.exception(f"Problém při úpravě {glpi_host['name']}")
+    if host_params:
+        changes.append(("host.update", {"hostid": zbx_host["zbx_id"], **host_params}))
 
-        if diff == "dns_name":
+    if interface_params:
+        changes.append(
+            (
+                "hostinterface.update",
+                {"interfaceid": zbx_host["zbx_interface_id"], **interface_params},
+            )
+        )
 
-            params = {
-                "interfaceid": zbx_host["zbx_interface_id"],
-                "dns": glpi_host["dns_name"],
-            }
-            try:
-                val = zabbix_api.hostinterface.update(params)
-            except Exception as error:
-                logger.exception(error)
-                logger.exception(f"Problém při úpravě {glpi_host['name']}")
+    return changes
+
+
+def group_host_updates(calls, min_hosts=2):
+    """"
+    Slouci stejne zmeny vice hostu (napr. presun na stejnou proxy nebo do stejne skupiny)
+    z host.update do jednoho host.massupdate. Ostatni volani se nemeni.
+    Parameters:
+        calls: seznam dvojic (metoda, parametry)
+        min_hosts: nejmensi pocet hostu se stejnou zmenou pro host.massupdate (0 = neslucovat)
+    Vraci (seznam volani k odeslani, pro kazde puvodni volani index volani k odeslani)
+    """
+
+    def change_key(method, params):
+        if method != "host.update":
+            return None
+        return json.dumps(
+            {key: value for key, value in params.items() if key != "hostid"},
+            sort_keys=True,
+        )
+
+    keys = [change_key(method, params) for method, params in calls]
+    counts = {}
+    for key in keys:
+        if key is not None:
+            counts[key] = counts.get(key, 0) + 1
+
+    grouped = []
+    positions = []
+    # klic zmeny -> index host.massupdate v grouped
+    mass_updates = {}
+
+    for (method, params), key in zip(calls, keys):
+        if key is None or min_hosts < 2 or counts[key] < min_hosts:
+            positions.append(len(grouped))
+            grouped.append((method, params))
+            continue
+
+        if key not in mass_updates:
+            mass_params = {k: v for k, v in params.items() if k != "hostid"}
+            mass_params["hosts"] = []
+            mass_updates[key] = len(grouped)
+            grouped.append(("host.massupdate", mass_params))
+
+        grouped[mass_updates[key]][1]["hosts"].append({"hostid": params["hostid"]})
+        positions.append(mass_updates[key])
+
+    return grouped, positions
+
+
+def update_zbx_host(
+    zabbix_api, glpi_host, zbx_host, zbx_groups, zbx_templates, zbx_proxies
+):
+    """"
+    Zjisti rozdil mezi hostem v GLPI a Zabbixu a upravy zmenene polozky dle GLPI.
+    Parameters:
+        zabbix_api: API Zabbixu
+        glpi_host: Parametry hosta v GLPI
+        zbx_host: Parametry hosta v Zabbixu
+        zbx_groups: skupiny v Zabbixu - jméno:ID
+        zbx_templates: šablony v Zabbixu -  jméno:ID
+        zbx_proxies: proxy v Zabbixu - jméno:ID
+    """
+    val = None
+
+    for method, params in get_zbx_host_changes(
+        glpi_host, zbx_host, zbx_groups, zbx_templates, zbx_proxies
+    ):
+        try:
+            # do_request posila parametry jako objekt - funguje i pro ZabbixAPIBatch
+            val = zabbix_api.do_request(method, params)["result"]
+        except Exception as error:
+            logger.exception(error)
+            logger.exception(f"Problém při úpravě {glpi_host['name']}")
 
     return val
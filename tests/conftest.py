@@ -0,0 +1,95 @@
+# Popis: Spolecne nastaveni testu - moduly z korene repozitare a bench (fake_server)
+
+import configparser
+import pathlib
+import sys
+
+import pytest
+
+REPO_PATH = pathlib.Path(__file__).resolve().parent.parent
+
+for path in (REPO_PATH, REPO_PATH / "bench"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import pyglpi  # noqa: E402
+import pystate  # noqa: E402
+import pysync  # noqa: E402
+
+
+@pytest.fixture
+def connector():
+    """ GlpiConnector bez spojeni - jen pro parsovani polozek """
+    return pyglpi.GlpiConnector("http://glpi.invalid/apirest.php", "app", "user")
+
+
+@pytest.fixture
+def sync_state(tmp_path):
+    store = pystate.SyncStateStore(tmp_path / "sync_state.sqlite")
+    yield store
+    store.close()
+
+
+def make_network_item(item_id=1, name="sw1", interfaces=(("sw1", "10.0.0.1"),)):
+    """ Polozka networkequipment z GLPI vcetne portu (with_networkports)
+        interfaces: dvojice (nazev, IP) - IP None = rozhrani bez adresy
+    """
+    return {
+        "id": item_id,
+        "name": name,
+        "date_mod": "2020-01-01 00:00:00",
+        "groups_id": "group-0",
+        "domains_id": "domain-0",
+        "networks_id": "proxy-0",
+        "_networkports": {
+            "NetworkPortEthernet": [
+                {
+                    "NetworkName": {
+                        "name": net_name,
+                        "FQDN": {"fqdn": "example.com"},
+                        "IPAddress": [{"name": ip_addr}],
+                    }
+                }
+                for net_name, ip_addr in interfaces
+            ]
+        },
+    }
+
+
+@pytest.fixture
+def fake_server():
+    """ Lokalni GLPI a Zabbix (bench/fake_server) - vraci (FakeState, base_url) """
+    import fake_server as server_module
+
+    state = server_module.FakeState(server_module.generate_devices(40), proxies=2)
+    server = server_module.start_server(state)
+    yield state, server.base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def settings(fake_server, tmp_path):
+    """ SyncSettings z config.ini repozitare proti fake_server, soubory v tmp_path """
+    import fake_server as server_module
+
+    _, base_url = fake_server
+
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(REPO_PATH / "config.ini", encoding="utf-8")
+    config["glpi-server"]["url"] = base_url + server_module.GLPI_PATH
+    config["zabbix-server"]["url"] = base_url + "/zabbix"
+    config["zabbix-server"]["cert-file"] = "False"
+    config["logging"]["log-level"] = "info"
+    config.remove_section("proxy-list")
+    config.add_section("proxy-list")
+    for proxy in ("proxy-0", "proxy-1"):
+        config.set("proxy-list", proxy)
+
+    return pysync.SyncSettings(config, tmp_path)
+
+
+@pytest.fixture
+def engine(settings):
+    with pysync.SyncEngine(settings) as sync_engine:
+        yield sync_engine
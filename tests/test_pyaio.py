@@ -0,0 +1,34 @@
+# Popis: Testy asynchronni synchronizace (pyaio) proti bench/fake_server
+
+import pyplan
+import pystate
+import pysync
+
+
+def test_failed_update_chunk_marks_hosts_failed(settings, fake_server, monkeypatch):
+    state, _ = fake_server
+    settings.engine = "async"
+
+    with pysync.SyncEngine(settings) as engine:
+        engine.run()
+        state.churn(modified=5)
+
+        def broken_apply_updates(*args, **kwargs):
+            raise RuntimeError("Zabbix neodpovida")
+
+        monkeypatch.setattr(pyplan, "apply_updates", broken_apply_updates)
+
+        # chyba davky neukonci beh, hosty davky se zkusi znovu
+        assert engine.run()["updated"] == 0
+
+        failed = {
+            glpi_id
+            for glpi_id, host_state in engine.sync_state.load_all().items()
+            if host_state["status"] == pystate.STATUS_FAILED
+        }
+        assert failed
+        assert failed <= {
+            str(device["id"])
+            for device in state.devices.values()
+            if device["date_mod"] == "2030-01-01 00:00:00"
+        }
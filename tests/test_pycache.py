@@ -0,0 +1,64 @@
+# Popis: Testy cache polozek z GLPI (pycache)
+
+import pycache
+from conftest import make_network_item
+
+
+def full_item(item_id=1, name="sw1", interfaces=(("sw1", "10.0.0.1"),)):
+    """ Polozka s udaji, ktere synchronizace nepouziva (jako skutecna odpoved GLPI) """
+    item = make_network_item(item_id, name, interfaces)
+    item.update(comment="x" * 1000, serial="ABC", links=[{"rel": "Entity"}] * 10)
+    for port in item["_networkports"]["NetworkPortEthernet"]:
+        port.update(mac="00:11:22:33:44:55", speed=1000, name="Gi0/1")
+        port["NetworkName"]["IPAddress"].append({"name": "fe80::1", "id": 5})
+    item["_networkports"]["NetworkPortWifi"] = [{"mac": "00:11:22:33:44:66"}]
+    return item
+
+
+def test_slim_item_parses_like_full_item(connector):
+    for interfaces in ((("sw1", "10.0.0.1"),), (("a", "10.0.0.1"), ("b", "10.0.0.2"))):
+        item = full_item(interfaces=interfaces)
+
+        slim = pycache.slim_item(item)
+
+        assert "comment" not in slim
+        assert slim["_networkports"]["NetworkPortWifi"] == []
+        assert connector.parse_item_parameters(slim) == connector.parse_item_parameters(
+            item
+        )
+
+
+def test_slim_item_keeps_unexpected_ports():
+    item = make_network_item()
+    item["_networkports"]["NetworkPortEthernet"][0]["NetworkName"] = None
+
+    assert pycache.slim_item(item) is item
+
+
+def test_memory_size_is_separate_from_disk_size(tmp_path):
+    cache = pycache.ItemCache(tmp_path / "items.sqlite", max_items=100, memory_items=2)
+    cache.start_run({i: "2020-01-01 00:00:00" for i in range(1, 6)})
+
+    for item_id in range(1, 6):
+        cache.put(full_item(item_id, f"sw{item_id}"))
+
+    assert list(cache.memory) == ["4", "5"]
+    # starsi polozky se nactou z disku
+    assert set(cache.get_many([1, 2, 3, 4, 5])) == {"1", "2", "3", "4", "5"}
+    cache.close()
+
+
+def test_disk_cache_checks_date_mod(tmp_path):
+    path = tmp_path / "items.sqlite"
+    cache = pycache.ItemCache(path)
+    cache.start_run({1: "2020-01-01 00:00:00"})
+    cache.put(full_item(1))
+    cache.close()
+
+    cache = pycache.ItemCache(path)
+    cache.start_run({1: "2020-01-01 00:00:00"})
+    assert cache.get(1)["name"] == "sw1"
+
+    cache.start_run({1: "2021-01-01 00:00:00"})
+    assert cache.get(1) is None
+    cache.close()
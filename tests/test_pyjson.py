@@ -0,0 +1,84 @@
+# Popis: Testy kodeku JSON a postupneho dekodovani odpovedi (pyjson)
+
+import json
+
+import pytest
+
+import pyjson
+
+
+def split(data, size):
+    """ Rozdeli data na casti o velikosti size (jako response.iter_content) """
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+def test_array_stream_any_chunk_size(chunk_size):
+    items = [
+        {"id": 1, "name": "sw1", "ip": "10.0.0.1"},
+        {"id": 22, "name": "přepínač", "ratio": 1.5, "tags": [], "none": None},
+        123456789,
+        "text s \"uvozovkami\" a \\ lomitkem",
+        [1, [2, [3]]],
+    ]
+    data = json.dumps(items, ensure_ascii=False).encode("utf-8")
+
+    stream = pyjson.ArrayStream(split(data, chunk_size))
+
+    assert list(stream) == items
+    assert stream.count == len(items)
+    assert stream.received == len(data)
+
+
+def test_array_stream_number_split_between_chunks():
+    stream = pyjson.ArrayStream([b"[12", b"34, 5", b".25]"])
+
+    assert list(stream) == [1234, 5.25]
+
+
+def test_array_stream_key_in_object():
+    data = json.dumps(
+        {"jsonrpc": "2.0", "result": [{"hostid": "1"}, {"hostid": "2"}], "id": 7}
+    ).encode("utf-8")
+
+    stream = pyjson.ArrayStream(split(data, 5), key="result")
+
+    assert list(stream) == [{"hostid": "1"}, {"hostid": "2"}]
+    assert stream.members == {"jsonrpc": "2.0", "id": 7}
+
+
+def test_array_stream_error_member():
+    data = b'{"jsonrpc": "2.0", "error": {"code": -32602, "data": "x"}, "id": 1}'
+
+    stream = pyjson.ArrayStream([data], key="result")
+
+    assert list(stream) == []
+    assert stream.members["error"]["code"] == -32602
+
+
+def test_array_stream_empty_array():
+    assert list(pyjson.ArrayStream([b" [ ] "])) == []
+
+
+@pytest.mark.parametrize(
+    "data", [b'[{"id": 1}, {"id": ', b'[1 2]', b"[1] x", b'{"result": [1]', b""]
+)
+def test_array_stream_invalid(data):
+    with pytest.raises(pyjson.JsonStreamError):
+        list(pyjson.ArrayStream(split(data, 4)))
+
+
+@pytest.mark.parametrize("name", ["auto", "orjson", "ujson", "json"])
+def test_codec_round_trip(name):
+    codec = pyjson.get_codec(name)
+    value = {"host": "přepínač", "ids": [1, 2], "ok": True, "none": None}
+
+    encoded = codec.dumps(value)
+
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == value
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        pyjson.get_codec("yaml")
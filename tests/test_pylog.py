@@ -0,0 +1,79 @@
+# Popis: Testy logovani - skryvani tajnych udaju a fronta zaznamu (pylog)
+
+import json
+import logging
+
+import pylog
+import pyzabbix
+
+
+def test_redact_quoted_value_with_escaped_quote():
+    message = "Sending: " + json.dumps({"user": "glpi", "password": 'a"b ss'})
+
+    redacted = pylog.redact(message)
+
+    assert "b ss" not in redacted
+    assert '"password": "***"' in redacted
+    assert '"user": "glpi"' in redacted
+
+
+def test_redact_plain_session_token():
+    assert pylog.redact("Session token: abc123") == "Session token: ***"
+    assert "abc123" not in pylog.redact("{'Session-Token': 'abc123'}")
+
+
+def test_lazy_json_redacts_structure():
+    value = {
+        "params": {"user": "glpi", "password": 'x"y'},
+        "auth": "token-1",
+        "items": [{"session_token": "token-2"}],
+    }
+
+    text = str(pylog.LazyJson(value))
+
+    assert "token-1" not in text and "token-2" not in text and 'x\\"y' not in text
+    assert json.loads(text)["params"]["user"] == "glpi"
+    # puvodni hodnota se nemeni
+    assert value["auth"] == "token-1"
+
+
+def test_lazy_json_secret_keys():
+    text = str(pylog.LazyJson({"jsonrpc": "2.0", "result": "tok"}, ("result",)))
+
+    assert "tok" not in text
+
+
+def test_zabbix_login_token_not_logged(fake_server, caplog):
+    _, base_url = fake_server
+    zabbix_api = pyzabbix.ZabbixAPI(base_url + "/zabbix")
+
+    with caplog.at_level(logging.DEBUG, logger="pyzabbix"):
+        zabbix_api.login("glpi", 'pa"ss word')
+
+    assert zabbix_api.auth
+    assert zabbix_api.auth not in caplog.text
+    assert "ss word" not in caplog.text
+
+
+def test_queue_handler_snapshots_mutable_args():
+    import queue
+
+    log_queue = queue.SimpleQueue()
+    handler = pylog.LazyQueueHandler(log_queue)
+    logger = logging.getLogger("test_pylog.queue")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+
+    try:
+        response = {"error": {"code": -1}}
+        logger.debug("Response Body: %s", pylog.LazyJson(response))
+        # napr. ZabbixAPI.response_error doplni "data" az po zalogovani
+        response["error"]["data"] = "No data"
+    finally:
+        logger.removeHandler(handler)
+
+    record = log_queue.get_nowait()
+
+    assert "No data" not in record.getMessage()
+    assert record.args is None
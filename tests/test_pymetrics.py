@@ -0,0 +1,103 @@
+# Popis: Testy metrik ve formatu Prometheu (pymetrics)
+
+import gzip
+import io
+import json
+import os
+import stat
+
+import requests
+import urllib3
+
+import pymetrics
+
+
+def test_render_counters_gauges_and_labels():
+    registry = pymetrics.MetricsRegistry()
+    registry.inc("requests_total", labels={"api": "zabbix"}, help_text="Pocet volani")
+    registry.inc("requests_total", 2, labels={"api": "zabbix"})
+    registry.set("hosts", 3.0, labels={"action": 'a"b\\c\nd'})
+
+    lines = registry.render().splitlines()
+
+    assert "# HELP zbximport_requests_total Pocet volani" in lines
+    assert "# TYPE zbximport_requests_total counter" in lines
+    assert 'zbximport_requests_total{api="zabbix"} 3' in lines
+    assert "# TYPE zbximport_hosts gauge" in lines
+    assert 'zbximport_hosts{action="a\\"b\\\\c\\nd"} 3' in lines
+
+
+def test_render_histogram():
+    registry = pymetrics.MetricsRegistry(prefix="test")
+    histogram = pymetrics.Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        registry.observe("duration_seconds", value, labels={"api": "glpi"})
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE test_duration_seconds histogram" in lines
+    assert 'test_duration_seconds_bucket{api="glpi",le="+Inf"} 3' in lines
+    assert 'test_duration_seconds_count{api="glpi"} 3' in lines
+    assert 'test_duration_seconds_sum{api="glpi"} 5.55' in lines
+    assert histogram.counts == [1, 2]
+
+
+def test_observe_request_and_write_textfile(tmp_path):
+    registry = pymetrics.MetricsRegistry()
+    registry.observe_request("zabbix", "host.get", 0.2, "ok", sent=10, received=200)
+    path = tmp_path / "zbximport.prom"
+
+    registry.write_textfile(path)
+
+    text = path.read_text(encoding="utf-8")
+    assert text == registry.render()
+    assert 'method="host.get"' in text
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert os.listdir(tmp_path) == ["zbximport.prom"]
+
+
+def test_phase_inside_current_phase():
+    registry = pymetrics.MetricsRegistry()
+    registry.start_phase("apply")
+
+    with registry.phase("create"):
+        pass
+    with registry.phase("create"):
+        pass
+    registry.end_phase()
+
+    text = registry.render()
+    assert 'zbximport_phase_duration_seconds{phase="apply"}' in text
+    assert text.count('phase="create"') == 1
+
+
+def test_request_size_counts_headers_and_body():
+    request = requests.Request(
+        "POST", "http://zabbix.invalid/api_jsonrpc.php?a=1", data=b'{"x": 1}'
+    ).prepare()
+
+    size = pymetrics.request_size(request)
+
+    head = "POST /api_jsonrpc.php?a=1 HTTP/1.1\r\n\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in request.headers.items()
+    )
+    assert size == len(head) + len(b'{"x": 1}')
+
+
+def test_response_size_counts_compressed_bytes():
+    body = json.dumps([{"id": i, "name": f"sw{i}"} for i in range(200)]).encode()
+    compressed = gzip.compress(body)
+    response = requests.Response()
+    response.raw = urllib3.HTTPResponse(
+        io.BytesIO(compressed),
+        headers={"Content-Encoding": "gzip"},
+        preload_content=False,
+    )
+
+    # bez Content-Length (chunked) - po precteni tela pocet bajtu ze spojeni
+    assert b"".join(response.iter_content(1024)) == body
+    assert pymetrics.response_size(response) == len(compressed) < len(body)
+
+    response.headers["Content-Length"] = "123"
+    assert pymetrics.response_size(response) == 123
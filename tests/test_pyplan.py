@@ -0,0 +1,164 @@
+# Popis: Testy planu synchronizace (pyplan)
+
+import pyplan
+import pystate
+import pyzabbix
+
+from conftest import make_network_item
+
+ZBX_GROUPS = {"group-0": "200"}
+ZBX_TEMPLATES = {"domain-0": "300"}
+ZBX_PROXIES = {"zbx-proxy-0": "100"}
+
+
+def zabbix_host(name="sw1", ip="10.0.0.1"):
+    return {
+        "hostid": "5001",
+        "host": name,
+        "name": name,
+        "proxy_hostid": "100",
+        "groups": [{"name": "group-0"}],
+        "parentTemplates": [{"name": "domain-0"}],
+        "interfaces": [
+            {
+                "dns": f"{name}.example.com",
+                "ip": ip,
+                "port": "161",
+                "interfaceid": "7001",
+            }
+        ],
+    }
+
+
+def plan(connector, network_item, zabbix_hosts, sync_state=None, sync_states=None):
+    inventory = pyzabbix.ZabbixInventory(zabbix_hosts, ZBX_PROXIES)
+    no_sort = {"sw1": {"id": "1", "date_mod": "2020-01-01 00:00:00"}}
+    return pyplan.plan_update(
+        connector,
+        inventory,
+        no_sort,
+        "sw1",
+        network_item,
+        ZBX_GROUPS,
+        ZBX_TEMPLATES,
+        ZBX_PROXIES,
+        sync_state=sync_state,
+        sync_states=sync_states,
+    )
+
+
+def test_plan_update_without_valid_interface_is_skipped(connector, sync_state):
+    network_item = make_network_item(interfaces=[("sw1", None)])
+
+    update, state = plan(connector, network_item, [zabbix_host()], sync_state)
+
+    assert update is None
+    assert state["status"] == pystate.STATUS_SKIPPED
+    assert state["glpi_id"] == "1"
+
+
+def test_plan_update_with_more_interfaces_is_skipped(connector, sync_state):
+    network_item = make_network_item(
+        interfaces=[("sw1-a", "10.0.0.1"), ("sw1-b", "10.0.0.2")]
+    )
+
+    update, state = plan(connector, network_item, [zabbix_host()], sync_state)
+
+    assert update is None
+    assert state["status"] == pystate.STATUS_SKIPPED
+
+
+def test_plan_update_changed_ip(connector):
+    network_item = make_network_item(interfaces=[("sw1", "10.0.0.9")])
+
+    update, state = plan(connector, network_item, [zabbix_host()])
+
+    assert state is None
+    assert update["hostid"] == "5001"
+    assert ["hostinterface.update", {"interfaceid": "7001", "ip": "10.0.0.9"}] in [
+        [method, {k: params[k] for k in ("interfaceid", "ip") if k in params}]
+        for method, params in update["calls"]
+    ]
+
+
+def test_plan_update_unchanged_fingerprint_skips_zabbix(connector, sync_state):
+    network_item = make_network_item()
+    item = connector.parse_item_parameters(network_item)
+    sync_state.record(
+        glpi_id="1",
+        host_name="sw1",
+        date_mod="2019-01-01 00:00:00",
+        fingerprint=pystate.fingerprint(item),
+    )
+
+    # host v Zabbixu neni - porovnani by skoncilo preskocenim, otisk ho predejde
+    update, state = plan(connector, network_item, [], sync_state)
+
+    assert update is None
+    assert "status" not in state
+    assert state["date_mod"] == "2020-01-01 00:00:00"
+
+
+def test_plan_update_with_broken_item_is_failed(connector, sync_state):
+    network_item = make_network_item()
+    del network_item["_networkports"]
+
+    update, state = plan(connector, network_item, [zabbix_host()], sync_state)
+
+    assert update is None
+    assert state["status"] == pystate.STATUS_FAILED
+    assert state["date_mod"] == "2020-01-01 00:00:00"
+
+
+def test_build_plan_broken_create_does_not_abort(connector, monkeypatch):
+    broken = make_network_item(item_id=2, name="sw2", interfaces=[("sw2", "10.0.0.2")])
+    broken["_networkports"] = {"NetworkPortEthernet": [{"NetworkName": {}}]}
+    network_items = {1: make_network_item(), 2: broken}
+    monkeypatch.setattr(connector, "get_item_network_ports", network_items.get)
+    no_sort = {
+        "sw1": {"id": 1, "date_mod": "2020-01-01 00:00:00"},
+        "sw2": {"id": 2, "date_mod": "2020-01-01 00:00:00"},
+    }
+
+    sync_plan = pyplan.build_plan(
+        connector,
+        pyzabbix.ZabbixInventory([], ZBX_PROXIES),
+        no_sort,
+        [],
+        ["sw1", "sw2"],
+        [],
+        ZBX_GROUPS,
+        ZBX_TEMPLATES,
+        ZBX_PROXIES,
+    )
+
+    assert [entry["host"] for entry in sync_plan.create] == ["sw1"]
+    assert sync_plan.record == [
+        {
+            "glpi_id": 2,
+            "host_name": "sw2",
+            "date_mod": "2020-01-01 00:00:00",
+            "status": pystate.STATUS_FAILED,
+        }
+    ]
+
+
+def test_plan_update_uses_preloaded_states(connector, sync_state, monkeypatch):
+    network_item = make_network_item()
+    sync_state.record(
+        glpi_id="1",
+        host_name="sw1",
+        date_mod="2019-01-01 00:00:00",
+        fingerprint=pystate.fingerprint(connector.parse_item_parameters(network_item)),
+    )
+    sync_states = sync_state.load_all()
+
+    def get(glpi_id):
+        raise AssertionError("stav se ma brat z load_all")
+
+    monkeypatch.setattr(sync_state, "get", get)
+
+    update, state = plan(connector, network_item, [], sync_state, sync_states)
+
+    assert update is None
+    assert "status" not in state
@@ -0,0 +1,38 @@
+# Popis: Testy stavu synchronizace hostu (pystate)
+
+import pyhost
+import pystate
+
+
+def test_fingerprint_covers_all_synced_fields():
+    item = {field: f"{field}-value" for field in pyhost.SYNC_FIELDS}
+    original = pystate.fingerprint(item)
+
+    for field in pyhost.SYNC_FIELDS:
+        assert pystate.fingerprint(dict(item, **{field: "changed"})) != original
+
+    # ostatni udaje se do Zabbixu nesynchronizuji
+    assert pystate.fingerprint(dict(item, date_mod="2030-01-01 00:00:00")) == original
+
+
+def test_record_keeps_unset_values(sync_state):
+    sync_state.record(
+        1, host_name="sw1", date_mod="2020-01-01 00:00:00", zbx_hostid="10"
+    )
+    sync_state.record(1, status=pystate.STATUS_FAILED)
+
+    state = sync_state.get(1)
+
+    assert state["host_name"] == "sw1"
+    assert state["zbx_hostid"] == "10"
+    assert state["status"] == pystate.STATUS_FAILED
+    # neuspesna synchronizace se opakuje i bez zmeny v GLPI
+    assert sync_state.needs_sync(state, "2020-01-01 00:00:00")
+
+
+def test_failed_ids(sync_state):
+    sync_state.record(1, host_name="sw1", status=pystate.STATUS_OK)
+    sync_state.record(2, host_name="sw2", status=pystate.STATUS_FAILED)
+    sync_state.record(3, host_name="sw3", status=pystate.STATUS_SKIPPED)
+
+    assert sync_state.get_failed_ids() == ["2"]
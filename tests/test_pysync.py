@@ -0,0 +1,163 @@
+# Popis: Testy synchronizace GLPI -> Zabbix proti bench/fake_server
+
+import datetime
+
+import pytest
+
+import pymetrics
+import pystate
+import pysync
+
+
+def test_incremental_export_retries_failed_hosts(engine, fake_server):
+    state, _ = fake_server
+
+    engine.run()
+    failed = next(
+        device
+        for device in state.devices.values()
+        if not device["is_deleted"] and len(device["interfaces"]) == 1
+    )
+    engine.sync_state.record(failed["id"], status=pystate.STATUS_FAILED)
+
+    assert engine.incremental_since() is not None
+
+    # zarizeni se v GLPI od te doby nezmenilo - bez opakovani by v exportu chybelo
+    export = engine.export("2020-01-01 00:00:00")
+
+    assert failed["name"] in export.no_sort
+    assert len(export.no_sort) == 1
+
+
+def test_async_engine_records_state_like_sync(settings, tmp_path, fake_server):
+    state, _ = fake_server
+
+    with pysync.SyncEngine(settings) as sync_engine:
+        sync_engine.run()
+        synced = sync_engine.sync_state.load_all()
+
+    # hosty uz v Zabbixu jsou, stav chybi - async musi stav zalozit stejne jako sync
+    settings.engine = "async"
+    settings.state_file = tmp_path / "async_state.sqlite"
+    template = next(d for d in state.devices.values() if d["networks_id"] == "proxy-3")
+    template.update(is_template=1, date_mod="2031-01-01 00:00:00")
+
+    with pysync.SyncEngine(settings) as async_engine:
+        counters = async_engine.run()
+
+        assert counters == {"created": 0, "deleted": 0, "updated": 0}
+        assert set(async_engine.sync_state.load_all()) == set(synced)
+        # sablona mimo seznam proxy se nesynchronizuje a watermark neposouva
+        assert async_engine.sync_state.get_meta("glpi_watermark") < "2031"
+
+
+def expected_hosts(state, proxy_list):
+    """ Hosty, ktere maji byt v Zabbixu - zarizeni s jednim rozhranim z proxy_list """
+    return {
+        device["name"]: device
+        for device in state.devices.values()
+        if not device["is_deleted"]
+        and len(device["interfaces"]) == 1
+        and device["networks_id"] in proxy_list
+    }
+
+
+def assert_zabbix_matches_glpi(state, proxy_list):
+    expected = expected_hosts(state, proxy_list)
+    # zarizeni s vice rozhranimi (nazev---rozhrani) se porovnavaji jinak
+    hosts = {
+        host["host"]: host for host in state.hosts.values() if "---" not in host["host"]
+    }
+
+    assert set(hosts) == set(expected)
+    for name, device in expected.items():
+        assert hosts[name]["interfaces"][0]["ip"] == device["ip"]
+        proxy_name = "zbx-" + device["networks_id"]
+        assert hosts[name]["proxy_hostid"] == state.proxies[proxy_name]
+
+
+@pytest.mark.parametrize(
+    "engine_name, shard_workers",
+    [("sync", 0), ("async", 0), ("pipeline", 0), ("sync", 2), ("pipeline", 2)],
+)
+def test_engines_against_fake_server(settings, fake_server, engine_name, shard_workers):
+    state, _ = fake_server
+    settings.engine = engine_name
+    settings.shard_workers = shard_workers
+    # plny export pri kazdem behu - i mazani
+    settings.full_sync_interval = 0
+
+    with pysync.SyncEngine(settings) as engine:
+        first = engine.run()
+        assert first["created"] > 0
+        assert_zabbix_matches_glpi(state, settings.proxy_list)
+
+        # beze zmeny v GLPI se v Zabbixu nic nemeni
+        state.requests.clear()
+        assert engine.run() == {"created": 0, "deleted": 0, "updated": 0}
+        assert state.requests["glpi getMultipleItems"] == 0
+
+        state.churn(modified=6, added=3, removed=2)
+        counters = engine.run()
+        assert counters["created"] > 0 and counters["updated"] > 0
+        assert_zabbix_matches_glpi(state, settings.proxy_list)
+
+
+@pytest.mark.parametrize("engine_name", ["sync", "async", "pipeline"])
+def test_apply_phases_measured_separately(settings, engine_name):
+    settings.engine = engine_name
+
+    with pysync.SyncEngine(settings) as engine:
+        engine.run()
+
+    text = pymetrics.REGISTRY.render()
+    phases = ("glpi_export", "zabbix_reference", "diff", "delete", "create", "update")
+    for phase in phases:
+        assert f'zbximport_phase_duration_seconds{{phase="{phase}"}}' in text
+
+
+@pytest.mark.parametrize("engine_name", ["sync", "async", "pipeline"])
+def test_rejected_create_retried_on_incremental_run(settings, fake_server, engine_name):
+    state, _ = fake_server
+    settings.engine = engine_name
+    rejected = next(iter(expected_hosts(state, settings.proxy_list).values()))
+    state.rejected.add(rejected["name"])
+
+    with pysync.SyncEngine(settings) as engine:
+        first = engine.run()
+
+        # ostatni hosty davky se vytvori, odmitnuty se zapise jako neuspesny
+        assert first["created"] > 1
+        host_names = {host["host"] for host in state.hosts.values()}
+        assert rejected["name"] not in host_names
+        failed = engine.sync_state.get(rejected["id"])
+        assert failed["status"] == pystate.STATUS_FAILED
+        assert failed["date_mod"] == rejected["date_mod"]
+
+        state.rejected.clear()
+        assert engine.incremental_since() is not None
+        assert engine.run() == {"created": 1, "deleted": 0, "updated": 0}
+
+        assert_zabbix_matches_glpi(state, settings.proxy_list)
+        assert engine.sync_state.get(rejected["id"])["status"] == pystate.STATUS_OK
+
+
+def test_apply_saved_plan_keeps_plan_markers(engine, tmp_path):
+    plan_path = tmp_path / "plan.json"
+    plan = engine.dry_run(plan_out=plan_path)
+    plan.created_at = "2020-06-01T12:00:00"
+    plan.save(plan_path)
+
+    counters = engine.apply_saved_plan(plan_path)
+
+    # znacky odpovidaji exportu, ze ktereho plan vznikl - ne casu provedeni
+    assert counters["created"] > 0
+    created_at = datetime.datetime(2020, 6, 1, 12).timestamp()
+    assert float(engine.sync_state.get_meta("last_full_sync")) == created_at
+    assert engine.sync_state.get_meta("glpi_watermark") == plan.newest_date_mod
+
+    # starsi plan po plnem behu cas plneho exportu nevraci zpet
+    engine.run()
+    last_full_sync = float(engine.sync_state.get_meta("last_full_sync"))
+    engine.apply_saved_plan(plan_path)
+    assert float(engine.sync_state.get_meta("last_full_sync")) == last_full_sync
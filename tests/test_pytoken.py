@@ -0,0 +1,51 @@
+# Popis: Testy cache prihlasovacich tokenu (pytoken)
+
+import os
+import stat
+
+import pysync
+import pytoken
+
+
+def test_token_file_readable_only_by_owner(tmp_path):
+    path = tmp_path / "tokens.json"
+
+    pytoken.TokenCache(path).set("zabbix:url:glpi", "token-1")
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert pytoken.TokenCache(path).get("zabbix:url:glpi") == "token-1"
+    # docasne soubory po zapisu nezustavaji
+    assert os.listdir(tmp_path) == ["tokens.json"]
+
+
+def test_token_file_readable_by_others_is_ignored(tmp_path):
+    path = tmp_path / "tokens.json"
+    pytoken.TokenCache(path).set("glpi:url", "token-1")
+    os.chmod(path, 0o644)
+
+    cache = pytoken.TokenCache(path)
+
+    assert cache.get("glpi:url") is None
+
+    # prepsani vrati prava jen pro vlastnika
+    cache.set("glpi:url", "token-2")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_token_removed(tmp_path):
+    path = tmp_path / "tokens.json"
+    cache = pytoken.TokenCache(path)
+    cache.set("glpi:url", "token-1")
+
+    cache.set("glpi:url", None)
+
+    assert pytoken.TokenCache(path).get("glpi:url") is None
+
+
+def test_glpi_token_key_depends_on_user_token(settings):
+    key = pysync.SyncClients(settings).glpi_token_key
+    settings.glpi_user_token = "other-user-token"
+    other_key = pysync.SyncClients(settings).glpi_token_key
+
+    assert key != other_key
+    assert "other-user-token" not in other_key
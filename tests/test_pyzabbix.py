@@ -0,0 +1,132 @@
+# Popis: Testy funkci pro praci se Zabbixem bez serveru - API nahrazuje zaznam volani
+
+import pytest
+
+import pyzabbix
+
+
+class RecordingZabbixAPI(object):
+    """ Zaznamenava volani do_request, host.create vraci ID dle poradi """
+
+    def __init__(self):
+        self.calls = []
+
+    def do_request(self, method, params=None):
+        self.calls.append((method, params))
+        return {"result": {"hostids": [str(index) for index, _ in enumerate(params)]}}
+
+
+def host_item(host_name, groups_id="group-0", domains_id="domain-0"):
+    """ Polozka s parametry z GLPI (GlpiConnector.parse_item_parameters) """
+    return {
+        "name": host_name,
+        "host_name": host_name,
+        "ip_addr": "10.0.0.1",
+        "dns_name": host_name + ".example.com",
+        "groups_id": groups_id,
+        "domains_id": domains_id,
+        "zbx_proxy": "zbx-proxy-0",
+        "multi_interface": False,
+    }
+
+
+def test_create_zbx_hosts_skips_items_missing_in_zabbix():
+    zabbix_api = RecordingZabbixAPI()
+
+    created = pyzabbix.create_zbx_hosts(
+        zabbix_api,
+        [host_item("sw1"), host_item("sw2", groups_id="unknown"), host_item("sw3")],
+        {"group-0": "200"},
+        {"domain-0": "300"},
+        {"zbx-proxy-0": "100"},
+        chunk_size=10,
+    )
+
+    assert created == ["sw1", "sw3"]
+    assert [params["host"] for params in zabbix_api.calls[0][1]] == ["sw1", "sw3"]
+
+
+@pytest.fixture
+def zabbix_api(fake_server):
+    _, base_url = fake_server
+    api = pyzabbix.ZabbixAPI(base_url + "/zabbix")
+    api.login("glpi", "pass")
+    return api
+
+
+def create_params(host_name):
+    return {
+        "host": host_name,
+        "interfaces": [{"type": 1, "main": 1, "useip": 1, "ip": "10.0.0.1"}],
+        "groups": [{"groupid": "200"}],
+        "proxy_hostid": "100",
+    }
+
+
+def test_create_chunk_bisects_failing_host(zabbix_api, fake_server):
+    state, _ = fake_server
+    zabbix_api.do_request("host.create", params=[create_params("sw3")])
+    state.requests.clear()
+
+    created = pyzabbix.create_zbx_hosts_from_params(
+        zabbix_api, [create_params(f"sw{i}") for i in range(8)], chunk_size=8
+    )
+
+    # sw3 uz existuje - cela davka selze, puleni najde jen jeho
+    assert sorted(created) == ["sw0", "sw1", "sw2", "sw4", "sw5", "sw6", "sw7"]
+    assert state.requests["zabbix host.create"] == 7
+    assert len({host["host"] for host in state.hosts.values()}) == 8
+
+
+def test_batch_maps_results_and_errors_by_id(zabbix_api, fake_server):
+    state, _ = fake_server
+    hostid = zabbix_api.do_request("host.create", params=[create_params("sw1")])[
+        "result"
+    ]["hostids"][0]
+    state.requests.clear()
+
+    with zabbix_api.batch(size=10) as batch:
+        ok = batch.host.update(hostid=hostid, proxy_hostid="101")
+        missing = batch.host.update(hostid="999999", proxy_hostid="101")
+
+    assert state.requests["zabbix http"] == 1
+    assert ok and ok.result == {"hostids": [hostid]}
+    assert not missing
+    with pytest.raises(pyzabbix.ZabbixAPIException):
+        missing.result
+    assert state.hosts[hostid]["proxy_hostid"] == "101"
+
+
+def test_group_host_updates_merges_same_changes():
+    calls = [
+        ("host.update", {"hostid": "1", "proxy_hostid": "101"}),
+        ("hostinterface.update", {"interfaceid": "5", "ip": "10.0.0.2"}),
+        ("host.update", {"hostid": "2", "proxy_hostid": "101"}),
+        ("host.update", {"hostid": "3", "proxy_hostid": "102"}),
+        ("host.update", {"hostid": "4", "proxy_hostid": "101"}),
+    ]
+
+    grouped, positions = pyzabbix.group_host_updates(calls, min_hosts=2)
+
+    assert grouped == [
+        (
+            "host.massupdate",
+            {
+                "proxy_hostid": "101",
+                "hosts": [{"hostid": "1"}, {"hostid": "2"}, {"hostid": "4"}],
+            },
+        ),
+        ("hostinterface.update", {"interfaceid": "5", "ip": "10.0.0.2"}),
+        ("host.update", {"hostid": "3", "proxy_hostid": "102"}),
+    ]
+    assert positions == [0, 1, 0, 2, 0]
+
+
+def test_group_host_updates_disabled():
+    calls = [
+        ("host.update", {"hostid": "1", "proxy_hostid": "101"}),
+        ("host.update", {"hostid": "2", "proxy_hostid": "101"}),
+    ]
+
+    assert pyzabbix.group_host_updates(calls, min_hosts=0) == (calls, [0, 1])
+    assert pyzabbix.group_host_updates(calls, min_hosts=3) == (calls, [0, 1])